@@ -0,0 +1,55 @@
+"""
+Benchmark of the parser backends on the sample listing page.
+
+Usage: python scripts/benchmark_parser.py [--repeat N] [--workers N] [html files ...]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from scheduler_app.services.parser import (
+    extract_events,
+    extract_events_many,
+    parser_backend_registry,
+)
+
+
+SAMPLE_HTML = (
+    Path(__file__).parent.parent / "tests" / "fixtures" / "events_calendar_sample.html"
+)
+PAGE_URL = "https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalender/"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("files", nargs="*", type=Path, default=[SAMPLE_HTML])
+    args = parser.parse_args()
+
+    pages = [f.read_text(encoding="utf-8") for f in args.files]
+
+    for backend in parser_backend_registry:
+        extract_events(pages[0], PAGE_URL, backend=backend)    # warm-up
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in pages:
+                events = extract_events(html, PAGE_URL, backend=backend)
+        elapsed = time.perf_counter() - start
+
+        per_page_ms = elapsed / (args.repeat * len(pages)) * 1000
+        print(f"{backend:>5}: {per_page_ms:8.2f} ms/page ({len(events)} events)")
+
+        bulk = [(PAGE_URL, html) for html in pages] * args.repeat
+        start = time.perf_counter()
+        extract_events_many(bulk, backend=backend, max_workers=args.workers)
+        elapsed = time.perf_counter() - start
+
+        per_page_ms = elapsed / len(bulk) * 1000
+        print(f"{backend:>5}: {per_page_ms:8.2f} ms/page (process pool)")
+
+
+if __name__ == "__main__":
+    main()
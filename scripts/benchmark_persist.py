@@ -0,0 +1,64 @@
+"""
+Benchmark of the row-wise and set-based event upserts.
+
+Usage: python scripts/benchmark_persist.py [--rows N ...]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from scheduler_app.infra.database import (
+    bulk_upsert_events,
+    get_connection_manager,
+    row_upsert_events,
+)
+from scheduler_app.models.event import Event
+
+
+def make_events(n: int, with_type: bool) -> list[Event]:
+    return [
+        Event(
+            event_id=f"event-{i}",
+            event_name=f"Concert {i}",
+            event_date=date(2026, 1, 1) + timedelta(days=i % 365),
+            event_time="20:00",
+            event_venue=f"Venue {i % 200}",
+            event_type="Klassik" if with_type else None,
+            event_description=f"Description of concert {i}.",
+        )
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for n in args.rows:
+        # Insert into an empty table, then upsert all rows again
+        fresh, update = make_events(n, True), make_events(n, False)
+
+        for name, upsert in (("row", row_upsert_events), ("bulk", bulk_upsert_events)):
+            with tempfile.TemporaryDirectory() as tmp:
+                con = get_connection_manager(str(Path(tmp) / "bench.duckdb")).cursor()
+
+                start = time.perf_counter()
+                upsert(con, fresh)
+                inserted = time.perf_counter() - start
+
+                start = time.perf_counter()
+                upsert(con, update)
+                updated = time.perf_counter() - start
+
+            print(
+                f"{n:>7} rows {name:>4}: insert {inserted:8.3f} s, "
+                f"upsert {updated:8.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Maintenance commands for the event database.
+"""
+
+import argparse
+from dotenv import load_dotenv
+import os
+
+from scheduler_app.infra.database import (
+    compact_events,
+    export_events_to_parquet,
+    import_events_from_parquet,
+    publish_snapshot,
+    rebuild_search_index,
+    search_events,
+)
+from scheduler_app.infra.writer import snapshot_interval
+from scheduler_app.services.ingest import ingest_range, replay_archive
+
+
+_DIRECT_WRITE_COMMANDS = ("compact", "export", "import", "reindex")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser(
+        "backfill",
+        help="Crawl and persist the events for a range of days",
+    )
+    backfill.add_argument("start_date", help="First day as 'YYYY-MM-DD'")
+    backfill.add_argument("end_date", help="Last day as 'YYYY-MM-DD'")
+
+    replay = subparsers.add_parser(
+        "replay",
+        help="Re-parse and persist archived pages without network access",
+    )
+    replay.add_argument("--start-date", help="First day as 'YYYY-MM-DD'")
+    replay.add_argument("--end-date", help="Last day as 'YYYY-MM-DD'")
+    replay.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Parse and report changes without writing to the database",
+    )
+
+    subparsers.add_parser(
+        "compact",
+        help="Rewrite the events table in date order for faster date lookups",
+    )
+
+    export = subparsers.add_parser(
+        "export",
+        help="Move past events to Parquet files partitioned by year and month",
+    )
+    export.add_argument(
+        "before_date", help="Move events dated before this day ('YYYY-MM-DD')"
+    )
+
+    import_ = subparsers.add_parser(
+        "import",
+        help="Move events from the Parquet files back into the database",
+    )
+    import_.add_argument("--start-date", help="First day as 'YYYY-MM-DD'")
+    import_.add_argument("--end-date", help="Last day as 'YYYY-MM-DD'")
+
+    subparsers.add_parser(
+        "reindex",
+        help="Rebuild the full-text search index over all stored events",
+    )
+
+    search = subparsers.add_parser(
+        "search", help="Search events by keywords in name, description and venue"
+    )
+    search.add_argument("query", help="Keywords")
+    search.add_argument("--start-date", help="First day as 'YYYY-MM-DD'")
+    search.add_argument("--end-date", help="Last day as 'YYYY-MM-DD'")
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    load_dotenv()
+
+    db_path = os.environ["DUCKDB_PATH"]
+
+    if args.command == "backfill":
+        for diff in ingest_range(db_path, args.start_date, args.end_date):
+            print(diff)
+
+    elif args.command == "replay":
+        diffs = replay_archive(
+            db_path,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            persist=not args.dry_run,
+        )
+        for diff in diffs:
+            print(diff)
+
+    elif args.command == "compact":
+        print(f"Compacted {compact_events(db_path)} events.")
+
+    elif args.command == "export":
+        count = export_events_to_parquet(db_path, args.before_date)
+        print(f"Exported {count} events.")
+
+    elif args.command == "import":
+        count = import_events_from_parquet(
+            db_path, start_date=args.start_date, end_date=args.end_date
+        )
+        print(f"Imported {count} events.")
+
+    elif args.command == "reindex":
+        print(f"Indexed {rebuild_search_index(db_path)} events.")
+
+    elif args.command == "search":
+        date_range = (
+            args.start_date or "0001-01-01", args.end_date or "9999-12-31"
+        )
+        for event, score in search_events(db_path, args.query, date_range):
+            print(f"{score:6.2f}  {event}")
+
+    # Let graph runs in other processes read the result; backfill and replay
+    # write through the database writer, which publishes its own snapshots
+    if args.command in _DIRECT_WRITE_COMMANDS and snapshot_interval() is not None:
+        publish_snapshot(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,9 @@ from uuid import uuid4
 
 from langgraph.types import Command
 from scheduler_app.graph.builder import graph
-from scheduler_app.infra.database import init_db
+from scheduler_app.infra.database import release_connection
 from scheduler_app.infra.telegram import TelegramClient
+from scheduler_app.services.augmentation import augmentation_cache_stats
 from scheduler_app.services.input_handlers import (
     MaxAttemptsExceeded,
     obtain_input_date,
@@ -24,7 +25,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--debug-checkpoints",
         action="store_true",
-        help="Print checkpoint count and logged LLM c1alls",
+        help="Print checkpoint count, logged LLM calls and cache hit rates",
     )
     return parser.parse_args()
 
@@ -51,10 +52,12 @@ def main() -> None:
             "user_input_date": user_input_date
         }
 
-        init_db(db_path)
-
+        # The database is opened by the first query, and its write lock is
+        # released while waiting for the user, so a backfill or other
+        # process can write in the meantime
         result = graph.invoke(initial_state, config=config)
         while "__interrupt__" in result:
+            release_connection(db_path)
             intr = result["__interrupt__"][0]
             payload = intr.value
 
@@ -78,6 +81,7 @@ def main() -> None:
                 config=config
             )
 
+        release_connection(db_path)
         output = result["output"]
 
         tg_client.send(output)
@@ -89,6 +93,7 @@ def main() -> None:
                 print(result["log_llmcalls"])
             except KeyError:
                 print("No LLM calls logged.")
+            print(augmentation_cache_stats)
 
 
 if __name__ == "__main__":
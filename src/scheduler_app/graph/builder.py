@@ -2,13 +2,15 @@
 Compilation of the LangGraph.
 """
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import InMemorySaver
 
 from scheduler_app.graph.state import AgentState
-from scheduler_app.graph.nodes.find_events import find_events
+from scheduler_app.graph.nodes.find_events import afind_events, find_events
 from scheduler_app.graph.nodes.augment_events import augment_events
 from scheduler_app.graph.nodes.load_events import load_events
+from scheduler_app.graph.nodes.refresh_events import refresh_events
 from scheduler_app.graph.nodes.filter_events import filter_events
 from scheduler_app.graph.nodes.find_stations import find_stations
 from scheduler_app.graph.nodes.find_restaurants import find_restaurants
@@ -19,9 +21,11 @@ from scheduler_app.graph.edges import check_data_availability
 builder = StateGraph(AgentState)
 checkpointer = InMemorySaver()
 
-builder.add_node("find_events", find_events)
+# Graphs run via ainvoke crawl on the event loop
+builder.add_node("find_events", RunnableLambda(find_events, afunc=afind_events))
 builder.add_node("augment_events", augment_events)
 builder.add_node("load_events", load_events)
+builder.add_node("refresh_events", refresh_events)
 builder.add_node("filter_events", filter_events)
 builder.add_node("find_stations", find_stations)
 builder.add_node("find_restaurants", find_restaurants)
@@ -33,10 +37,12 @@ builder.add_conditional_edges(
     {
         "data_not_available": "find_events",
         "data_available": "load_events",
+        "data_stale": "refresh_events",
     },
 )
 builder.add_edge("find_events", "augment_events")
 builder.add_edge("augment_events", "filter_events")
+builder.add_edge("refresh_events", "load_events")
 builder.add_edge("load_events", "filter_events")
 builder.add_edge("filter_events", "find_stations")
 builder.add_edge("filter_events", "find_restaurants")
@@ -6,43 +6,32 @@ import os
 from pathlib import Path
 from typing import Optional, Literal
 
-import duckdb
-
 from langchain_core.runnables import RunnableConfig
 
 from scheduler_app.graph.state import AgentState
-from scheduler_app.infra.database import load_events_from_db, EVENTS_TABLE
+from scheduler_app.infra.crawl_status import crawl_ttl
+from scheduler_app.infra.database import load_crawl_status
+from scheduler_app.services.refresh import serve_stale_enabled
 
 
 def check_data_availability(
         state: AgentState, config: Optional[RunnableConfig] = None
-    ) -> Literal["data_available", "data_not_available"]:
+    ) -> Literal["data_available", "data_stale", "data_not_available"]:
     """
-    Check 1) existence of the database, 2) existence of the events table, and
-    3) availability of data for the selected day.
+    Check 1) existence of the database and 2) that the selected day was
+    crawled within the crawl TTL and its events are augmented. Stale days
+    are reported as such only if they may be served while being refreshed.
     """
 
     db_exists = Path(os.environ["DUCKDB_PATH"]).exists()
     if not db_exists:
         return "data_not_available"
 
-    with duckdb.connect(os.environ["DUCKDB_PATH"]) as con:
-        table_exists = con.execute(
-            """
-            SELECT 1
-              FROM information_schema.tables
-             WHERE table_name = ?
-            """,
-            (EVENTS_TABLE,),
-        ).fetchone()
-
-        if not table_exists:
-            return "data_not_available"
-        
-        data_exists = load_events_from_db(
-            os.environ["DUCKDB_PATH"], state.user_input_date
-        )
-        if len(data_exists) == 0:
-            return "data_not_available"
-        else:
-            return "data_available"
+    status = load_crawl_status(os.environ["DUCKDB_PATH"], state.user_input_date)
+    if status is None:
+        return "data_not_available"
+    if not status.is_stale(crawl_ttl()):
+        return "data_available"
+    if serve_stale_enabled():
+        return "data_stale"
+    return "data_not_available"
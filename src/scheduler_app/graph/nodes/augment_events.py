@@ -3,25 +3,101 @@ Node for augmenting events.
 """
 
 import os
+import time
 from datetime import datetime
 from uuid import uuid4
 import json
-from pydantic import ValidationError
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
+import duckdb
 from langchain_core.runnables import RunnableConfig
 
-from scheduler_app.models.event import Event, AugmentationResult
+from scheduler_app.models.event import (
+    AugmentationResult,
+    Event,
+    EventBatch,
+    EventPatch,
+)
 from scheduler_app.app_logging.log_llm import LLMCallEvent, log_llmcall
 from scheduler_app.graph.state import AgentState
 from scheduler_app.graph.tools.web_search import search_web
-from scheduler_app.infra.database import persist_events_to_db, load_events_from_db
-from scheduler_app.infra.llm import create_llm_client
+from scheduler_app.infra.database import (
+    get_connection_manager,
+    persist_events_to_db,
+    load_cached_augmentations,
+    load_detail_typed_ids,
+    load_event_batch,
+    load_pending_augmentation_ids,
+    mark_date_augmented,
+    mark_events_augmented,
+    save_cached_augmentations,
+)
+from scheduler_app.infra.llm import (
+    create_llm_client,
+    retry_delay,
+    salvage_items,
+    structured_data,
+)
+from scheduler_app.services.augmentation import (
+    OUTPUT_TOKENS_PER_EVENT,
+    augment_chunk_tokens,
+    augment_concurrency,
+    augmentation_cache_stats,
+    augmentation_key,
+    chunk_events,
+    fit_to_budget,
+)
+from scheduler_app.services.classifier import (
+    classifier_confidence,
+    event_text,
+    get_genre_classifier,
+)
 
 
 MAX_RETRIES = 3
 
 
+def _apply_patches(
+        batch: EventBatch, patches: List[EventPatch], pending_ids: set[str]
+    ) -> set[str]:
+    """
+    Apply the patches of pending events to the batch and return the ids of
+    the events patched.
+    """
+
+    augmented_ids = set()
+    for patch in patches:
+        patch_clean = {
+            k: v for k, v in patch.model_dump().items()
+            if v is not None and k != "event_id"}
+
+        idx = batch.index_of(patch.event_id)
+        if idx is not None and patch.event_id in pending_ids:
+            batch.update(idx, **patch_clean)
+            augmented_ids.add(patch.event_id)
+    return augmented_ids
+
+
+def _checkpoint(
+        db_path: str,
+        batch: EventBatch,
+        event_ids: Iterable[str],
+        type_sources: dict[str, Optional[str]],
+    ) -> None:
+    """
+    Persist the events and mark those in type_sources as augmented, with
+    where their type came from (None keeps the recorded source).
+    """
+
+    persist_events_to_db(db_path, [batch[batch.index_of(i)] for i in event_ids])
+    for source in set(type_sources.values()):
+        mark_events_augmented(
+            db_path,
+            [i for i, s in type_sources.items() if s == source],
+            source,
+        )
+
+
 def augment_events(
         state: AgentState, config: Optional[RunnableConfig] = None
     ) -> dict[str, List[Event]]:
@@ -30,34 +106,82 @@ def augment_events(
     """
 
     # Load events from database
-    events_list_tuples = load_events_from_db(
-        os.environ["DUCKDB_PATH"], state.user_input_date
-    )
+    db_path = os.environ["DUCKDB_PATH"]
+    batch = load_event_batch(db_path, state.user_input_date)
+
+    # While another process (e.g. a backfill) holds the write lock, the
+    # events are answered from its snapshot as they are
+    try:
+        get_connection_manager(db_path)
+    except duckdb.IOException as exc:
+        print(f"Skipping augmentation, database is locked: {exc}")
+        return {"events_list": batch.events()}
+
+    # Only events that are new, changed or lack a type are sent to the LLM
+    pending_ids = load_pending_augmentation_ids(db_path, state.user_input_date)
+
+    # New events typed and described from their detail pages need no LLM
+    # call; changed events keep their old type and go through the steps below
+    detail_typed_ids = load_detail_typed_ids(db_path, state.user_input_date)
+    complete_ids = {
+        event_id
+        for event_id, event_type, event_description in zip(
+            batch.event_id, batch.event_type, batch.event_description
+        )
+        if event_id in pending_ids & detail_typed_ids
+        and event_type and event_description
+    }
+    pending_ids -= complete_ids
+    mark_events_augmented(db_path, complete_ids)
 
     # Prepare events for LLM ingestion
-    events_list_dicts = []
-    for (
-        event_id,
-        event_name,
-        event_date,
-        event_time,
-        event_venue,
-        event_type,
-        event_description,
-        event_url,
-    ) in events_list_tuples:
-        events_list_dicts.append(
-            {
-                "event_id": event_id,
-                "event_name": event_name,
-                "event_date": event_date.isoformat(),
-                "event_time": event_time[:5],
-                "event_venue": event_venue,
-                "event_url": event_url,
-                "event_type": event_type,
-                "event_description": event_description,
-            }
+    pending_dicts = [
+        batch.to_dict(i) for i, event_id in enumerate(batch.event_id)
+        if event_id in pending_ids
+    ]
+
+    # Events of a series or tour augmented before are taken from the cache
+    cache_keys = {d["event_id"]: augmentation_key(d) for d in pending_dicts}
+    cached = load_cached_augmentations(db_path, set(cache_keys.values()))
+    cached_ids = _apply_patches(batch, [
+        EventPatch(
+            event_id=event_id,
+            event_type=cached[key][0],
+            event_description=cached[key][1],
+        )
+        for event_id, key in cache_keys.items() if key in cached
+    ], pending_ids)
+    _checkpoint(db_path, batch, cached_ids, dict.fromkeys(cached_ids, "cache"))
+    augmentation_cache_stats.record(
+        len(cached_ids), len(pending_dicts) - len(cached_ids)
+    )
+    pending_dicts = [d for d in pending_dicts if d["event_id"] not in cached_ids]
+
+    # The local classifier types events it is confident about; those with a
+    # description then need no LLM call
+    classified_ids: set[str] = set()
+    confidence = classifier_confidence()
+    classifier = (
+        get_genre_classifier(db_path) if confidence and pending_dicts else None
+    )
+    if classifier is not None:
+        predicted = classifier.predict(
+            [event_text(d) for d in pending_dicts], confidence
+        )
+        classified_ids = _apply_patches(batch, [
+            EventPatch(event_id=d["event_id"], event_type=event_type)
+            for d, event_type in zip(pending_dicts, predicted)
+            if event_type and d["event_description"]
+        ], pending_ids)
+        _checkpoint(
+            db_path,
+            batch,
+            classified_ids,
+            dict.fromkeys(classified_ids, "classifier"),
         )
+        pending_dicts = [
+            d for d in pending_dicts if d["event_id"] not in classified_ids
+        ]
 
     # Query LLM to define event type and expand event description
     llm_client, token_counter = create_llm_client(
@@ -67,7 +191,11 @@ def augment_events(
     )
 
     llm_client_with_tool = llm_client.bind_tools([search_web])
-    augmenter = llm_client_with_tool.with_structured_output(AugmentationResult)
+    # The raw output is kept, so the valid patches of a partly invalid
+    # answer can be salvaged
+    augmenter = llm_client_with_tool.with_structured_output(
+        AugmentationResult, include_raw=True
+    )
 
     system_message = """
         You augment information on events. Only fill event_type and
@@ -78,64 +206,103 @@ def augment_events(
     query_message = """
         Return patches.
         """
-    context = json.dumps(events_list_dicts, ensure_ascii=False)
 
-    msg = [
-        ("system", system_message),
-        ("user", query_message),
-        ("user", context),
-    ]
+    def messages(chunk: List[dict]) -> list:
+        return [
+            ("system", system_message),
+            ("user", query_message),
+            ("user", json.dumps(chunk, ensure_ascii=False)),
+        ]
 
-    patches = []
-    attempts = 0  # For LLM call logging
+    # Events are sent in chunks of bounded size, several at a time
+    remaining = chunk_events(pending_dicts, augment_chunk_tokens())
+    all_augmented_ids = cached_ids | classified_ids
+    llm_calls = []  # For LLM call logging
     for attempt in range(MAX_RETRIES):
-        if token_counter.budget_exceeded:
+        if not remaining or token_counter.budget_exceeded:
             break
+        if attempt:
+            time.sleep(retry_delay(attempt))
 
-        attempts += 1
-        try:
-            llm_output: AugmentationResult = augmenter.invoke(
-                msg, config={"callbacks": [token_counter]}
-            )
-            patches = llm_output.patches
+        # Chunks are cut to what the remaining budget is expected to cover;
+        # events left out wait for a later run
+        remaining, cut = fit_to_budget(
+            remaining,
+            lambda chunk: token_counter.estimate_cost(
+                messages(chunk), OUTPUT_TOKENS_PER_EVENT * len(chunk)
+            ),
+            token_counter.remaining_budget,
+        )
+        if cut:
+            token_counter.budget_exceeded = True
+        if not remaining:
             break
-        except ValidationError:
-            if attempt == MAX_RETRIES - 1:
-                patches = []
 
-    for patch in patches:
-        patch_clean = {
-            k: v for k, v in patch.model_dump().items()
-            if v is not None and k != "event_id"}
+        retry = []
+        chunk_msgs = [messages(chunk) for chunk in remaining]
+        for i, llm_output in augmenter.batch_as_completed(
+                chunk_msgs,
+                config={
+                    "callbacks": [token_counter],
+                    "max_concurrency": augment_concurrency(),
+                },
+                return_exceptions=True,
+            ):
+            if isinstance(llm_output, Exception):
+                raise llm_output
 
-        idx = next(
-            (i for i, d in enumerate(events_list_dicts)
-             if d["event_id"] == patch.event_id),
-            None,
-        )
+            patches, _ = salvage_items(
+                structured_data(llm_output), "patches", EventPatch
+            )
+            llm_calls.append((chunk_msgs[i], patches, attempt + 1))
 
-        if idx is not None:
-            events_list_dicts[idx] |= patch_clean
-
-    # Persist events to database
-    events_list_events = [Event.from_dict(d) for d in events_list_dicts]
-    persist_events_to_db(os.environ["DUCKDB_PATH"], events_list_events)
-
-    # Log information on LLM call
-    llmcall_log_entry: LLMCallEvent = log_llmcall(
-        provider = os.environ["LLM_SERVICE"],
-        messages = msg,
-        output = patches,
-        attempts = attempts,
-        node = "augment_events",
-        timestamp = str(datetime.now().isoformat()),
-        request_id = str(uuid4())
+            # Checkpoint the chunk, so a later run only redoes the others
+            chunk = remaining[i]
+            augmented_ids = _apply_patches(batch, patches, pending_ids)
+            typed_ids = {p.event_id for p in patches if p.event_type}
+            _checkpoint(
+                db_path,
+                batch,
+                [e["event_id"] for e in chunk],
+                {e: "llm" if e in typed_ids else None for e in augmented_ids},
+            )
+            save_cached_augmentations(db_path, {
+                cache_keys[p.event_id]: (p.event_type, p.event_description)
+                for p in patches
+                if p.event_id in augmented_ids and p.event_type
+            })
+            all_augmented_ids |= augmented_ids
+
+            # Only events with invalid or missing patches are sent again
+            missing = [e for e in chunk if e["event_id"] not in augmented_ids]
+            if missing:
+                retry.append(missing)
+        remaining = retry
+
+    events_list_events = batch.events()
+    # The day counts as stale until all its events are augmented
+    mark_date_augmented(
+        db_path, state.user_input_date, pending_ids <= all_augmented_ids
     )
 
+    # Log information on LLM calls
+    llmcall_log_entries: List[LLMCallEvent] = [
+        log_llmcall(
+            provider = os.environ["LLM_SERVICE"],
+            messages = msg,
+            output = patches,
+            attempts = attempts,
+            node = "augment_events",
+            timestamp = str(datetime.now().isoformat()),
+            request_id = str(uuid4())
+        )
+        for msg, patches, attempts in llm_calls
+    ]
+
     # Update state
     updated_state = {
         "events_list": events_list_events,
-        "log_llmcalls": [llmcall_log_entry],
+        "log_llmcalls": llmcall_log_entries,
         "dollars_expended": token_counter.dollars_spent_this_node,
         "budget_exceeded": token_counter.budget_exceeded
     }
@@ -2,16 +2,22 @@
 Node for findings events.
 """
 
+import asyncio
 import os
 from typing import Optional
 
+import duckdb
+import httpx
 import requests
 from langchain_core.runnables import RunnableConfig
 
 from scheduler_app.graph.state import AgentState
-from scheduler_app.infra.crawler import fetch_website
-from scheduler_app.services.parser import extract_events
-from scheduler_app.infra.database import persist_events_to_db
+from scheduler_app.services.ingest import (
+    aingest_date,
+    ingest_date,
+    ingest_date_streaming,
+    streaming_enabled,
+)
 
 
 def find_events(
@@ -22,18 +28,50 @@ def find_events(
     """
 
     try:
-        # Crawl web page
-        date, url, html = fetch_website(state.user_input_date)
+        # Crawl web page, parse output and persist events to database
+        if streaming_enabled():
+            ingest_date_streaming(
+                os.environ["DUCKDB_PATH"], state.user_input_date
+            )
+        else:
+            ingest_date(os.environ["DUCKDB_PATH"], state.user_input_date)
 
-        # Parse output
-        events = extract_events(html, url)
+    except requests.exceptions.RequestException as exc:
+        print(f"Failed to fetch event listing: {exc}")
+    except duckdb.IOException as exc:
+        # Another process (e.g. a backfill) holds the write lock; its
+        # snapshot is served
+        print(f"Failed to store event listing: {exc}")
 
-        # Persist events to database
-        persist_events_to_db(os.environ["DUCKDB_PATH"], events)
+    # Update state
+    updated_state = {}
+    return updated_state
 
-    except requests.exceptions.RequestException as exc:
+
+async def afind_events(
+        state: AgentState, config: Optional[RunnableConfig] = None
+    ) -> dict:
+    """
+    Async variant of find_events for graphs run via ainvoke.
+    """
+
+    try:
+        # Crawl web page, parse output and persist events to database
+        if streaming_enabled():
+            await asyncio.to_thread(
+                ingest_date_streaming,
+                os.environ["DUCKDB_PATH"],
+                state.user_input_date,
+            )
+        else:
+            await aingest_date(os.environ["DUCKDB_PATH"], state.user_input_date)
+
+    except (httpx.HTTPError, requests.exceptions.RequestException) as exc:
         print(f"Failed to fetch event listing: {exc}")
-        events = []
+    except duckdb.IOException as exc:
+        # Another process (e.g. a backfill) holds the write lock; its
+        # snapshot is served
+        print(f"Failed to store event listing: {exc}")
 
     # Update state
     updated_state = {}
@@ -5,7 +5,7 @@ Node for finding nearby restaurants.
 from datetime import datetime
 import json
 import os
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field
 from typing import Any, List, Optional
 from uuid import uuid4
 
@@ -14,7 +14,7 @@ from langchain_core.runnables import RunnableConfig
 from scheduler_app.graph.state import AgentState
 from scheduler_app.app_logging.log_llm import LLMCallEvent, log_llmcall
 from scheduler_app.graph.tools.web_search import search_web
-from scheduler_app.infra.llm import create_llm_client
+from scheduler_app.infra.llm import collect_list_items, create_llm_client
 
 
 MAX_RETRIES = 3
@@ -45,7 +45,7 @@ def find_restaurants(
         budget_exceeded=state.budget_exceeded
     )
     llm_client_with_tool = llm_client.bind_tools([search_web])
-    locator = llm_client_with_tool.with_structured_output(RestaurantSearchResult) # pyright: ignore[reportAttributeAccessIssue]
+    locator = llm_client_with_tool.with_structured_output(RestaurantSearchResult, include_raw=True) # pyright: ignore[reportAttributeAccessIssue]
 
     system_message = """
         You suggest places to eat and drink near an event venue that are proper
@@ -72,22 +72,11 @@ def find_restaurants(
         ("user", context),
     ]
 
-    suggestions: List[str] = []
-    attempts = 0
-    for attempt in range(MAX_RETRIES):
-        if token_counter.budget_exceeded:
-            break
-
-        attempts += 1
-        try:
-            llm_output: RestaurantSearchResult = locator.invoke(
-                msg, config={"callbacks": [token_counter]}
-            )
-            suggestions = llm_output.restaurants[:3]
-            break
-        except ValidationError:
-            if attempt == MAX_RETRIES - 1:
-                suggestions = []
+    # Valid suggestions of a partly invalid answer are kept; retries only ask
+    # for the missing ones
+    suggestions, attempts = collect_list_items(
+        locator, msg, "restaurants", 3, token_counter, MAX_RETRIES
+    )
 
     llmcall_log_entry: LLMCallEvent = log_llmcall(
         provider=os.environ["LLM_SERVICE"],
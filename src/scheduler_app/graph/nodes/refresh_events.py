@@ -0,0 +1,46 @@
+"""
+Node for refreshing stale events in the background.
+"""
+
+import os
+from typing import Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from scheduler_app.graph.state import AgentState
+from scheduler_app.graph.nodes.augment_events import augment_events
+from scheduler_app.graph.nodes.find_events import find_events
+from scheduler_app.infra.database import release_cursor
+from scheduler_app.services.refresh import get_refresher
+
+
+def _refresh(state: AgentState) -> None:
+    try:
+        find_events(state)
+        augment_events(state)
+    finally:
+        # The worker thread outlives the refresh
+        release_cursor(os.environ["DUCKDB_PATH"])
+
+
+def refresh_events(
+        state: AgentState, config: Optional[RunnableConfig] = None
+    ) -> dict:
+    """
+    Schedule crawling and augmenting the selected day in the background while
+    its stored events are served.
+    """
+
+    # The refresh runs against the spend of this run, not a fresh budget
+    refresh_state = AgentState(
+        user_input_date=state.user_input_date,
+        dollars_expended=state.dollars_expended,
+        budget_exceeded=state.budget_exceeded,
+    )
+    get_refresher().schedule(
+        state.user_input_date, lambda: _refresh(refresh_state)
+    )
+
+    # Update state
+    updated_state = {}
+    return updated_state
@@ -0,0 +1,166 @@
+"""
+Content-addressed archive of fetched html pages, compressed with zstd (or gzip
+if zstandard is not installed) and indexed by date and URL.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import zstandard
+except ImportError:    # optional dependency, see the "archive" extra
+    zstandard = None
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    select_date: str
+    page_url: str
+    content_hash: str
+    fetched_at: str
+    # Shared by the pages of one crawl of a day; None in older indexes
+    crawl_id: Optional[str] = None
+
+
+class HtmlArchive:
+    """
+    Stores each distinct page once under objects/<xx>/<sha256>.html.<codec>
+    and appends one line per fetch to index.jsonl.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.jsonl"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _object_path(self, content_hash: str, codec: str) -> Path:
+        return self.objects_dir / content_hash[:2] / f"{content_hash}.html.{codec}"
+
+    def put(
+            self,
+            select_date: str,
+            page_url: str,
+            html: str,
+            crawl_id: Optional[str] = None,
+        ) -> str:
+        """
+        Archive the page, fetched by the given crawl of the day, and return
+        its content hash.
+        """
+
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        if self.find_object(content_hash) is None:
+            if zstandard is not None:
+                codec, blob = "zst", zstandard.ZstdCompressor(level=10).compress(data)
+            else:
+                codec, blob = "gz", gzip.compress(data, compresslevel=9)
+
+            path = self._object_path(content_hash, codec)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, path)
+
+        entry = ArchiveEntry(
+            select_date=select_date,
+            page_url=page_url,
+            content_hash=content_hash,
+            fetched_at=datetime.now().isoformat(),
+            crawl_id=crawl_id,
+        )
+        with self._lock, self.index_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(asdict(entry)) + "\n")
+
+        return content_hash
+
+    def find_object(self, content_hash: str) -> Optional[Path]:
+        for codec in ("zst", "gz"):
+            path = self._object_path(content_hash, codec)
+            if path.exists():
+                return path
+        return None
+
+    def get(self, content_hash: str) -> str:
+        path = self.find_object(content_hash)
+        if path is None:
+            raise KeyError(f"Page not archived: {content_hash}")
+
+        blob = path.read_bytes()
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("Reading .zst pages requires zstandard.")
+            data = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            data = gzip.decompress(blob)
+        return data.decode("utf-8")
+
+    def entries(
+            self,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+        ) -> List[ArchiveEntry]:
+        """
+        Return the pages of the latest archived crawl of each date within the
+        range (the latest fetch per URL of that crawl), ordered by date.
+        Fetches archived without a crawl id count as one crawl.
+        """
+
+        if not self.index_path.exists():
+            return []
+
+        latest_crawl: dict[str, str] = {}
+        crawls: dict[tuple[str, str], dict[str, ArchiveEntry]] = {}
+        with self.index_path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = ArchiveEntry(**json.loads(line))
+                if start_date and entry.select_date < start_date:
+                    continue
+                if end_date and entry.select_date > end_date:
+                    continue
+                crawl = entry.crawl_id or ""
+                latest_crawl[entry.select_date] = crawl
+                crawls.setdefault((entry.select_date, crawl), {})[
+                    entry.page_url
+                ] = entry
+
+        return sorted(
+            (
+                entry
+                for select_date, crawl in latest_crawl.items()
+                for entry in crawls[(select_date, crawl)].values()
+            ),
+            key=lambda e: e.select_date,
+        )
+
+
+_archives: dict[str, HtmlArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_html_archive() -> HtmlArchive | None:
+    """
+    Return the archive configured via HTML_ARCHIVE_DIR, or None if archiving
+    is disabled.
+    """
+
+    root = os.getenv("HTML_ARCHIVE_DIR")
+    if not root:
+        return None
+
+    with _archives_lock:
+        if root not in _archives:
+            _archives[root] = HtmlArchive(root)
+        return _archives[root]
@@ -0,0 +1,97 @@
+"""
+Asynchronous crawler for the event website for Hamburg, built on httpx for
+use from async LangGraph nodes and bulk ingestion.
+"""
+
+import asyncio
+import time
+from typing import List
+from urllib.parse import urlsplit
+
+import httpx
+
+from scheduler_app.infra.crawler import (
+    MAX_REQUESTS_PER_HOST,
+    MAX_WORKERS,
+    MIN_REQUEST_INTERVAL,
+    REQUEST_TIMEOUT,
+    _headers,
+    build_url,
+)
+
+
+class AsyncCrawler:
+    """
+    Keep-alive httpx client with a bounded connection pool and per-host
+    politeness limits (concurrent requests and interval between request
+    starts). One instance should be shared by all requests of a run.
+    """
+
+    def __init__(
+            self,
+            max_connections: int = MAX_WORKERS,
+            max_per_host: int = MAX_REQUESTS_PER_HOST,
+            min_interval: float = MIN_REQUEST_INTERVAL,
+            transport: httpx.AsyncBaseTransport | None = None,
+        ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.min_interval = min_interval
+        self.transport = transport
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            headers={k: v for k, v in _headers().items() if v is not None},
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            transport=self.transport,
+        )
+        return self
+
+    async def __aexit__(self, *_):
+        await self.client.aclose()
+        return False
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    async def _wait_turn(self, host: str) -> None:
+        now = time.monotonic()
+        start = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def fetch_page(self, url: str) -> str:
+        """
+        Return the html for the url.
+        """
+
+        host = urlsplit(url).netloc
+        async with self._semaphore(host):
+            await self._wait_turn(host)
+            result = await self.client.get(url)
+        result.raise_for_status()
+        return result.text
+
+    async def fetch_pages(self, urls: List[str]) -> List[str]:
+        """
+        Return the html for every URL, fetched concurrently, in URL order.
+        """
+
+        return list(await asyncio.gather(*(self.fetch_page(u) for u in urls)))
+
+    async def fetch_website(self, select_date: str) -> tuple[str, str, str]:
+        """
+        Return date, url, and html from the website for the selected day.
+        """
+
+        url = build_url(select_date)
+        return select_date, url, await self.fetch_page(url)
@@ -0,0 +1,69 @@
+"""
+Layout of the cold event history: Hive-partitioned Parquet files under
+<root>/year=<YYYY>/month=<M>/, written and read by infra/database.py.
+"""
+
+import os
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+
+PARTITION_FILE = "events.parquet"
+
+
+def cold_storage_dir() -> Optional[Path]:
+    """
+    Return the directory configured via EVENTS_PARQUET_DIR, or None if cold
+    storage is disabled.
+    """
+
+    root = os.getenv("EVENTS_PARQUET_DIR")
+    return Path(root) if root else None
+
+
+def partition_dir(root: Path, year: int, month: int) -> Path:
+    return Path(root) / f"year={year}" / f"month={month}"
+
+
+def months_between(start_date: str, end_date: str) -> List[tuple[int, int]]:
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def stored_months(root: Path) -> List[tuple[int, int]]:
+    """
+    Return year and month of every partition holding data, in order.
+    """
+
+    months = []
+    for path in Path(root).glob(f"year=*/month=*/{PARTITION_FILE}"):
+        year = int(path.parent.parent.name.split("=", 1)[1])
+        month = int(path.parent.name.split("=", 1)[1])
+        months.append((year, month))
+    return sorted(months)
+
+
+def partition_files(
+        root: Optional[Path], start_date: str, end_date: str
+    ) -> List[str]:
+    """
+    Return the Parquet files of the partitions overlapping the date range.
+    """
+
+    if root is None:
+        return []
+
+    files = []
+    for year, month in months_between(start_date, end_date):
+        path = partition_dir(root, year, month) / PARTITION_FILE
+        if path.exists():
+            files.append(str(path))
+    return files
@@ -0,0 +1,55 @@
+"""
+Catalog of the crawled days: when each was fetched, from which listing, how
+many events it has and whether they are augmented.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+
+CRAWL_STATUS_TABLE = "crawl_status"
+
+CRAWL_STATUS_SCHEMA = """
+    event_date DATE PRIMARY KEY,
+    fetched_at TIMESTAMP NOT NULL,
+    source_hash TEXT,
+    augmented BOOLEAN NOT NULL,
+    event_count INTEGER NOT NULL
+"""
+
+DEFAULT_CRAWL_TTL = 86400    # seconds
+
+
+def crawl_ttl() -> Optional[float]:
+    """
+    Seconds after which a crawled day is crawled again, from the CRAWL_TTL
+    environment variable; None if it is empty, i.e. days never expire.
+    """
+
+    value = os.getenv("CRAWL_TTL", str(DEFAULT_CRAWL_TTL))
+    return float(value) if value else None
+
+
+@dataclass(frozen=True, slots=True)
+class CrawlStatus:
+    event_date: date
+    fetched_at: datetime
+    source_hash: Optional[str]
+    augmented: bool
+    event_count: int
+
+    def is_stale(
+            self, ttl: Optional[float], now: Optional[datetime] = None
+        ) -> bool:
+        """
+        Whether the day needs crawling or augmenting before it is served.
+        """
+
+        if not self.augmented:
+            return True
+        if ttl is None:
+            return False
+        age = (now or datetime.now()) - self.fetched_at
+        return age.total_seconds() > ttl
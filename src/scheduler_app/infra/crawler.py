@@ -4,18 +4,165 @@ https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalen
 """
 
 import os
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List
+from urllib.parse import urlencode, urlsplit
+
 import requests
-from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+
+from scheduler_app.infra.http_cache import get_http_cache
 
 
 BASE_URL = "https://www.hamburg-tourism.de"
 EXTENDED_URL = BASE_URL + "/sehen-erleben/veranstaltungen/veranstaltungskalender/"
 
+REQUEST_TIMEOUT = 30    # seconds
+MAX_WORKERS = 4    # concurrent fetches in fetch_range
+MAX_REQUESTS_PER_HOST = 2    # concurrent requests per host
+MIN_REQUEST_INTERVAL = 0.5    # seconds between request starts per host
 
-def fetch_website(select_date: str) -> tuple[str, str, str]:
+
+class HostThrottle:
     """
-    Return date, url, and html from the website for the selected day.
+    Politeness limits per host: a cap on concurrent requests and a minimum
+    interval between the start of two requests.
+    """
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(
+                    self.max_concurrent
+                )
+            return self._semaphores[host]
+
+    def _reserve_start(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+        return start - now
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc
+        with self._semaphore(host):
+            wait = self._reserve_start(host)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+
+
+_throttle = HostThrottle(MAX_REQUESTS_PER_HOST, MIN_REQUEST_INTERVAL)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session with a bounded connection pool.
+    """
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=MAX_REQUESTS_PER_HOST,
+                pool_maxsize=MAX_WORKERS,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _headers() -> dict[str, str | None]:
+    return {
+        "User-Agent": "Event Scheduler 1.0",
+        "From": os.getenv("CONTACT_EMAIL"),
+    }
+
+
+def _get(
+        url: str, extra_headers: dict[str, str] | None = None
+    ) -> requests.Response:
+    headers = _headers() | (extra_headers or {})
+    with _throttle.slot(url):
+        result = get_session().get(
+            url, headers=headers, timeout=REQUEST_TIMEOUT
+        )
+    result.raise_for_status()
+    return result
+
+
+def fetch_page(url: str) -> tuple[str, bool]:
+    """
+    Return the html for the url and whether it is unchanged since it was last
+    cached. With the HTTP cache enabled, fresh entries are served without a
+    request and stale ones are revalidated via a conditional GET.
+    """
+
+    cache = get_http_cache()
+    if cache is None:
+        return _get(url).text, False
+
+    entry = cache.get(url)
+    if entry is not None and cache.is_fresh(entry):
+        return entry.text, True
+
+    extra_headers = cache.conditional_headers(entry) if entry else None
+    result = _get(url, extra_headers)
+    if result.status_code == 304 and entry is not None:
+        cache.touch(entry)
+        return entry.text, True
+
+    cache.put(
+        url,
+        result.text,
+        etag=result.headers.get("ETag"),
+        last_modified=result.headers.get("Last-Modified"),
+    )
+    return result.text, False
+
+
+STREAM_CHUNK_SIZE = 16 * 1024    # bytes per chunk in stream_page
+
+
+@contextmanager
+def stream_page(
+        url: str, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[tuple[Iterator[bytes], str | None]]:
+    """
+    Yield an iterator over the raw body chunks of the url as they arrive,
+    together with the declared encoding. The host slot is held until the
+    body is consumed. The HTTP cache is bypassed.
+    """
+
+    with _throttle.slot(url):
+        with get_session().get(
+            url, headers=_headers(), timeout=REQUEST_TIMEOUT, stream=True
+        ) as result:
+            result.raise_for_status()
+            yield result.iter_content(chunk_size), result.encoding
+
+
+def build_url(select_date: str) -> str:
+    """
+    Return the URL of the event listing for the selected day.
     """
 
     normalized_date = datetime.strptime(
@@ -30,14 +177,100 @@ def fetch_website(select_date: str) -> tuple[str, str, str]:
         "filter[district]": "hh_all",    # entirety of Hamburg
         "filter[distance]": "15",    # distance of 15 km
     }
-    url = f"{EXTENDED_URL}?{urlencode(params, doseq=True)}"
+    return f"{EXTENDED_URL}?{urlencode(params, doseq=True)}"
 
-    headers = {
-        "User-Agent": "Event Scheduler 1.0",
-        "From": os.getenv("CONTACT_EMAIL"),
-    }
 
-    with requests.Session() as session:
-        result = session.get(url, headers=headers, timeout=30)
-        result.raise_for_status()
-        return select_date, url, result.text
+def fetch_website_cached(select_date: str) -> tuple[str, str, str, bool]:
+    """
+    Return date, url, html, and whether the listing is unchanged since it was
+    last fetched for the selected day.
+    """
+
+    url = build_url(select_date)
+    html, unchanged = fetch_page(url)
+    return select_date, url, html, unchanged
+
+
+def fetch_website(select_date: str) -> tuple[str, str, str]:
+    """
+    Return date, url, and html from the website for the selected day.
+    """
+
+    date, url, html, _ = fetch_website_cached(select_date)
+    return date, url, html
+
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """
+    Return all days from start_date to end_date (inclusive) as ISO strings.
+    """
+
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError(f"End date {end_date} is before start date {start_date}.")
+
+    return [
+        (start + timedelta(days=i)).isoformat()
+        for i in range((end - start).days + 1)
+    ]
+
+
+def fetch_range(
+        start_date: str, end_date: str, max_workers: int = MAX_WORKERS
+    ) -> List[tuple[str, str, str]]:
+    """
+    Return date, url, and html for every day from start_date to end_date
+    (inclusive), fetched concurrently. Days that fail to load are reported
+    and skipped; the result is ordered by date.
+    """
+
+    def fetch_or_none(select_date: str) -> tuple[str, str, str] | None:
+        try:
+            return fetch_website(select_date)
+        except requests.exceptions.RequestException as exc:
+            print(f"Failed to fetch event listing for {select_date}: {exc}")
+            return None
+
+    dates = date_range(start_date, end_date)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(fetch_or_none, dates))
+
+    return [r for r in results if r is not None]
+
+
+def fetch_pages(
+        urls: List[str], max_workers: int = MAX_WORKERS
+    ) -> List[str]:
+    """
+    Return the html for every URL, fetched concurrently over the shared
+    session, in the order of the URLs.
+    """
+
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [html for html, _ in executor.map(fetch_page, urls)]
+
+
+def fetch_pages_or_none(
+        urls: List[str], max_workers: int = MAX_WORKERS
+    ) -> List[str | None]:
+    """
+    Return the html for every URL like fetch_pages, with None for the pages
+    that fail to load, which are reported.
+    """
+
+    def fetch_or_none(url: str) -> str | None:
+        try:
+            return fetch_page(url)[0]
+        except requests.exceptions.RequestException as exc:
+            print(f"Failed to fetch result page {url}: {exc}")
+            return None
+
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch_or_none, urls))
@@ -2,17 +2,102 @@
 Database access for loading and persisting events.
 """
 
+import atexit
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional, Sequence
 
 import duckdb
 
-from scheduler_app.models.event import Event
+from scheduler_app.infra.cold_storage import (
+    PARTITION_FILE,
+    cold_storage_dir,
+    partition_dir,
+    partition_files,
+    stored_months,
+)
+from scheduler_app.infra.crawl_status import (
+    CRAWL_STATUS_SCHEMA,
+    CRAWL_STATUS_TABLE,
+    CrawlStatus,
+)
+from scheduler_app.infra.duckdb_params import json_list, unnest_json
+from scheduler_app.infra.event_cache import EventCache, event_cache_size
+from scheduler_app.infra.search_index import (
+    SEARCH_TABLE_SCHEMAS,
+    index_events,
+    rebuild_index,
+    search,
+    unindex_events,
+)
+from scheduler_app.models.event import EVENT_COLUMNS, Event, EventBatch
+
+try:
+    import pyarrow
+except ImportError:    # optional dependency, see the "arrow" extra
+    pyarrow = None
 
 
 EVENTS_TABLE = "events"
+EVENT_HASHES_TABLE = "event_hashes"
+LISTING_HASHES_TABLE = "listing_hashes"
+AUGMENTATION_CACHE_TABLE = "augmentation_cache"
+
+_TABLE_SCHEMAS = {
+    EVENTS_TABLE: """
+        event_id TEXT PRIMARY KEY,
+        event_name TEXT NOT NULL,
+        event_date DATE NOT NULL,
+        event_time TEXT NOT NULL,
+        event_venue TEXT,
+        event_type TEXT,
+        event_description TEXT,
+        event_url TEXT
+    """,
+    # Content hash of each event as crawled and as last augmented, and where
+    # its type came from (see TYPE_SOURCES)
+    EVENT_HASHES_TABLE: """
+        event_id TEXT PRIMARY KEY,
+        event_date DATE NOT NULL,
+        content_hash TEXT NOT NULL,
+        augmented_hash TEXT,
+        type_source TEXT
+    """,
+    # Hash of the raw html of each crawled listing page
+    LISTING_HASHES_TABLE: """
+        event_date DATE NOT NULL,
+        page_url TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        fetched_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (event_date, page_url)
+    """,
+    # LLM augmentation per normalized name, venue and teaser of an event
+    AUGMENTATION_CACHE_TABLE: """
+        cache_key TEXT PRIMARY KEY,
+        event_type TEXT NOT NULL,
+        event_description TEXT,
+        hits INTEGER NOT NULL,
+        updated_at TIMESTAMP NOT NULL
+    """,
+    # Freshness of each crawled day, see infra.crawl_status
+    CRAWL_STATUS_TABLE: CRAWL_STATUS_SCHEMA,
+    **SEARCH_TABLE_SCHEMAS,
+}
+
+# Columns added to tables after their first release, for older databases
+_ADDED_COLUMNS = (
+    (EVENT_HASHES_TABLE, "type_source TEXT"),
+)
+
+# Origins of event types: detail page, LLM, augmentation cache, classifier
+TYPE_SOURCES = ("details", "llm", "cache", "classifier")
 
-_ALLOWED_TABLES = frozenset({EVENTS_TABLE})
+_ALLOWED_TABLES = frozenset(_TABLE_SCHEMAS)
 
 
 def _validate_table_name(table_name: str) -> None:
@@ -34,54 +119,1058 @@ def ensure_table(con: duckdb.DuckDBPyConnection, table_name: str) -> None:
     if exists is None:
         con.execute(
             f"""
-            CREATE TABLE {table_name} (
-                event_id TEXT PRIMARY KEY,
-                event_name TEXT NOT NULL,
-                event_date DATE NOT NULL,
-                event_time TEXT NOT NULL,
-                event_venue TEXT,
-                event_type TEXT,
-                event_description TEXT,
-                event_url TEXT
-            )
+            CREATE TABLE IF NOT EXISTS {table_name} ({_TABLE_SCHEMAS[table_name]})
             """
         )
 
 
+class _ThreadCursor:
+    """
+    A thread's cursor, closed when the thread ends and its thread-local
+    storage is released.
+    """
+
+    def __init__(self, cursor: duckdb.DuckDBPyConnection):
+        self.cursor = cursor
+
+    def close(self) -> None:
+        cursor, self.cursor = self.cursor, None
+        if cursor is not None:
+            try:
+                cursor.close()
+            except duckdb.Error:
+                pass
+
+    def __del__(self):
+        self.close()
+
+
+class ConnectionManager:
+    """
+    Long-lived connection to one database file. The schema is created once
+    when the manager is opened; every thread gets its own cursor on the
+    shared connection, as DuckDB cursors must not be used concurrently, which
+    is closed when the thread ends. Reads of single dates go through the
+    manager's event cache. Read-only managers (for snapshots) leave the
+    schema untouched.
+
+    A read-write manager holds the write lock on the file, which DuckDB gives
+    to a single process, until it is closed; processes that sit idle between
+    writes release it with release_connection.
+    """
+
+    def __init__(self, db_path: str, read_only: bool = False):
+        self.db_path = db_path
+        self.read_only = read_only
+        if not read_only:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._con = duckdb.connect(db_path, read_only=read_only)
+        self._local = threading.local()
+        self._cursors: weakref.WeakSet[_ThreadCursor] = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.event_cache = EventCache(event_cache_size())
+
+        if not read_only:
+            for table_name in _TABLE_SCHEMAS:
+                ensure_table(self._con, table_name)
+            for table_name, column in _ADDED_COLUMNS:
+                self._con.execute(
+                    f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {column}"
+                )
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        holder = getattr(self._local, "cursor", None)
+        if holder is None or holder.cursor is None:
+            with self._lock:
+                holder = _ThreadCursor(self._con.cursor())
+                self._cursors.add(holder)
+            self._local.cursor = holder
+        return holder.cursor
+
+    def release_cursor(self) -> None:
+        """
+        Close the cursor of the calling thread, if it has one.
+        """
+
+        holder = getattr(self._local, "cursor", None)
+        if holder is not None:
+            holder.close()
+            self._local.cursor = None
+
+    def in_use(self) -> bool:
+        """
+        Whether any thread has an open cursor.
+        """
+
+        with self._lock:
+            return any(holder.cursor is not None for holder in self._cursors)
+
+    def close(self) -> None:
+        with self._lock:
+            for holder in list(self._cursors):
+                holder.close()
+        self._local = threading.local()
+        self.event_cache.clear()
+        self._con.close()
+
+
+_managers: dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """
+    Return the process-wide connection manager for the database file.
+    """
+
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(str(db_path))
+        return _managers[key]
+
+
+def release_cursor(db_path: str) -> None:
+    """
+    Close the calling thread's cursor on the database, for long-lived worker
+    threads that are done with it.
+    """
+
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+    if manager is not None:
+        manager.release_cursor()
+
+
+def release_connection(db_path: str) -> bool:
+    """
+    Close the process's read-write connection to the database, so other
+    processes can take its write lock, unless another thread still has a
+    cursor on it. Returns whether the connection is released; it is opened
+    again by the next query.
+    """
+
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            return True
+        manager.release_cursor()
+        if manager.in_use():
+            return False
+        del _managers[key]
+    manager.close()
+    return True
+
+
+SNAPSHOT_RETRY_INTERVAL = 30    # seconds before retrying a locked database
+
+_snapshots: dict[str, tuple[tuple[int, int], ConnectionManager]] = {}
+_retired_snapshots: List[ConnectionManager] = []
+_locked_until: dict[str, float] = {}
+
+
+def snapshot_path(db_path: str) -> str:
+    """
+    Return the path of the read-only snapshot of the database: the
+    DUCKDB_SNAPSHOT_PATH environment variable, or <name>.snapshot.duckdb next
+    to the database.
+    """
+
+    configured = os.getenv("DUCKDB_SNAPSHOT_PATH")
+    if configured:
+        return configured
+    path = Path(db_path)
+    return str(path.with_name(f"{path.stem}.snapshot{path.suffix or '.duckdb'}"))
+
+
+def _snapshot_manager(path: str) -> ConnectionManager:
+    # A newly published snapshot replaces the file; readers switch to it on
+    # their next query, while queries on the old one finish undisturbed. A
+    # replaced manager is closed once no thread has a cursor on it; the
+    # calling thread is done with its own
+    stat = os.stat(path)
+    version = (stat.st_ino, stat.st_mtime_ns)
+    with _managers_lock:
+        current = _snapshots.get(path)
+        if current is None or current[0] != version:
+            if current is not None:
+                current[1].release_cursor()
+                _retired_snapshots.append(current[1])
+            current = (version, ConnectionManager(path, read_only=True))
+            _snapshots[path] = current
+            for manager in list(_retired_snapshots):
+                if not manager.in_use():
+                    _retired_snapshots.remove(manager)
+                    manager.close()
+        return current[1]
+
+
+def get_reader(db_path: str) -> ConnectionManager:
+    """
+    Return the manager to read from: the database itself, or, while another
+    process holds its write lock (DuckDB allows a single writing process),
+    the latest snapshot published by that process.
+    """
+
+    key = str(Path(db_path).resolve())
+    if time.monotonic() >= _locked_until.get(key, 0.0):
+        try:
+            return get_connection_manager(db_path)
+        except duckdb.IOException:
+            _locked_until[key] = time.monotonic() + SNAPSHOT_RETRY_INTERVAL
+
+    snapshot = snapshot_path(db_path)
+    if not Path(snapshot).exists():
+        raise RuntimeError(
+            f"Database {db_path} is locked by another process and no snapshot "
+            f"exists at {snapshot}."
+        )
+    return _snapshot_manager(snapshot)
+
+
+def publish_snapshot(db_path: str, path: Optional[str] = None) -> str:
+    """
+    Copy the committed state of the database to the snapshot file that
+    readers in other processes open read-only, and return its path. The copy
+    is written next to the snapshot and swapped in atomically.
+    """
+
+    path = path or snapshot_path(db_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    Path(tmp_path).unlink(missing_ok=True)
+
+    con = _cursor(db_path)
+    con.execute(f"ATTACH {_sql_literal(tmp_path)} AS _snapshot")
+    try:
+        catalog = con.execute("SELECT current_database()").fetchone()[0]
+        con.execute(f"COPY FROM DATABASE {catalog} TO _snapshot")
+    finally:
+        con.execute("DETACH _snapshot")
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def close_connections() -> None:
+    with _managers_lock:
+        for manager in _managers.values():
+            manager.close()
+        _managers.clear()
+        for _, manager in _snapshots.values():
+            manager.close()
+        _snapshots.clear()
+        for manager in _retired_snapshots:
+            manager.close()
+        _retired_snapshots.clear()
+
+
+atexit.register(close_connections)
+
+
+def _cursor(db_path: str) -> duckdb.DuckDBPyConnection:
+    return get_connection_manager(db_path).cursor()
+
+
+def _date_key(value) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _invalidate_dates(db_path: str, dates: Iterable) -> None:
+    get_connection_manager(db_path).event_cache.invalidate(
+        {_date_key(d) for d in dates}
+    )
+
+
 def init_db(db_path) -> None:
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    get_connection_manager(db_path)
+
+
+BULK_UPSERT_THRESHOLD = 256    # events from which persisting is set-based
+
+# Statements run on every ingestion or graph run, built once
+_ON_CONFLICT_COALESCE = f"""
+    ON CONFLICT (event_id) DO UPDATE SET
+        event_type = COALESCE(EXCLUDED.event_type, {EVENTS_TABLE}.event_type),
+        event_description = COALESCE(EXCLUDED.event_description, {EVENTS_TABLE}.event_description),
+        event_url = COALESCE(EXCLUDED.event_url, {EVENTS_TABLE}.event_url)
+    """
+
+_UPSERT_EVENTS = f"""
+    INSERT INTO {EVENTS_TABLE}
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    {_ON_CONFLICT_COALESCE}"""
+
+_EVENT_COLUMN_TYPES = ("TEXT", "TEXT", "DATE", "TEXT", "TEXT", "TEXT", "TEXT", "TEXT")
+
+_BULK_UPSERT_EVENTS_FROM_ARROW = f"""
+    INSERT INTO {EVENTS_TABLE}
+    SELECT {", ".join(EVENT_COLUMNS)} FROM _event_batch
+    {_ON_CONFLICT_COALESCE}"""
+
+_BULK_UPSERT_EVENTS_FROM_LISTS = f"""
+    INSERT INTO {EVENTS_TABLE}
+    SELECT {", ".join(unnest_json(t) for t in _EVENT_COLUMN_TYPES)}
+    {_ON_CONFLICT_COALESCE}"""
+
+_SELECT_EVENTS_FOR_DATE = f"""
+    SELECT {", ".join(EVENT_COLUMNS)}
+      FROM {EVENTS_TABLE}
+     WHERE event_date = CAST(? AS DATE)"""
+
+# Rows are kept in event_date order (see compact_events), so the min/max
+# zone maps of DuckDB's row groups let date filters skip most of the table
+_EVENTS_ORDER = "event_date, event_time"
+
+_COUNT_EVENTS_FOR_DATE = f"""
+    SELECT count(*)
+      FROM {EVENTS_TABLE}
+     WHERE event_date = CAST(? AS DATE)"""
+
+
+def _merge_duplicate_rows(events: List[Event]) -> List[tuple]:
+    # A set-based upsert may touch each row only once; merge repeated events
+    # the way consecutive row-wise upserts would
+    rows: dict[str, tuple] = {}
+    for event in events:
+        row = event.to_db_tuple()
+        previous = rows.get(row[0])
+        if previous is not None:
+            row = previous[:5] + tuple(
+                new if new is not None else old
+                for new, old in zip(row[5:], previous[5:])
+            )
+        rows[row[0]] = row
+    return list(rows.values())
+
+
+def bulk_upsert_events(con: duckdb.DuckDBPyConnection, events: List[Event]) -> None:
+    """
+    Upsert the events in one set-based statement, from an Arrow table if
+    pyarrow is installed and from unnested JSON column lists otherwise.
+    Existing rows keep their type, description and URL where the new values
+    are None.
+    """
 
-    with duckdb.connect(db_path) as con:
-        ensure_table(con, EVENTS_TABLE)
+    rows = sorted(_merge_duplicate_rows(events), key=lambda r: (r[2], str(r[3])))
+    columns = [list(c) for c in zip(*rows)]
+    # Times may be datetime.time objects; the column is text
+    columns[3] = [None if t is None else str(t) for t in columns[3]]
+
+    if pyarrow is None:
+        con.execute(
+            _BULK_UPSERT_EVENTS_FROM_LISTS, [json_list(c) for c in columns]
+        )
+        return
+
+    schema = pyarrow.schema([
+        (name, pyarrow.date32() if sql_type == "DATE" else pyarrow.string())
+        for name, sql_type in zip(EVENT_COLUMNS, _EVENT_COLUMN_TYPES)
+    ])
+    con.register("_event_batch", pyarrow.table(columns, schema=schema))
+    try:
+        con.execute(_BULK_UPSERT_EVENTS_FROM_ARROW)
+    finally:
+        con.unregister("_event_batch")
+
+
+def row_upsert_events(con: duckdb.DuckDBPyConnection, events: List[Event]) -> None:
+    con.executemany(_UPSERT_EVENTS, [e.to_db_tuple() for e in events])
 
 
 def persist_events_to_db(db_path: str, events: List[Event]) -> None:
-    _validate_table_name(EVENTS_TABLE)
-    with duckdb.connect(db_path) as con:
+    if not events:
+        return
+    con = _cursor(db_path)
+    try:
+        if len(events) >= BULK_UPSERT_THRESHOLD:
+            bulk_upsert_events(con, events)
+        else:
+            row_upsert_events(con, events)
+        index_events(con, EVENTS_TABLE, {e.event_id for e in events})
+    finally:
+        _invalidate_dates(db_path, (e.event_date for e in events))
+
+
+def _validate_columns(columns: Optional[Sequence[str]]) -> tuple[str, ...]:
+    if columns is None:
+        return EVENT_COLUMNS
+    unknown = [c for c in columns if c not in EVENT_COLUMNS]
+    if unknown or not columns:
+        raise ValueError(f"Unknown event columns: {unknown!r}")
+    return tuple(columns)
+
+
+def _sql_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _read_parquet(files: Sequence[str]) -> str:
+    # Partition values are not added as columns; event_date holds them
+    paths = ", ".join(_sql_literal(str(f)) for f in files)
+    return f"read_parquet([{paths}], hive_partitioning = false)"
+
+
+@lru_cache(maxsize=32)
+def _select_between(
+        columns: tuple[str, ...], cold_files: tuple[str, ...] = ()
+    ) -> str:
+    in_range = "event_date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)"
+    source = EVENTS_TABLE
+
+    # Rows of cold partitions, unless the date was re-crawled since
+    if cold_files:
+        source = f"""(
+        SELECT * FROM {EVENTS_TABLE} WHERE {in_range}
+        UNION ALL
+        SELECT * FROM {_read_parquet(cold_files)}
+         WHERE {in_range}
+           AND event_id NOT IN (
+               SELECT event_id FROM {EVENTS_TABLE} WHERE {in_range}))"""
+
+    return f"""
+    SELECT {", ".join(columns)}
+      FROM {source}
+     WHERE {in_range}
+     ORDER BY {_EVENTS_ORDER}"""
+
+
+def load_events_from_db(
+        db_path: str,
+        select_date: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[tuple]:
+    """
+    Return the events of the day, including those exported to cold storage.
+    Full rows are served from the event cache of the connection manager where
+    possible.
+    """
+
+    if columns is not None:
+        return load_events_between(db_path, select_date, select_date, columns)
+
+    reader = get_reader(db_path)
+    cache = reader.event_cache
+    rows = cache.get(select_date)
+    if rows is None:
+        generation = cache.generation()
+        if partition_files(cold_storage_dir(), select_date, select_date):
+            rows = load_events_between(db_path, select_date, select_date)
+        else:
+            rows = reader.cursor().execute(
+                _SELECT_EVENTS_FOR_DATE, [select_date]
+            ).fetchall()
+        cache.put(select_date, rows, generation)
+    return list(rows)
+
+
+def load_events_between(
+        db_path: str,
+        start_date: str,
+        end_date: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[tuple]:
+    """
+    Return the events from start_date to end_date (inclusive) ordered by date
+    and time, restricted to the given columns (all by default). Partitions in
+    cold storage overlapping the range are scanned along with the table.
+    """
+
+    statement = _select_between(
+        _validate_columns(columns),
+        tuple(partition_files(cold_storage_dir(), start_date, end_date)),
+    )
+    return get_reader(db_path).cursor().execute(
+        statement, {"start": start_date, "end": end_date}
+    ).fetchall()
+
+
+def _require_cold_storage(root: Optional[str]) -> Path:
+    root = root or cold_storage_dir()
+    if root is None:
+        raise RuntimeError("EVENTS_PARQUET_DIR is not set.")
+    return Path(root)
 
-        ensure_table(con, EVENTS_TABLE)
 
-        con.executemany(
+def _write_partition(
+        con: duckdb.DuckDBPyConnection, target: Path, query: str, params: dict
+    ) -> int:
+    # Written next to the partition file and swapped in, so readers never see
+    # a partial file
+    target.mkdir(parents=True, exist_ok=True)
+    tmp_path = target / f"{PARTITION_FILE}.{threading.get_ident()}.tmp"
+    (count,) = con.execute(f"SELECT count(*) FROM ({query})", params).fetchone()
+    if count == 0:
+        (target / PARTITION_FILE).unlink(missing_ok=True)
+        return 0
+
+    con.execute(
+        f"COPY ({query} ORDER BY {_EVENTS_ORDER}) "
+        f"TO {_sql_literal(str(tmp_path))} (FORMAT PARQUET)",
+        params,
+    )
+    os.replace(tmp_path, target / PARTITION_FILE)
+    return count
+
+
+def export_events_to_parquet(
+        db_path: str, before_date: str, root: Optional[str] = None
+    ) -> int:
+    """
+    Move the events dated before before_date from the database to cold
+    storage, merged into one Parquet file per year and month, and return the
+    number of events moved. Event hashes stay in the database.
+    """
+
+    root = _require_cold_storage(root)
+    con = _cursor(db_path)
+    months = con.execute(
+        f"""
+        SELECT DISTINCT year(event_date), month(event_date)
+          FROM {EVENTS_TABLE}
+         WHERE event_date < CAST(? AS DATE)
+         ORDER BY 1, 2""",
+        [before_date],
+    ).fetchall()
+
+    for year, month in months:
+        target = partition_dir(root, year, month)
+        hot = f"""
+            SELECT * FROM {EVENTS_TABLE}
+             WHERE year(event_date) = $year AND month(event_date) = $month
+               AND event_date < CAST($before AS DATE)"""
+        existing = target / PARTITION_FILE
+        if existing.exists():
+            hot += f"""
+            UNION ALL
+            SELECT * FROM {_read_parquet([existing])}
+             WHERE event_id NOT IN (SELECT event_id FROM {EVENTS_TABLE})"""
+        _write_partition(
+            con, target, hot,
+            {"year": year, "month": month, "before": before_date},
+        )
+
+    exported_ids = [
+        event_id for (event_id,) in con.execute(
+            f"SELECT event_id FROM {EVENTS_TABLE} WHERE event_date < CAST(? AS DATE)",
+            [before_date],
+        ).fetchall()
+    ]
+    # Search covers the events in the database only
+    unindex_events(con, exported_ids)
+    con.execute(
+        f"DELETE FROM {EVENTS_TABLE} WHERE event_date < CAST(? AS DATE)",
+        [before_date],
+    )
+    get_connection_manager(db_path).event_cache.clear()
+    return len(exported_ids)
+
+
+def import_events_from_parquet(
+        db_path: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        root: Optional[str] = None,
+    ) -> int:
+    """
+    Move the events in the date range (all by default) from cold storage back
+    into the database and return their number. Events stored in the database
+    take precedence over their cold copies.
+    """
+
+    root = _require_cold_storage(root)
+    con = _cursor(db_path)
+    start_date = start_date or "0001-01-01"
+    end_date = end_date or "9999-12-31"
+    params = {"start": start_date, "end": end_date}
+    in_range = "event_date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)"
+
+    count = 0
+    for year, month in stored_months(root):
+        target = partition_dir(root, year, month)
+        source = _read_parquet([target / PARTITION_FILE])
+
+        (moved,) = con.execute(
+            f"SELECT count(*) FROM {source} WHERE {in_range}", params
+        ).fetchone()
+        if moved == 0:
+            continue
+
+        con.execute(
             f"""
             INSERT INTO {EVENTS_TABLE}
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT (event_id) DO UPDATE SET
-                event_type = COALESCE(EXCLUDED.event_type, {EVENTS_TABLE}.event_type),
-                event_description = COALESCE(EXCLUDED.event_description, {EVENTS_TABLE}.event_description),
-                event_url = COALESCE(EXCLUDED.event_url, {EVENTS_TABLE}.event_url)
-            """,
-            [e.to_db_tuple() for e in events],
+            SELECT * FROM {source} WHERE {in_range}
+            ON CONFLICT (event_id) DO NOTHING""",
+            params,
+        )
+        index_events(con, EVENTS_TABLE, [
+            event_id for (event_id,) in con.execute(
+                f"SELECT event_id FROM {source} WHERE {in_range}", params
+            ).fetchall()
+        ])
+        _write_partition(
+            con, target, f"SELECT * FROM {source} WHERE NOT ({in_range})", params
         )
+        count += moved
+
+    get_connection_manager(db_path).event_cache.clear()
+    return count
 
 
-def load_events_from_db(db_path: str, select_date: str) -> List[tuple]:
-    _validate_table_name(EVENTS_TABLE)
-    with duckdb.connect(db_path) as con:
-        result = con.execute(
+def compact_events(db_path: str) -> int:
+    """
+    Rewrite the events table in event_date order, so that each row group
+    covers a narrow date range, and return the number of rows. Upserts append
+    in arrival order; run this after backfills.
+    """
+
+    con = _cursor(db_path)
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(
+            f"CREATE TABLE {EVENTS_TABLE}_compact ({_TABLE_SCHEMAS[EVENTS_TABLE]})"
+        )
+        con.execute(
             f"""
-            SELECT *
-              FROM {EVENTS_TABLE}
-             WHERE event_date = CAST(? AS DATE)""",
-            [select_date],
+            INSERT INTO {EVENTS_TABLE}_compact
+            SELECT * FROM {EVENTS_TABLE} ORDER BY {_EVENTS_ORDER}"""
+        )
+        con.execute(f"DROP TABLE {EVENTS_TABLE}")
+        con.execute(
+            f"ALTER TABLE {EVENTS_TABLE}_compact RENAME TO {EVENTS_TABLE}"
+        )
+        con.execute("COMMIT")
+    except duckdb.Error:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        get_connection_manager(db_path).event_cache.clear()
+
+    con.execute("CHECKPOINT")
+    (count,) = con.execute(f"SELECT count(*) FROM {EVENTS_TABLE}").fetchone()
+    return count
+
+
+def load_event_batch(db_path: str, select_date: str) -> EventBatch:
+    """
+    Load the events of the day as a column-wise batch, through the event
+    cache.
+    """
+
+    return EventBatch.from_rows(load_events_from_db(db_path, select_date))
+
+
+def count_events_for_date(db_path: str, select_date: str) -> int:
+    reader = get_reader(db_path)
+    rows = reader.event_cache.get(select_date)
+    if rows is not None:
+        return len(rows)
+    if partition_files(cold_storage_dir(), select_date, select_date):
+        # Only the ids are read from the Parquet files
+        return len(load_events_between(
+            db_path, select_date, select_date, columns=["event_id"]
+        ))
+
+    (count,) = reader.cursor().execute(
+        _COUNT_EVENTS_FOR_DATE, [select_date]
+    ).fetchone()
+    return count
+
+
+def _delete_cold_events(
+        con: duckdb.DuckDBPyConnection, event_ids: List[str]
+    ) -> List[tuple]:
+    # Partitions holding any of the events are rewritten without them;
+    # returns the dates of the events deleted
+    root = cold_storage_dir()
+    if root is None:
+        return []
+
+    params = {"ids": json_list(event_ids)}
+    in_ids = f"event_id IN (SELECT {unnest_json('TEXT', '$ids')})"
+    dates = []
+    for year, month in stored_months(root):
+        target = partition_dir(root, year, month)
+        source = _read_parquet([target / PARTITION_FILE])
+        found = con.execute(
+            f"SELECT DISTINCT event_date FROM {source} WHERE {in_ids}", params
         ).fetchall()
-    return result
+        if found:
+            _write_partition(
+                con, target, f"SELECT * FROM {source} WHERE NOT ({in_ids})",
+                params,
+            )
+            dates += found
+    return dates
+
+
+def delete_events_from_db(db_path: str, event_ids: Iterable[str]) -> None:
+    """
+    Delete the events with their hashes from the database and from cold
+    storage.
+    """
+
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+
+    con = _cursor(db_path)
+    dates = con.execute(
+        f"""
+        SELECT DISTINCT event_date
+          FROM {EVENTS_TABLE}
+         WHERE event_id IN (SELECT {unnest_json("TEXT")})""",
+        [json_list(event_ids)],
+    ).fetchall()
+    dates += _delete_cold_events(con, event_ids)
+
+    for table_name in (EVENTS_TABLE, EVENT_HASHES_TABLE):
+        con.execute(
+            f"DELETE FROM {table_name} "
+            f"WHERE event_id IN (SELECT {unnest_json('TEXT')})",
+            [json_list(event_ids)],
+        )
+    unindex_events(con, event_ids)
+    _invalidate_dates(db_path, (d for (d,) in dates))
+
+
+SEARCH_LIMIT = 20    # events returned by search_events
+
+
+def search_events(
+        db_path: str,
+        query: str,
+        date_range: Optional[tuple[str, str]] = None,
+        limit: int = SEARCH_LIMIT,
+    ) -> List[tuple[Event, float]]:
+    """
+    Return the events whose name, description or venue match the query,
+    ranked by BM25 score, optionally restricted to a (start, end) date range.
+    """
+
+    start_date, end_date = date_range or ("0001-01-01", "9999-12-31")
+    rows = search(
+        get_reader(db_path).cursor(),
+        EVENTS_TABLE,
+        EVENT_COLUMNS,
+        query,
+        start_date,
+        end_date,
+        limit,
+    )
+    return [(Event(*row[:-1]), row[-1]) for row in rows]
+
+
+def rebuild_search_index(db_path: str) -> int:
+    """
+    Index all stored events from scratch and return their number, e.g. for
+    databases created before the search index existed.
+    """
+
+    return rebuild_index(_cursor(db_path), EVENTS_TABLE)
+
+
+def load_listing_hash(
+        db_path: str, select_date: str, page_url: str
+    ) -> str | None:
+    row = _cursor(db_path).execute(
+        f"""
+        SELECT content_hash
+          FROM {LISTING_HASHES_TABLE}
+         WHERE event_date = CAST(? AS DATE)
+           AND page_url = ?""",
+        [select_date, page_url],
+    ).fetchone()
+    return row[0] if row else None
+
+
+def save_listing_hash(
+        db_path: str, select_date: str, page_url: str, content_hash: str
+    ) -> None:
+    _cursor(db_path).execute(
+        f"""
+        INSERT INTO {LISTING_HASHES_TABLE}
+        VALUES (CAST(? AS DATE), ?, ?, now())
+        ON CONFLICT (event_date, page_url) DO UPDATE SET
+            content_hash = EXCLUDED.content_hash,
+            fetched_at = EXCLUDED.fetched_at
+        """,
+        [select_date, page_url, content_hash],
+    )
+
+
+def load_event_hashes(db_path: str, select_date: str) -> dict[str, str]:
+    """
+    Return the content hash per event id of the events stored for the day.
+    """
+
+    rows = _cursor(db_path).execute(
+        f"""
+        SELECT event_id, content_hash
+          FROM {EVENT_HASHES_TABLE}
+         WHERE event_date = CAST(? AS DATE)""",
+        [select_date],
+    ).fetchall()
+    return dict(rows)
+
+
+def save_event_hashes(
+        db_path: str,
+        events: List[Event],
+        content_hashes: dict[str, str] | None = None,
+    ) -> None:
+    """
+    Store the content hashes of the events, taken from content_hashes where
+    given and computed from the events otherwise. Types the events have at
+    this point come from their detail pages.
+    """
+
+    if not events:
+        return
+    content_hashes = content_hashes or {}
+
+    _cursor(db_path).executemany(
+        f"""
+        INSERT INTO {EVENT_HASHES_TABLE}
+            (event_id, event_date, content_hash, type_source)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (event_id) DO UPDATE SET
+            event_date = EXCLUDED.event_date,
+            content_hash = EXCLUDED.content_hash,
+            type_source = COALESCE(
+                EXCLUDED.type_source, {EVENT_HASHES_TABLE}.type_source)
+        """,
+        [
+            (
+                e.event_id,
+                e.event_date,
+                content_hashes.get(e.event_id) or e.content_hash(),
+                "details" if e.event_type is not None else None,
+            )
+            for e in events
+        ],
+    )
+
+
+_PENDING_AUGMENTATION = f"""
+    SELECT e.event_id
+      FROM {EVENTS_TABLE} e
+      LEFT JOIN {EVENT_HASHES_TABLE} h USING (event_id)
+     WHERE e.event_date = CAST($date AS DATE)
+       AND (e.event_type IS NULL
+            OR h.augmented_hash IS DISTINCT FROM h.content_hash)"""
+
+
+def load_pending_augmentation_ids(db_path: str, select_date: str) -> set[str]:
+    """
+    Return the ids of the day's events that lack an event type or changed
+    since they were last augmented.
+    """
+
+    rows = get_reader(db_path).cursor().execute(
+        _PENDING_AUGMENTATION, {"date": select_date}
+    ).fetchall()
+    return {event_id for (event_id,) in rows}
+
+
+def load_detail_typed_ids(db_path: str, select_date: str) -> set[str]:
+    """
+    Return the ids of the day's events that got their type from their detail
+    page when first crawled and were never augmented since.
+    """
+
+    rows = get_reader(db_path).cursor().execute(
+        f"""
+        SELECT event_id
+          FROM {EVENT_HASHES_TABLE}
+         WHERE event_date = CAST(? AS DATE)
+           AND type_source = 'details'
+           AND augmented_hash IS NULL""",
+        [select_date],
+    ).fetchall()
+    return {event_id for (event_id,) in rows}
+
+
+def mark_events_augmented(
+        db_path: str,
+        event_ids: Iterable[str],
+        type_source: Optional[str] = None,
+    ) -> None:
+    """
+    Mark the events as augmented in their current content and, if given,
+    record where their type came from (one of TYPE_SOURCES).
+    """
+
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+    if type_source is not None and type_source not in TYPE_SOURCES:
+        raise ValueError(f"Unknown type source: {type_source!r}")
+
+    _cursor(db_path).execute(
+        f"""
+        UPDATE {EVENT_HASHES_TABLE}
+           SET augmented_hash = content_hash,
+               type_source = COALESCE(?, type_source)
+         WHERE event_id IN (SELECT {unnest_json("TEXT")})""",
+        [type_source, json_list(event_ids)],
+    )
+
+
+_TYPED_BY_LLM = f"""
+      FROM {EVENTS_TABLE} e
+      JOIN {EVENT_HASHES_TABLE} h USING (event_id)
+     WHERE e.event_type IS NOT NULL
+       AND h.type_source = 'llm'"""
+
+
+def count_typed_events(db_path: str) -> int:
+    (count,) = get_reader(db_path).cursor().execute(
+        f"SELECT count(*) {_TYPED_BY_LLM}"
+    ).fetchone()
+    return count
+
+
+def load_typed_events(db_path: str) -> List[tuple]:
+    """
+    Return name, venue, description and type of all events typed by the
+    LLM, the training data of the genre classifier. Types from the
+    classifier itself, the cache or detail pages are left out.
+    """
+
+    return get_reader(db_path).cursor().execute(
+        f"""
+        SELECT e.event_name, e.event_venue, e.event_description, e.event_type
+        {_TYPED_BY_LLM}"""
+    ).fetchall()
+
+
+def load_cached_augmentations(
+        db_path: str, cache_keys: Iterable[str]
+    ) -> dict[str, tuple[str, str | None]]:
+    """
+    Return the cached event type and description per cache key found and
+    count the hits.
+    """
+
+    cache_keys = list(cache_keys)
+    if not cache_keys:
+        return {}
+
+    con = _cursor(db_path)
+    rows = con.execute(
+        f"""
+        UPDATE {AUGMENTATION_CACHE_TABLE}
+           SET hits = hits + 1
+         WHERE cache_key IN (SELECT {unnest_json("TEXT")})
+        RETURNING cache_key, event_type, event_description""",
+        [json_list(cache_keys)],
+    ).fetchall()
+    return {key: (event_type, description) for key, event_type, description in rows}
+
+
+def save_cached_augmentations(
+        db_path: str, augmentations: dict[str, tuple[str, str | None]]
+    ) -> None:
+    if not augmentations:
+        return
+
+    _cursor(db_path).executemany(
+        f"""
+        INSERT INTO {AUGMENTATION_CACHE_TABLE}
+        VALUES (?, ?, ?, 0, ?)
+        ON CONFLICT (cache_key) DO UPDATE SET
+            event_type = EXCLUDED.event_type,
+            event_description = EXCLUDED.event_description,
+            updated_at = EXCLUDED.updated_at
+        """,
+        [
+            (key, event_type, description, datetime.now())
+            for key, (event_type, description) in augmentations.items()
+        ],
+    )
+
+
+def load_crawl_status(db_path: str, select_date: str) -> CrawlStatus | None:
+    row = get_reader(db_path).cursor().execute(
+        f"""
+        SELECT event_date, fetched_at, source_hash, augmented, event_count
+          FROM {CRAWL_STATUS_TABLE}
+         WHERE event_date = CAST(? AS DATE)""",
+        [select_date],
+    ).fetchone()
+    return CrawlStatus(*row) if row else None
+
+
+def save_crawl_status(
+        db_path: str,
+        select_date: str,
+        source_hash: str | None,
+        event_count: int,
+        modified: bool,
+        fetched_at: Optional[datetime] = None,
+    ) -> None:
+    """
+    Record a crawl of the day, fetched at fetched_at (default now). A crawl
+    that added or changed events leaves the day to be augmented; otherwise
+    its augmentation status is kept. The recorded fetch time never moves
+    back.
+    """
+
+    _cursor(db_path).execute(
+        f"""
+        INSERT INTO {CRAWL_STATUS_TABLE}
+        VALUES (CAST(? AS DATE), ?, ?, NOT ?, ?)
+        ON CONFLICT (event_date) DO UPDATE SET
+            fetched_at = GREATEST({CRAWL_STATUS_TABLE}.fetched_at,
+                                  EXCLUDED.fetched_at),
+            source_hash = EXCLUDED.source_hash,
+            augmented = {CRAWL_STATUS_TABLE}.augmented AND EXCLUDED.augmented,
+            event_count = EXCLUDED.event_count
+        """,
+        [
+            select_date,
+            fetched_at or datetime.now(),
+            source_hash,
+            modified,
+            event_count,
+        ],
+    )
+
+
+def touch_crawl_status(db_path: str, select_date: str) -> None:
+    """
+    Record that the day was fetched again and found unchanged. Days stored
+    before the catalog existed are added with the status of their events.
+    """
+
+    _cursor(db_path).execute(
+        f"""
+        INSERT INTO {CRAWL_STATUS_TABLE}
+        SELECT CAST($date AS DATE),
+               $now,
+               NULL,
+               NOT EXISTS ({_PENDING_AUGMENTATION}),
+               $event_count
+        ON CONFLICT (event_date) DO UPDATE SET
+            fetched_at = EXCLUDED.fetched_at
+        """,
+        {
+            "date": select_date,
+            "now": datetime.now(),
+            "event_count": count_events_for_date(db_path, select_date),
+        },
+    )
+
+
+def mark_date_augmented(
+        db_path: str, select_date: str, augmented: bool = True
+    ) -> None:
+    _cursor(db_path).execute(
+        f"""
+        UPDATE {CRAWL_STATUS_TABLE}
+           SET augmented = ?
+         WHERE event_date = CAST(? AS DATE)""",
+        [augmented, select_date],
+    )
@@ -0,0 +1,21 @@
+"""
+Lists of values as query parameters. DuckDB converts a Python list element
+by element (roughly 0.3 ms each), while a JSON string is parsed natively, so
+lists are passed as JSON and unnested in SQL.
+"""
+
+import json
+from typing import Iterable
+
+
+def json_list(values: Iterable) -> str:
+    # Dates and times are serialized in ISO format
+    return json.dumps(list(values), default=str, ensure_ascii=False)
+
+
+def unnest_json(sql_type: str, param: str = "?") -> str:
+    """
+    SQL expression unnesting a json_list parameter into values of sql_type.
+    """
+
+    return f"""unnest(from_json({param}, '["{sql_type}"]'))"""
@@ -0,0 +1,73 @@
+"""
+In-process LRU cache of the stored events per date.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+
+DEFAULT_EVENT_CACHE_SIZE = 64    # dates
+
+
+def event_cache_size() -> int:
+    return int(os.getenv("EVENT_CACHE_SIZE", DEFAULT_EVENT_CACHE_SIZE))
+
+
+class EventCache:
+    """
+    Bounded LRU of the event rows of a date (ISO string). Writers invalidate
+    the dates they touch; a load that started before an invalidation is not
+    cached, so a slow reader cannot put back rows that were just replaced.
+    Only writes through this process are seen.
+    """
+
+    def __init__(self, max_dates: int = DEFAULT_EVENT_CACHE_SIZE):
+        self.max_dates = max_dates
+        self.hits = 0
+        self.misses = 0
+        self._rows: OrderedDict[str, tuple[tuple, ...]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, select_date: str) -> tuple[tuple, ...] | None:
+        with self._lock:
+            rows = self._rows.get(select_date)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(select_date)
+            self.hits += 1
+            return rows
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, select_date: str, rows: Iterable[tuple], generation: int) -> None:
+        """
+        Cache the rows loaded for the date, unless a write happened since
+        generation was read.
+        """
+
+        if self.max_dates <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._rows[select_date] = tuple(rows)
+            self._rows.move_to_end(select_date)
+            while len(self._rows) > self.max_dates:
+                self._rows.popitem(last=False)
+
+    def invalidate(self, select_dates: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for select_date in select_dates:
+                self._rows.pop(select_date, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._rows.clear()
@@ -0,0 +1,115 @@
+"""
+On-disk cache for HTTP responses with conditional revalidation
+(ETag / Last-Modified).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+
+
+DEFAULT_TTL_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    text: str
+    etag: str | None = None
+    last_modified: str | None = None
+    stored_at: float = 0.0
+
+
+class HttpCache:
+    """
+    Stores one JSON file per URL. Entries younger than the TTL are served
+    without a request; older entries are revalidated with a conditional GET.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> CachedResponse | None:
+        try:
+            data = json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return CachedResponse(**data)
+
+    def _write(self, entry: CachedResponse) -> None:
+        path = self._path(entry.url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(
+            json.dumps(asdict(entry), ensure_ascii=False), encoding="utf-8"
+        )
+        os.replace(tmp_path, path)
+
+    def put(
+            self,
+            url: str,
+            text: str,
+            etag: str | None = None,
+            last_modified: str | None = None,
+        ) -> CachedResponse:
+        entry = CachedResponse(
+            url=url,
+            text=text,
+            etag=etag,
+            last_modified=last_modified,
+            stored_at=time.time(),
+        )
+        self._write(entry)
+        return entry
+
+    def touch(self, entry: CachedResponse) -> CachedResponse:
+        """
+        Mark an entry as revalidated, restarting its TTL.
+        """
+
+        refreshed = replace(entry, stored_at=time.time())
+        self._write(refreshed)
+        return refreshed
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry: CachedResponse) -> dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+_caches: dict[tuple[str, float], HttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache | None:
+    """
+    Return the cache configured via HTTP_CACHE_DIR and HTTP_CACHE_TTL, or None
+    if caching is disabled.
+    """
+
+    cache_dir = os.getenv("HTTP_CACHE_DIR")
+    if not cache_dir:
+        return None
+    ttl_seconds = float(os.getenv("HTTP_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+    with _caches_lock:
+        key = (cache_dir, ttl_seconds)
+        if key not in _caches:
+            _caches[key] = HttpCache(cache_dir, ttl_seconds)
+        return _caches[key]
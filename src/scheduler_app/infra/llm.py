@@ -2,11 +2,23 @@
 Factory for creating LLM clients and token counter.
 """
 
+import json
 import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, List, Optional
 
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import tiktoken
+except ImportError:    # installed with langchain-openai
+    tiktoken = None
 
 
 llm_service_registry = {
@@ -15,6 +27,7 @@ llm_service_registry = {
             api_key=os.environ["OPENAI_API_KEY"],
             model_name=os.environ["OPENAI_MODEL"]
         ),
+        "model_env": "OPENAI_MODEL",
         "input_token_field": "prompt_tokens",
         "output_token_field": "completion_tokens",
         "input_cost_env": "OPENAI_INPUT_COST_PER_M",
@@ -23,6 +36,107 @@ llm_service_registry = {
 }
 
 
+DEFAULT_ENCODING = "o200k_base"
+MESSAGE_OVERHEAD_TOKENS = 4    # role and separators of a chat message
+CALL_OVERHEAD_TOKENS = 200    # bound tool and output schema definitions
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: Optional[str]):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model or "")
+    except KeyError:
+        pass
+    except (ValueError, OSError):
+        return None
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except (ValueError, OSError):    # encodings are downloaded on first use
+        return None
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Number of tokens in the text by the tokenizer of the model, or at about
+    four characters per token if the tokenizer is unavailable.
+    """
+
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_prompt_tokens(msg: list, model: Optional[str] = None) -> int:
+    """
+    Tokens of a prompt given as (role, content) messages.
+    """
+
+    return CALL_OVERHEAD_TOKENS + sum(
+        estimate_tokens(content, model) + MESSAGE_OVERHEAD_TOKENS
+        for _, content in msg
+    )
+
+
+RETRY_BACKOFF_SECONDS = 1.0    # wait before the first retry, doubled after
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Seconds to wait before the given retry (1 for the first), growing
+    exponentially.
+    """
+
+    return RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+
+
+def structured_data(output: dict) -> Optional[Any]:
+    """
+    The data of a structured output requested with include_raw=True: the
+    parsed model if it validated, otherwise the JSON in the raw message
+    (tool call arguments or content), or None if there is none.
+    """
+
+    if output.get("parsed") is not None:
+        return output["parsed"].model_dump()
+
+    raw = output.get("raw")
+    for tool_call in getattr(raw, "tool_calls", None) or []:
+        if isinstance(tool_call.get("args"), dict):
+            return tool_call["args"]
+    content = getattr(raw, "content", None)
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def salvage_items(
+        data: Optional[Any], key: str, item_type: Any
+    ) -> tuple[List[Any], List[Any]]:
+    """
+    Validate the items of the list under key in structured output data one by
+    one and return the valid items and the raw invalid ones.
+    """
+
+    items = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return [], []
+
+    adapter = TypeAdapter(item_type)
+    valid, invalid = [], []
+    for item in items:
+        try:
+            valid.append(adapter.validate_python(item))
+        except ValidationError:
+            invalid.append(item)
+    return valid, invalid
+
+
 class TokenCounter(BaseCallbackHandler):
     def __init__(self, service, dollars_already_spent, budget_exceeded):
         self.service = service
@@ -42,6 +156,9 @@ class TokenCounter(BaseCallbackHandler):
         self.dollars_already_spent = dollars_already_spent
         self.budget_limit = float(os.environ["BUDGET_LIMIT"])
         self.budget_exceeded = budget_exceeded
+        self.model = os.getenv(llm_service_registry[service]["model_env"])
+        # Calls of one node may run concurrently
+        self._lock = threading.Lock()
 
     def on_llm_end(self, response, **kwargs):
         usage = response.llm_output.get("token_usage", {})
@@ -56,10 +173,42 @@ class TokenCounter(BaseCallbackHandler):
                 self.output_token_cost
             )
         )
-        self.dollars_spent_this_node += expended
+        with self._lock:
+            self.dollars_spent_this_node += expended
+
+            if self.dollars_already_spent + self.dollars_spent_this_node >= self.budget_limit:
+                self.budget_exceeded = True
+
+
+    @property
+    def remaining_budget(self) -> float:
+        return (
+            self.budget_limit
+            - self.dollars_already_spent
+            - self.dollars_spent_this_node
+        )
+
+    def estimate_cost(self, msg: list, output_tokens: int) -> float:
+        """
+        Dollars a call with the prompt and about output_tokens of output is
+        expected to cost, before it is made.
+        """
+
+        return (
+            estimate_prompt_tokens(msg, self.model) * self.input_token_cost
+            + output_tokens * self.output_token_cost
+        )
 
-        if self.dollars_already_spent + self.dollars_spent_this_node >= self.budget_limit:
-            self.budget_exceeded = True
+    def refuse(self, msg: list, output_tokens: int) -> bool:
+        """
+        Whether a call is expected to exceed the remaining budget, in which
+        case the budget counts as exceeded and the call must not be made.
+        """
+
+        if self.estimate_cost(msg, output_tokens) <= self.remaining_budget:
+            return False
+        self.budget_exceeded = True
+        return True
 
 
 def create_llm_client(
@@ -82,3 +231,49 @@ def create_llm_client(
     token_counter = TokenCounter(service, dollars_already_spent, budget_exceeded)
 
     return factory(), token_counter
+
+
+def collect_list_items(
+        runnable: Runnable,
+        msg: list,
+        key: str,
+        limit: int,
+        token_counter: TokenCounter,
+        max_retries: int,
+        output_tokens_per_item: int = 60,
+    ) -> tuple[List[str], int]:
+    """
+    Ask a structured-output runnable (include_raw=True) for a list of up to
+    limit text items under key. The valid items of a partly invalid answer are
+    kept and a retry, after an exponential backoff, asks only for the number
+    still missing. Calls expected to exceed the remaining budget are not
+    made. Returns the items and the number of attempts.
+    """
+
+    items: List[str] = []
+    attempts = 0
+    request = msg
+    for attempt in range(max_retries):
+        if token_counter.budget_exceeded:
+            break
+        if attempt:
+            time.sleep(retry_delay(attempt))
+        if token_counter.refuse(
+                request, output_tokens_per_item * (limit - len(items))):
+            break
+
+        attempts += 1
+        data = structured_data(
+            runnable.invoke(request, config={"callbacks": [token_counter]})
+        )
+        valid, invalid = salvage_items(data, key, str)
+        items += [i for i in valid if i not in items][:limit - len(items)]
+        if (data is not None and not invalid) or len(items) >= limit:
+            break
+
+        request = msg + [(
+            "user",
+            f"Return only {limit - len(items)} further suggestions, other "
+            f"than: {json.dumps(items, ensure_ascii=False)}",
+        )]
+    return items, attempts
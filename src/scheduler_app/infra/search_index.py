@@ -0,0 +1,175 @@
+"""
+Inverted index over the event name, description and venue with BM25
+ranking, kept in DuckDB tables next to the events and updated per event.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+import duckdb
+
+from scheduler_app.infra.duckdb_params import json_list, unnest_json
+
+
+EVENT_TERMS_TABLE = "event_terms"
+EVENT_DOCUMENTS_TABLE = "event_documents"
+
+SEARCH_TABLE_SCHEMAS = {
+    # Frequency of each term per event; unique per event and term by
+    # construction, without a key, as an index would dominate bulk indexing
+    EVENT_TERMS_TABLE: """
+        event_id TEXT NOT NULL,
+        term TEXT NOT NULL,
+        tf INTEGER NOT NULL
+    """,
+    # Number of terms per event, for length normalization
+    EVENT_DOCUMENTS_TABLE: """
+        event_id TEXT PRIMARY KEY,
+        event_date DATE NOT NULL,
+        length INTEGER NOT NULL
+    """,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_SQL_TOKEN = r"[\pL\pN_]+"    # RE2 equivalent of _TOKEN
+_STOPWORDS = frozenset("""
+    der die das den dem des ein eine einer eines einem einen und oder mit von
+    im in am an auf aus bei für zu zum zur ist sind wird the a an and or of
+    in on at for to with by is are
+""".split())
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [
+        t for t in _TOKEN.findall(text.lower())
+        if len(t) > 1 and t not in _STOPWORDS
+    ]
+
+
+def unindex_events(con: duckdb.DuckDBPyConnection, event_ids: List[str]) -> None:
+    for table_name in SEARCH_TABLE_SCHEMAS:
+        con.execute(
+            f"DELETE FROM {table_name} "
+            f"WHERE event_id IN (SELECT {unnest_json('TEXT')})",
+            [json_list(event_ids)],
+        )
+
+
+def index_events(
+        con: duckdb.DuckDBPyConnection, events_table: str, event_ids: Iterable[str]
+    ) -> None:
+    """
+    (Re-)index the events as stored, i.e. after upserts have been applied.
+    Tokenizing and counting run in DuckDB, in line with tokenize().
+    """
+
+    event_ids = list(event_ids)
+    if not event_ids:
+        return
+
+    unindex_events(con, event_ids)
+    params = {"ids": json_list(event_ids), "stopwords": json_list(_STOPWORDS)}
+    con.execute(
+        f"""
+        INSERT INTO {EVENT_TERMS_TABLE}
+        SELECT event_id, term, count(*)
+          FROM (
+              SELECT event_id,
+                     unnest(regexp_extract_all(
+                         lower(concat_ws(' ', event_name, event_description, event_venue)),
+                         '{_SQL_TOKEN}'
+                     )) AS term
+                FROM {events_table}
+               WHERE event_id IN (SELECT {unnest_json("TEXT", "$ids")})
+          )
+         WHERE length(term) > 1
+           AND term NOT IN (SELECT {unnest_json("TEXT", "$stopwords")})
+         GROUP BY event_id, term""",
+        params,
+    )
+    con.execute(
+        f"""
+        INSERT INTO {EVENT_DOCUMENTS_TABLE}
+        SELECT e.event_id, e.event_date, coalesce(sum(t.tf), 0)
+          FROM {events_table} e
+          LEFT JOIN {EVENT_TERMS_TABLE} t USING (event_id)
+         WHERE e.event_id IN (SELECT {unnest_json("TEXT", "$ids")})
+         GROUP BY e.event_id, e.event_date""",
+        {"ids": params["ids"]},
+    )
+
+
+def rebuild_index(con: duckdb.DuckDBPyConnection, events_table: str) -> int:
+    for table_name in SEARCH_TABLE_SCHEMAS:
+        con.execute(f"DELETE FROM {table_name}")
+    event_ids = [
+        event_id for (event_id,)
+        in con.execute(f"SELECT event_id FROM {events_table}").fetchall()
+    ]
+    index_events(con, events_table, event_ids)
+    return len(event_ids)
+
+
+def search(
+        con: duckdb.DuckDBPyConnection,
+        events_table: str,
+        columns: Iterable[str],
+        query: str,
+        start_date: str,
+        end_date: str,
+        limit: int,
+    ) -> List[tuple]:
+    """
+    Return the rows of the events matching any query term, best BM25 score
+    first, with the score as last column. Document frequencies are taken
+    over all indexed events.
+    """
+
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+
+    return con.execute(
+        f"""
+        WITH stats AS (
+            SELECT count(*) AS n, avg(length) AS avg_length
+              FROM {EVENT_DOCUMENTS_TABLE}
+        ),
+        matches AS (
+            SELECT event_id, term, tf,
+                   count(*) OVER (PARTITION BY term) AS df
+              FROM {EVENT_TERMS_TABLE}
+             WHERE term IN (SELECT {unnest_json("TEXT", "$terms")})
+        ),
+        scores AS (
+            SELECT m.event_id,
+                   sum(
+                       ln(1 + (s.n - m.df + 0.5) / (m.df + 0.5))
+                       * m.tf * ($k1 + 1)
+                       / (m.tf + $k1 * (1 - $b + $b * d.length / s.avg_length))
+                   ) AS score
+              FROM matches m
+              JOIN {EVENT_DOCUMENTS_TABLE} d USING (event_id)
+             CROSS JOIN stats s
+             WHERE d.event_date BETWEEN CAST($start AS DATE) AND CAST($end AS DATE)
+             GROUP BY m.event_id
+        )
+        SELECT {", ".join(f"e.{c}" for c in columns)}, sc.score
+          FROM scores sc
+          JOIN {events_table} e USING (event_id)
+         ORDER BY sc.score DESC, e.event_date, e.event_time
+         LIMIT $limit""",
+        {
+            "terms": json_list(terms),
+            "k1": BM25_K1,
+            "b": BM25_B,
+            "start": start_date,
+            "end": end_date,
+            "limit": limit,
+        },
+    ).fetchall()
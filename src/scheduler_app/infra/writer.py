@@ -0,0 +1,178 @@
+"""
+Single writer for the event database: write jobs from any thread or event
+loop are queued and executed in order on one thread, and snapshots for
+readers in other processes are published along the way.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from scheduler_app.infra.database import publish_snapshot, release_cursor
+
+
+def snapshot_interval() -> Optional[float]:
+    """
+    Seconds between published snapshots from DUCKDB_SNAPSHOT_INTERVAL, or None
+    if snapshots are disabled.
+    """
+
+    value = os.getenv("DUCKDB_SNAPSHOT_INTERVAL")
+    return float(value) if value else None
+
+
+@dataclass
+class _Job:
+    fn: Callable[[str, List[Any]], None]
+    items: List[Any]
+    coalesce: bool
+    futures: List[Future] = field(default_factory=list)
+
+
+class DatabaseWriter:
+    """
+    Runs write jobs of the form fn(db_path, items) on a dedicated thread.
+    Consecutive queued jobs for the same function are merged into one call if
+    submitted with coalesce=True. If snapshot_interval is set, a snapshot is
+    published once something was written and that much time has passed since
+    the last one, and on close if anything was written since. The thread
+    closes its cursor whenever the queue runs empty, so an idle writer does
+    not keep the database in use.
+    """
+
+    def __init__(
+            self,
+            db_path: str,
+            snapshot_interval: Optional[float] = None,
+        ):
+        self.db_path = db_path
+        self.snapshot_interval = snapshot_interval
+        self._queue: queue.Queue[_Job | None] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="database-writer", daemon=True
+        )
+        self._last_snapshot = time.monotonic()
+        self._written = False    # since the last snapshot
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        return False
+
+    def submit(
+            self,
+            fn: Callable[[str, List[Any]], None],
+            items: List[Any],
+            coalesce: bool = True,
+        ) -> Future:
+        future: Future = Future()
+        self._queue.put(_Job(fn, list(items), coalesce, [future]))
+        return future
+
+    def close(self) -> None:
+        """
+        Finish all queued jobs, publish a final snapshot (if enabled and
+        anything was written) and stop the thread.
+        """
+
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_jobs(self, first: _Job) -> tuple[List[_Job], bool]:
+        jobs = [first]
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return jobs, False
+            if job is None:
+                return jobs, True
+
+            last = jobs[-1]
+            if job.coalesce and last.coalesce and job.fn is last.fn:
+                last.items.extend(job.items)
+                last.futures.extend(job.futures)
+            else:
+                jobs.append(job)
+
+    def _execute(self, job: _Job) -> None:
+        try:
+            job.fn(self.db_path, job.items)
+        except BaseException as exc:
+            for future in job.futures:
+                future.set_exception(exc)
+        else:
+            self._written = True
+            for future in job.futures:
+                future.set_result(None)
+
+    def _publish(self) -> None:
+        try:
+            publish_snapshot(self.db_path)
+        except Exception as exc:
+            print(f"Failed to publish database snapshot: {exc}")
+        self._last_snapshot = time.monotonic()
+        self._written = False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            jobs, stop = self._next_jobs(first)
+            for job in jobs:
+                self._execute(job)
+
+            if (
+                self.snapshot_interval is not None
+                and self._written
+                and time.monotonic() - self._last_snapshot >= self.snapshot_interval
+            ):
+                self._publish()
+            if self._queue.empty():
+                release_cursor(self.db_path)
+
+        if self.snapshot_interval is not None and self._written:
+            self._publish()
+        release_cursor(self.db_path)
+
+
+_writers: dict[str, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_database_writer(db_path: str) -> DatabaseWriter:
+    """
+    Return the process-wide writer for the database file, publishing
+    snapshots at the interval from DUCKDB_SNAPSHOT_INTERVAL. It is closed when
+    the process exits.
+    """
+
+    key = str(Path(db_path).resolve())
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = DatabaseWriter(str(db_path), snapshot_interval())
+        return _writers[key]
+
+
+def close_database_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+# Registered after close_connections (imported above), so it runs before it
+atexit.register(close_database_writers)
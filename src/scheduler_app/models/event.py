@@ -5,10 +5,16 @@ Classes for events and event patches.
 from __future__ import annotations
 
 import hashlib
+import sys
 from datetime import date
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pydantic import BaseModel
-from typing import Optional, List, Literal
+from typing import Iterable, Iterator, Optional, List, Literal
+
+try:
+    import pyarrow
+except ImportError:    # optional dependency, see the "arrow" extra
+    pyarrow = None
 
 
 EventType = Literal[
@@ -20,7 +26,8 @@ EventType = Literal[
     "Pop, Schlager",
 ]
 
-@dataclass
+
+@dataclass(slots=True)
 class Event:
     event_id: str
     event_name: str
@@ -59,6 +66,23 @@ class Event:
             f"{self.event_description}, {self.event_url}."
         )
 
+    def content_hash(self) -> str:
+        """
+        Hash of the crawled content (name, date, time, venue, description).
+        """
+
+        fields = (
+            self.event_name,
+            self.event_date,
+            self.event_time,
+            self.event_venue,
+            self.event_description,
+        )
+        return hashlib.sha256(
+            "|".join("" if f is None else str(f) for f in fields)
+            .encode("utf-8")
+        ).hexdigest()
+
     def to_db_tuple(self) -> tuple:
         return (
             self.event_id,
@@ -72,6 +96,103 @@ class Event:
         )
 
 
+EVENT_COLUMNS = tuple(f.name for f in fields(Event))
+
+# Columns with few distinct values, stored as interned strings
+_INTERNED_COLUMNS = ("event_time", "event_venue", "event_type")
+
+
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+class EventBatch:
+    """
+    Column-oriented container for the events of one or more days. Each column
+    is a list indexed by row; times, venues and types are interned, so
+    repeated values share one string. Events are only created when accessed.
+    """
+
+    __slots__ = EVENT_COLUMNS + ("_index",)
+
+    def __init__(self, **columns: List):
+        for name in EVENT_COLUMNS:
+            setattr(self, name, columns[name])
+        self._index: dict[str, int] | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> EventBatch:
+        """
+        Build the batch from rows in table column order, e.g. a DuckDB
+        fetchall(). Times are cut to HH:MM as shown to users.
+        """
+
+        columns = list(zip(*rows)) or [()] * len(EVENT_COLUMNS)
+        return cls._from_columns(
+            dict(zip(EVENT_COLUMNS, (list(c) for c in columns)))
+        )
+
+    @classmethod
+    def _from_columns(cls, data: dict[str, List]) -> EventBatch:
+        data["event_time"] = [t[:5] for t in data["event_time"]]
+        for name in _INTERNED_COLUMNS:
+            data[name] = [_intern(v) for v in data[name]]
+        return cls(**data)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> EventBatch:
+        return cls.from_rows(e.to_db_tuple() for e in events)
+
+    @classmethod
+    def from_arrow(cls, table) -> EventBatch:
+        """
+        Build the batch from a pyarrow table with the event columns, one
+        column at a time.
+        """
+
+        return cls._from_columns(
+            {name: table.column(name).to_pylist() for name in EVENT_COLUMNS}
+        )
+
+    def to_arrow(self):
+        if pyarrow is None:
+            raise RuntimeError("EventBatch.to_arrow requires pyarrow.")
+        return pyarrow.table({name: getattr(self, name) for name in EVENT_COLUMNS})
+
+    def __len__(self) -> int:
+        return len(self.event_id)
+
+    def __getitem__(self, i: int) -> Event:
+        return Event(*(getattr(self, name)[i] for name in EVENT_COLUMNS))
+
+    def __iter__(self) -> Iterator[Event]:
+        columns = [getattr(self, name) for name in EVENT_COLUMNS]
+        return (Event(*row) for row in zip(*columns))
+
+    def events(self) -> List[Event]:
+        return list(self)
+
+    def index_of(self, event_id: str) -> int | None:
+        if self._index is None:
+            self._index = {e: i for i, e in enumerate(self.event_id)}
+        return self._index.get(event_id)
+
+    def to_dict(self, i: int) -> dict:
+        """
+        Row i in the form of Event.from_dict, with the date as ISO string.
+        """
+
+        data = {name: getattr(self, name)[i] for name in EVENT_COLUMNS}
+        data["event_date"] = data["event_date"].isoformat()
+        return data
+
+    def update(self, i: int, **values) -> None:
+        for name, value in values.items():
+            if name in _INTERNED_COLUMNS:
+                value = _intern(value)
+            getattr(self, name)[i] = value
+
+
 class EventPatch(BaseModel):
     event_id: str
     event_type: Optional[EventType] = None
@@ -0,0 +1,135 @@
+"""
+Splitting of the events to augment into chunks for concurrent LLM calls, and
+keys and metrics for reusing earlier augmentations.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Callable, List, Optional
+
+from scheduler_app.infra.llm import estimate_tokens
+
+
+DEFAULT_AUGMENT_CHUNK_TOKENS = 3000    # tokens of event data per LLM call
+DEFAULT_AUGMENT_CONCURRENCY = 4    # LLM calls running at the same time
+OUTPUT_TOKENS_PER_EVENT = 150    # expected size of a patch with description
+
+
+def augment_chunk_tokens() -> int:
+    return int(os.getenv("AUGMENT_CHUNK_TOKENS", DEFAULT_AUGMENT_CHUNK_TOKENS))
+
+
+def augment_concurrency() -> int:
+    return int(os.getenv("AUGMENT_CONCURRENCY", DEFAULT_AUGMENT_CONCURRENCY))
+
+
+def chunk_events(event_dicts: List[dict], max_tokens: int) -> List[List[dict]]:
+    """
+    Split the events, in order, into chunks whose JSON is estimated to stay
+    within max_tokens. An event larger than that gets a chunk of its own.
+    """
+
+    chunks: List[List[dict]] = []
+    chunk: List[dict] = []
+    chunk_tokens = 0
+    for event_dict in event_dicts:
+        tokens = estimate_tokens(json.dumps(event_dict, ensure_ascii=False))
+        if chunk and chunk_tokens + tokens > max_tokens:
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(event_dict)
+        chunk_tokens += tokens
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def fit_to_budget(
+        chunks: List[List[dict]],
+        cost: Callable[[List[dict]], float],
+        budget: float,
+    ) -> tuple[List[List[dict]], bool]:
+    """
+    Take the chunks, in order, while their expected cost stays within the
+    budget, and cut the first chunk that does not fit to the events that do.
+    Returns the chunks to send and whether any events were left out.
+    """
+
+    planned = []
+    for chunk in chunks:
+        # Largest affordable prefix of the chunk, by binary search
+        low, high = 0, len(chunk)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if cost(chunk[:mid]) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+
+        if low:
+            planned.append(chunk[:low])
+            budget -= cost(chunk[:low])
+        if low < len(chunk):
+            return planned, True
+    return planned, False
+
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def _normalize(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def augmentation_key(event_dict: dict) -> str:
+    """
+    Hash of the normalized name, venue and teaser text of an event, equal for
+    the recurring events of a series or tour on different dates.
+    """
+
+    parts = (
+        event_dict.get("event_name"),
+        event_dict.get("event_venue"),
+        event_dict.get("event_description"),
+    )
+    return hashlib.sha256(
+        "|".join(_normalize(p) for p in parts).encode("utf-8")
+    ).hexdigest()
+
+
+class AugmentationCacheStats:
+    """
+    Hits and misses of the augmentation cache in this process.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"augmentation cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.0%})"
+        )
+
+
+augmentation_cache_stats = AugmentationCacheStats()
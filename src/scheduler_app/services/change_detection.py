@@ -0,0 +1,96 @@
+"""
+Change detection for crawled listings based on content hashes.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+from scheduler_app.models.event import Event
+
+
+@dataclass
+class EventDiff:
+    select_date: str
+    added: List[Event] = field(default_factory=list)
+    changed: List[Event] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    # Content hashes of added and changed events as crawled, i.e. before any
+    # enrichment of their fields
+    content_hashes: dict[str, str] = field(default_factory=dict)
+    page_url: str | None = None
+    listing_hash: str | None = None
+    listing_unchanged: bool = False
+    # When the listing was fetched, if not just now (e.g. replayed from the
+    # archive)
+    fetched_at: datetime | None = None
+
+    @property
+    def modified(self) -> List[Event]:
+        return self.added + self.changed
+
+    def classify(self, event: Event, stored_hash: str | None) -> bool:
+        """
+        Record the event as added, changed, or unchanged given its stored
+        content hash. Returns whether the event was modified.
+        """
+
+        content_hash = event.content_hash()
+        if stored_hash == content_hash:
+            self.unchanged += 1
+            return False
+
+        self.content_hashes[event.event_id] = content_hash
+        if stored_hash is None:
+            self.added.append(event)
+        else:
+            self.changed.append(event)
+        return True
+
+    def __str__(self) -> str:
+        if self.listing_unchanged:
+            return f"{self.select_date}: listing unchanged"
+        return (
+            f"{self.select_date}: {len(self.added)} added, "
+            f"{len(self.changed)} changed, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged"
+        )
+
+
+def hash_listing(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def combine_page_hashes(page_hashes: List[str]) -> str:
+    """
+    Hash of a listing from the hashes of its result pages in page order.
+    """
+
+    return hashlib.sha256("".join(page_hashes).encode("ascii")).hexdigest()
+
+
+def hash_pages(pages: List[tuple[str, str]]) -> str:
+    """
+    Hash of a listing over the html of all its (url, html) result pages,
+    given in page order.
+    """
+
+    return combine_page_hashes([hash_listing(html) for _, html in pages])
+
+
+def diff_events(
+        select_date: str, stored_hashes: dict[str, str], events: List[Event]
+    ) -> EventDiff:
+    """
+    Compare freshly parsed events with the content hashes stored for the day.
+    """
+
+    diff = EventDiff(select_date=select_date)
+    for event in events:
+        diff.classify(event, stored_hashes.get(event.event_id))
+
+    current_ids = {e.event_id for e in events}
+    diff.removed = [i for i in stored_hashes if i not in current_ids]
+    return diff
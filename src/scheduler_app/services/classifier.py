@@ -0,0 +1,246 @@
+"""
+Local genre classifier, trained on the events the LLM typed, to type events
+without an LLM call where it is confident.
+"""
+
+import os
+import threading
+import zlib
+from typing import List, Optional, Sequence
+
+from scheduler_app.infra.database import count_typed_events, load_typed_events
+from scheduler_app.infra.search_index import tokenize
+
+try:
+    import numpy as np
+except ImportError:    # optional dependency, see the "classifier" extra
+    np = None
+
+
+N_FEATURES = 2 ** 16    # hashed unigrams and bigrams
+MIN_TRAINING_EVENTS = 200
+RETRAIN_GROWTH = 1.2    # retrain once the typed events grew by this factor
+DEFAULT_CONFIDENCE = 0.8
+
+EPOCHS = 100
+LEARNING_RATE = 1.0
+L2_PENALTY = 3e-5
+
+
+def classifier_confidence() -> Optional[float]:
+    """
+    Probability from which a predicted type is used, from the
+    GENRE_CLASSIFIER_CONFIDENCE environment variable; None if it is empty or
+    NumPy is missing, i.e. the classifier is disabled.
+    """
+
+    value = os.getenv("GENRE_CLASSIFIER_CONFIDENCE", str(DEFAULT_CONFIDENCE))
+    if np is None or not value:
+        return None
+    return float(value)
+
+
+_TEXT_COLUMNS = ("event_name", "event_venue", "event_description")
+
+
+def event_text(event_dict: dict) -> str:
+    return " ".join(event_dict.get(name) or "" for name in _TEXT_COLUMNS)
+
+
+def _terms(text: str) -> List[str]:
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _hashed_counts(texts: Sequence[str]):
+    """
+    Term counts of the texts as sparse (row, column, count) arrays, with the
+    terms hashed into N_FEATURES columns.
+    """
+
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for term in _terms(text):
+            rows.append(row)
+            cols.append(zlib.crc32(term.encode("utf-8")) % N_FEATURES)
+
+    keys, counts = np.unique(
+        np.array(rows, dtype=np.int64) * N_FEATURES
+        + np.array(cols, dtype=np.int64),
+        return_counts=True,
+    )
+    return keys // N_FEATURES, keys % N_FEATURES, counts.astype(np.float64)
+
+
+def _tfidf(rows, cols, counts, idf, n_rows: int):
+    values = np.log1p(counts) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n_rows))
+    return values / norms[rows]
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class GenreClassifier:
+    """
+    Multinomial logistic regression over hashed TF-IDF features of the name,
+    venue and description of events.
+    """
+
+    def __init__(self, classes: List[str], idf, weights, bias):
+        self.classes = classes
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    @staticmethod
+    def _scores(rows, cols, values, weights, bias, n_rows: int):
+        # Class-major weights keep the gathers per class contiguous
+        return np.stack([
+            np.bincount(rows, weights=values * w[cols], minlength=n_rows)
+            for w in weights
+        ], axis=1) + bias
+
+    @classmethod
+    def train(
+            cls,
+            texts: Sequence[str],
+            labels: Sequence[str],
+            epochs: int = EPOCHS,
+        ) -> "GenreClassifier":
+        """
+        Fit the classifier by full-batch gradient descent with per-feature
+        (AdaGrad) step sizes, which suits the sparse, rare features of text.
+        """
+
+        classes = sorted(set(labels))
+        n_rows = len(texts)
+        rows, cols, counts = _hashed_counts(texts)
+        df = np.bincount(cols, minlength=N_FEATURES)
+        idf = np.log((1 + n_rows) / (1 + df)) + 1
+        values = _tfidf(rows, cols, counts, idf, n_rows)
+
+        targets = np.zeros((n_rows, len(classes)))
+        targets[np.arange(n_rows), [classes.index(l) for l in labels]] = 1
+
+        weights = np.zeros((len(classes), N_FEATURES))
+        bias = np.zeros(len(classes))
+        weights_g2 = np.full_like(weights, 1e-8)
+        bias_g2 = np.full_like(bias, 1e-8)
+        for _ in range(epochs):
+            probs = _softmax(
+                cls._scores(rows, cols, values, weights, bias, n_rows)
+            )
+            errors = (probs - targets) / n_rows
+
+            grad = np.stack([
+                np.bincount(cols, weights=values * e[rows], minlength=N_FEATURES)
+                for e in np.ascontiguousarray(errors.T)
+            ]) + L2_PENALTY * weights
+            bias_grad = errors.sum(axis=0)
+
+            weights_g2 += grad ** 2
+            bias_g2 += bias_grad ** 2
+            weights -= LEARNING_RATE * grad / np.sqrt(weights_g2)
+            bias -= LEARNING_RATE * bias_grad / np.sqrt(bias_g2)
+
+        return cls(classes, idf, weights, bias)
+
+    def predict_proba(self, texts: Sequence[str]):
+        rows, cols, counts = _hashed_counts(texts)
+        values = _tfidf(rows, cols, counts, self.idf, len(texts))
+        return _softmax(
+            self._scores(rows, cols, values, self.weights, self.bias, len(texts))
+        )
+
+    def predict(
+            self, texts: Sequence[str], confidence: float
+        ) -> List[Optional[str]]:
+        """
+        The most probable type per text, or None where its probability is
+        below confidence.
+        """
+
+        if not texts:
+            return []
+        probs = self.predict_proba(texts)
+        best = probs.argmax(axis=1)
+        return [
+            self.classes[k] if p >= confidence else None
+            for k, p in zip(best, probs[np.arange(len(texts)), best])
+        ]
+
+
+# Per database: the number of LLM-typed events at the last training and the
+# classifier trained (None if they were all of one type)
+_classifiers: dict[str, tuple[int, Optional[GenreClassifier]]] = {}
+_training: dict[str, threading.Thread] = {}
+_classifiers_lock = threading.Lock()
+
+
+def train_genre_classifier(db_path: str) -> Optional[GenreClassifier]:
+    """
+    Train the classifier on the events of the database typed by the LLM and
+    keep it for the process; None if they are all of one type.
+    """
+
+    rows = load_typed_events(db_path)
+    classifier = None
+    if len({r[-1] for r in rows}) >= 2:
+        classifier = GenreClassifier.train(
+            [event_text(dict(zip(_TEXT_COLUMNS, r[:-1]))) for r in rows],
+            [r[-1] for r in rows],
+        )
+    with _classifiers_lock:
+        _classifiers[db_path] = (len(rows), classifier)
+    return classifier
+
+
+def _train_in_background(db_path: str) -> None:
+    try:
+        train_genre_classifier(db_path)
+    except Exception as exc:
+        print(f"Failed to train genre classifier: {exc}")
+    finally:
+        with _classifiers_lock:
+            _training.pop(db_path, None)
+
+
+def get_genre_classifier(
+        db_path: str, wait: bool = False
+    ) -> Optional[GenreClassifier]:
+    """
+    Return the latest classifier trained on the LLM-typed events of the
+    database, or None if there is none yet.
+
+    Training starts on a background thread once there are
+    MIN_TRAINING_EVENTS such events and again when they grew by
+    RETRAIN_GROWTH; until it finishes, the previous classifier is returned.
+    With wait set, a running training is finished first.
+    """
+
+    n_typed = count_typed_events(db_path)
+    with _classifiers_lock:
+        trained = _classifiers.get(db_path)
+        due = n_typed >= MIN_TRAINING_EVENTS and (
+            trained is None or n_typed >= trained[0] * RETRAIN_GROWTH
+        )
+        thread = _training.get(db_path)
+        if due and thread is None:
+            thread = threading.Thread(
+                target=_train_in_background,
+                args=(db_path,),
+                name="genre-classifier",
+                daemon=True,
+            )
+            _training[db_path] = thread
+            thread.start()
+
+    if wait and thread is not None:
+        thread.join()
+    with _classifiers_lock:
+        trained = _classifiers.get(db_path)
+    return trained[1] if trained else None
@@ -0,0 +1,101 @@
+"""
+Enrichment of events with the full description and genre from their detail
+pages, ahead of the LLM augmentation.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import httpx
+import requests
+
+from scheduler_app.infra.async_crawler import AsyncCrawler
+from scheduler_app.infra.crawler import MAX_WORKERS, fetch_page
+from scheduler_app.models.event import Event
+from scheduler_app.services.genres import map_genre_tags
+from scheduler_app.services.parser import extract_event_details
+
+
+def detail_pages_enabled() -> bool:
+    return os.getenv("DETAIL_PAGES_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def apply_details(events: List[Event], htmls: List[Optional[str]]) -> int:
+    """
+    Update the events in place with the details parsed from their detail
+    pages (None where a page is missing) and return the number of events
+    enriched. Longer descriptions replace the teaser; the event type is only
+    set if the genre tags map to exactly one type.
+    """
+
+    enriched = 0
+    for event, html in zip(events, htmls):
+        if not html:
+            continue
+
+        # One malformed detail page must not abort the ingestion
+        try:
+            details = extract_event_details(html)
+        except Exception as exc:
+            print(f"Failed to parse event detail page {event.event_url}: {exc}")
+            continue
+        description = details["event_description"]
+        if description and len(description) > len(event.event_description or ""):
+            event.event_description = description
+        if event.event_type is None:
+            event.event_type = map_genre_tags(details["genres"])
+        enriched += 1
+
+    return enriched
+
+
+def _fetch_or_none(url: str) -> Optional[str]:
+    try:
+        html, _ = fetch_page(url)
+        return html
+    except requests.exceptions.RequestException as exc:
+        print(f"Failed to fetch event detail page {url}: {exc}")
+        return None
+
+
+def enrich_events(events: List[Event], max_workers: int = MAX_WORKERS) -> int:
+    """
+    Fetch the detail pages of the events concurrently over the shared session
+    and enrich the events in place. Returns the number of events enriched.
+    """
+
+    events = [e for e in events if e.event_url]
+    if not events or not detail_pages_enabled():
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        htmls = list(executor.map(_fetch_or_none, [e.event_url for e in events]))
+
+    return apply_details(events, htmls)
+
+
+async def aenrich_events(crawler: AsyncCrawler, events: List[Event]) -> int:
+    """
+    Async variant of enrich_events; parsing runs in a worker thread.
+    """
+
+    events = [e for e in events if e.event_url]
+    if not events or not detail_pages_enabled():
+        return 0
+
+    results = await asyncio.gather(
+        *(crawler.fetch_page(e.event_url) for e in events),
+        return_exceptions=True,
+    )
+    htmls = []
+    for event, result in zip(events, results):
+        if isinstance(result, httpx.HTTPError):
+            print(f"Failed to fetch event detail page {event.event_url}: {result}")
+            result = None
+        elif isinstance(result, BaseException):
+            raise result
+        htmls.append(result)
+
+    return await asyncio.to_thread(apply_details, events, htmls)
@@ -0,0 +1,77 @@
+"""
+Mapping of genre tags from the event website to event types.
+"""
+
+import re
+from typing import Iterable, Optional
+
+from scheduler_app.models.event import EventType
+
+
+# Keywords match whole words of a tag; "stem*" matches words starting with
+# the stem, "*word" words ending in it (German compounds such as "Punkrock"),
+# and keywords with spaces match consecutive words
+GENRE_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "Klassik": (
+        "*klassik", "*oper", "operette", "*orchester", "kammermusik", "*chor",
+        "sinfon*", "symphon*", "barock", "klavier",
+    ),
+    "Jazz, Blues, Funk": ("*jazz", "*blues", "funk", "swing", "bebop"),
+    "Rock, Indie, Metal": (
+        "*rock", "indie", "*metal", "*punk", "hardcore", "grunge", "alternative",
+    ),
+    "HipHop, RnB, Soul": (
+        "hip hop", "hiphop", "*rap", "rnb", "r n b", "*soul",
+    ),
+    "Elektro, Techno, House": (
+        "elektro*", "electro*", "*techno", "*house", "drum and bass",
+        "drum n bass",
+    ),
+    "Pop, Schlager": ("*pop", "*schlager", "chanson", "volksmusik"),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def _word_types(word: str) -> set[str]:
+    # A word that is a keyword itself (e.g. "barock") is not read as a
+    # compound of another one ("*rock")
+    exact = {
+        event_type
+        for event_type, keywords in GENRE_KEYWORDS.items()
+        if word in keywords or f"*{word}" in keywords or f"{word}*" in keywords
+    }
+    if exact:
+        return exact
+
+    return {
+        event_type
+        for event_type, keywords in GENRE_KEYWORDS.items()
+        for k in keywords
+        if (k.startswith("*") and word.endswith(k[1:]))
+        or (k.endswith("*") and word.startswith(k[:-1]))
+    }
+
+
+def _tag_types(tag: str) -> set[str]:
+    words = _WORD.findall(tag.lower())
+    phrase = f" {' '.join(words)} "
+    types = {
+        event_type
+        for event_type, keywords in GENRE_KEYWORDS.items()
+        for k in keywords
+        if " " in k and f" {k} " in phrase
+    }
+    for word in words:
+        types |= _word_types(word)
+    return types
+
+
+def map_genre_tags(tags: Iterable[str]) -> Optional[EventType]:
+    """
+    Return the event type matching the tags, or None if no type or more than
+    one type matches.
+    """
+
+    matches = set().union(*(_tag_types(tag) for tag in tags))
+    return matches.pop() if len(matches) == 1 else None  # type: ignore[return-value]
@@ -0,0 +1,674 @@
+"""
+Ingestion of event listings: crawling, parsing and persisting.
+"""
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, List, Optional
+from uuid import uuid4
+
+import httpx
+import requests
+
+from scheduler_app.infra.archive import get_html_archive
+from scheduler_app.infra.async_crawler import AsyncCrawler
+from scheduler_app.infra.crawler import (
+    build_url,
+    fetch_website_cached,
+    fetch_range,
+    fetch_pages_or_none,
+    stream_page,
+)
+from scheduler_app.infra.writer import get_database_writer
+from scheduler_app.infra.database import (
+    count_events_for_date,
+    delete_events_from_db,
+    load_event_hashes,
+    load_listing_hash,
+    persist_events_to_db,
+    save_crawl_status,
+    save_event_hashes,
+    save_listing_hash,
+    touch_crawl_status,
+)
+from scheduler_app.models.event import Event
+from scheduler_app.services.enrichment import aenrich_events, enrich_events
+from scheduler_app.services.change_detection import (
+    EventDiff,
+    combine_page_hashes,
+    diff_events,
+    hash_pages,
+)
+from scheduler_app.services.parser import (
+    StreamingListingParser,
+    extract_events,
+    extract_events_many,
+    extract_pagination_urls_many,
+    page_number,
+    parse_pool,
+)
+
+
+MAX_PAGES = 20    # result pages per day, including the first one
+MAX_CONCURRENT_INGESTIONS = 16    # days processed at once by aingest_dates
+WRITE_BATCH_SIZE = 500    # events per database write of batch ingestions
+STREAM_BATCH_SIZE = 50    # events per database write in ingest_date_streaming
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("INGEST_STREAMING", "false").lower() in ("1", "true", "yes")
+
+
+def _next_page_urls(
+        links: List[List[str]], seen: set[str], limit: int
+    ) -> List[str]:
+    new_urls = []
+    for page_links in links:
+        for link in page_links:
+            if link not in seen:
+                seen.add(link)
+                new_urls.append(link)
+    return new_urls[:limit]
+
+
+def collect_pages_many(
+        first_pages: dict[str, tuple[str, str]],
+        max_workers: Optional[int] = None,
+        executor: Optional[ProcessPoolExecutor] = None,
+    ) -> dict[str, List[tuple[str, str]]]:
+    """
+    Return url and html of the first result page and all further pages it
+    links to for many listings, keyed like first_pages and ordered by page
+    number. Each round scans the newest pages of all listings for links on
+    the process pool and fetches all pages found concurrently; pages only
+    revealed by a fetched page follow in the next round. Listings with a page
+    that fails to load are left out, so that their stored events are not
+    compared against an incomplete listing.
+    """
+
+    pages = {key: [page] for key, page in first_pages.items()}
+    seen = {key: {url} for key, (url, _) in first_pages.items()}
+    frontier = dict(pages)
+
+    while frontier:
+        scanned = [page for key in frontier for page in frontier[key]]
+        links = iter(extract_pagination_urls_many(scanned, max_workers, executor))
+
+        new_urls: dict[str, List[str]] = {}
+        for key, key_frontier in frontier.items():
+            urls = _next_page_urls(
+                [next(links) for _ in key_frontier],
+                seen[key],
+                MAX_PAGES - len(pages[key]),
+            )
+            if urls:
+                new_urls[key] = urls
+        if not new_urls:
+            break
+
+        htmls = iter(
+            fetch_pages_or_none([u for urls in new_urls.values() for u in urls])
+        )
+        frontier = {
+            key: [(u, next(htmls)) for u in urls]
+            for key, urls in new_urls.items()
+        }
+        for key, key_frontier in list(frontier.items()):
+            if any(html is None for _, html in key_frontier):
+                print(f"Skipping listing {key}: not all result pages loaded.")
+                del frontier[key], pages[key]
+                continue
+            pages[key].extend(key_frontier)
+
+    return {
+        key: sorted(key_pages, key=lambda page: page_number(page[0]))
+        for key, key_pages in pages.items()
+    }
+
+
+def collect_pages(url: str, html: str) -> List[tuple[str, str]]:
+    """
+    Return url and html of the first result page and all further pages it
+    links to, ordered by page number. All pages known at a time are fetched
+    concurrently; pages only revealed by a fetched page follow in the next
+    round. Raises a RequestException if a further page fails to load.
+    """
+
+    pages = collect_pages_many({url: (url, html)}, max_workers=1).get(url)
+    if pages is None:
+        raise requests.exceptions.RequestException(
+            f"Failed to fetch all result pages of {url}"
+        )
+    return pages
+
+
+def archive_pages(select_date: str, pages: List[tuple[str, str]]) -> None:
+    """
+    Keep the raw html of the pages, as one crawl of the day, if the archive
+    is enabled.
+    """
+
+    archive = get_html_archive()
+    if archive is None:
+        return
+    crawl_id = uuid4().hex
+    for page_url, page_html in pages:
+        archive.put(select_date, page_url, page_html, crawl_id)
+
+
+def extract_events_from_pages(pages: List[tuple[str, str]]) -> List[Event]:
+    """
+    Parse all pages of a listing and merge the events in page order, dropping
+    events repeated on a later page.
+    """
+
+    return merge_page_events(
+        [extract_events(page_html, page_url) for page_url, page_html in pages]
+    )
+
+
+def merge_page_events(page_events: List[List[Event]]) -> List[Event]:
+    """
+    Merge the events parsed from the pages of a listing in page order,
+    dropping events repeated on a later page.
+    """
+
+    events: dict[str, Event] = {}
+    for page in page_events:
+        for event in page:
+            events.setdefault(event.event_id, event)
+    return list(events.values())
+
+
+def diff_listings(
+        db_path: str,
+        listings: dict[str, List[tuple[str, str]]],
+        executor: Optional[ProcessPoolExecutor] = None,
+    ) -> List[EventDiff]:
+    """
+    Parse the pages of many days' listings on a process pool (the given
+    executor or a new one) and diff each day against its stored content
+    hashes, in the order of the listings.
+    """
+
+    all_pages = [page for pages in listings.values() for page in pages]
+    parsed = iter(extract_events_many(all_pages, executor=executor))
+
+    diffs = []
+    for select_date, pages in listings.items():
+        events = merge_page_events([next(parsed) for _ in pages])
+        diffs.append(_diff_parsed(db_path, select_date, pages, events))
+    return diffs
+
+
+def listing_unchanged(
+        db_path: str, select_date: str, pages: List[tuple[str, str]]
+    ) -> bool:
+    """
+    Return whether the listing needs no parsing: the hash over all its
+    result pages matches the stored one and its events are stored.
+    """
+
+    url = pages[0][0]
+    unchanged = load_listing_hash(db_path, select_date, url) == hash_pages(pages)
+    return unchanged and count_events_for_date(db_path, select_date) > 0
+
+
+def diff_listing(
+        db_path: str, select_date: str, pages: List[tuple[str, str]]
+    ) -> EventDiff:
+    """
+    Parse all pages of a day's listing and diff the events against the
+    stored content hashes.
+    """
+
+    events = extract_events_from_pages(pages)
+    return _diff_parsed(db_path, select_date, pages, events)
+
+
+def _diff_parsed(
+        db_path: str,
+        select_date: str,
+        pages: List[tuple[str, str]],
+        events: List[Event],
+    ) -> EventDiff:
+    diff = diff_events(select_date, load_event_hashes(db_path, select_date), events)
+    diff.page_url = pages[0][0]
+    diff.listing_hash = hash_pages(pages)
+    _keep_unseen_if_truncated(diff, len(pages))
+    return diff
+
+
+def _keep_unseen_if_truncated(diff: EventDiff, n_pages: int) -> None:
+    """
+    Keep the stored events not seen in the listing if it may have been cut
+    at MAX_PAGES, as they may be on the pages not fetched.
+    """
+
+    if n_pages >= MAX_PAGES and diff.removed:
+        print(
+            f"Listing for {diff.select_date} reached {MAX_PAGES} pages; "
+            f"keeping {len(diff.removed)} events not seen on them."
+        )
+        diff.removed = []
+
+
+def apply_diffs(db_path: str, diffs: List[EventDiff]) -> None:
+    """
+    Persist added and changed events with their hashes, delete removed events
+    and record the listing hashes. Unchanged events are not rewritten, which
+    keeps their augmentation.
+    """
+
+    modified = [e for d in diffs for e in d.modified]
+    content_hashes = {k: v for d in diffs for k, v in d.content_hashes.items()}
+    persist_events_to_db(db_path, modified)
+    save_event_hashes(db_path, modified, content_hashes)
+    delete_events_from_db(db_path, [i for d in diffs for i in d.removed])
+
+    for d in diffs:
+        if d.page_url and d.listing_hash:
+            save_listing_hash(db_path, d.select_date, d.page_url, d.listing_hash)
+        record_crawl(db_path, d)
+
+
+def write_diffs(
+        db_path: str, diffs: List[EventDiff], batch_size: int = WRITE_BATCH_SIZE
+    ) -> None:
+    """
+    Apply the diffs through the process's database writer in batches of
+    about batch_size modified events, so snapshots for other processes are
+    published along the way, and wait for all of them.
+    """
+
+    db_writer = get_database_writer(db_path)
+    futures = []
+    batch: List[EventDiff] = []
+    for diff in diffs:
+        batch.append(diff)
+        if sum(len(d.modified) for d in batch) >= batch_size:
+            futures.append(db_writer.submit(apply_diffs, batch, coalesce=False))
+            batch = []
+    if batch:
+        futures.append(db_writer.submit(apply_diffs, batch, coalesce=False))
+    for future in futures:
+        future.result()
+
+
+def record_crawl(db_path: str, diff: EventDiff) -> None:
+    """
+    Update the crawl status catalog for the day of an applied diff.
+    """
+
+    if diff.listing_unchanged:
+        touch_crawl_status(db_path, diff.select_date)
+    else:
+        save_crawl_status(
+            db_path,
+            diff.select_date,
+            diff.listing_hash,
+            len(diff.modified) + diff.unchanged,
+            bool(diff.modified),
+            diff.fetched_at,
+        )
+
+
+def ingest_date(db_path: str, select_date: str) -> EventDiff:
+    """
+    Crawl, parse and persist the events for a single day and return the
+    changes against the stored events. Listings whose pages are all
+    unchanged are not parsed.
+    """
+
+    _, url, html, _ = fetch_website_cached(select_date)
+    pages = collect_pages(url, html)
+    if listing_unchanged(db_path, select_date, pages):
+        diff = EventDiff(select_date=select_date, listing_unchanged=True)
+        record_crawl(db_path, diff)
+        return diff
+
+    archive_pages(select_date, pages)
+
+    diff = diff_listing(db_path, select_date, pages)
+    enrich_events(diff.modified)
+    apply_diffs(db_path, [diff])
+    return diff
+
+
+class _StreamingIngestion:
+    """
+    Diffs events one at a time as they are parsed and persists the modified
+    ones in batches, so writing starts before the listing is fully loaded.
+    Batches are enriched and written on a worker thread: enrichment fetches
+    detail pages, which must not wait for the throttle slot that the stream
+    of the listing page holds.
+    """
+
+    def __init__(self, db_path: str, select_date: str, batch_size: int):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.stored_hashes = load_event_hashes(db_path, select_date)
+        self.diff = EventDiff(select_date=select_date)
+        self.seen: set[str] = set()
+        self.pending: List[Event] = []
+        self._worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="stream-writer"
+        )
+        self._writes: List[Future] = []
+
+    def add(self, events: Iterable[Event]) -> None:
+        for event in events:
+            if event.event_id in self.seen:
+                continue
+            self.seen.add(event.event_id)
+
+            if self.diff.classify(event, self.stored_hashes.get(event.event_id)):
+                self.pending.append(event)
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+
+    def _write(self, events: List[Event], content_hashes: dict[str, str]) -> None:
+        enrich_events(events)
+        persist_events_to_db(self.db_path, events)
+        save_event_hashes(self.db_path, events, content_hashes)
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        content_hashes = {
+            e.event_id: self.diff.content_hashes[e.event_id] for e in self.pending
+        }
+        self._writes.append(
+            self._worker.submit(self._write, self.pending, content_hashes)
+        )
+        self.pending = []
+
+    def close(self) -> None:
+        """
+        Wait for the batches handed to the worker and stop it; re-raises the
+        first failed write.
+        """
+
+        self._worker.shutdown(wait=True)
+        for write in self._writes:
+            write.result()
+
+    def finish(self, n_pages: int) -> EventDiff:
+        self.flush()
+        self.close()
+        self.diff.removed = [i for i in self.stored_hashes if i not in self.seen]
+        _keep_unseen_if_truncated(self.diff, n_pages)
+        delete_events_from_db(self.db_path, self.diff.removed)
+        if self.diff.page_url and self.diff.listing_hash:
+            save_listing_hash(
+                self.db_path,
+                self.diff.select_date,
+                self.diff.page_url,
+                self.diff.listing_hash,
+            )
+        record_crawl(self.db_path, self.diff)
+        return self.diff
+
+
+def _stream_listing_page(
+        url: str, ingestion: _StreamingIngestion
+    ) -> tuple[List[str], str]:
+    page_hash = hashlib.sha256()
+    with stream_page(url) as (chunks, encoding):
+        parser = StreamingListingParser(url, encoding)
+        for chunk in chunks:
+            page_hash.update(chunk)
+            ingestion.add(parser.feed(chunk))
+        ingestion.add(parser.close())
+    return parser.pagination_urls, page_hash.hexdigest()
+
+
+def ingest_date_streaming(
+        db_path: str, select_date: str, batch_size: int = STREAM_BATCH_SIZE
+    ) -> EventDiff:
+    """
+    Variant of ingest_date that parses the listing while it downloads and
+    persists changed events in batches as they appear, keeping only about one
+    article in memory at a time. Further result pages are streamed one after
+    the other. The HTTP cache and the html archive are not used.
+    """
+
+    url = build_url(select_date)
+    ingestion = _StreamingIngestion(db_path, select_date, batch_size)
+
+    try:
+        next_urls, page_hash = _stream_listing_page(url, ingestion)
+        page_hashes = {url: page_hash}
+
+        while next_urls and len(page_hashes) < MAX_PAGES:
+            page_url = next_urls.pop(0)
+            if page_url in page_hashes:
+                continue
+            more_urls, page_hashes[page_url] = _stream_listing_page(
+                page_url, ingestion
+            )
+            next_urls.extend(u for u in more_urls if u not in page_hashes)
+    except BaseException:
+        # Let the batches handed over so far finish before failing
+        ingestion.close()
+        raise
+
+    ingestion.diff.page_url = url
+    # Equal to hash_pages(pages) for the UTF-8 pages of the website
+    ingestion.diff.listing_hash = combine_page_hashes([
+        page_hashes[u] for u in sorted(page_hashes, key=page_number)
+    ])
+    return ingestion.finish(len(page_hashes))
+
+
+def ingest_range(
+        db_path: str, start_date: str, end_date: str
+    ) -> List[EventDiff]:
+    """
+    Crawl the days from start_date to end_date (inclusive) concurrently,
+    scan them for further result pages and parse the changed listings on one
+    process pool, and persist the changes in batches through the database
+    writer.
+    """
+
+    first_pages = {
+        select_date: (url, html)
+        for select_date, url, html in fetch_range(start_date, end_date)
+    }
+
+    diffs: List[EventDiff] = []
+    listings: dict[str, List[tuple[str, str]]] = {}
+    with parse_pool() as executor:
+        for select_date, pages in collect_pages_many(
+            first_pages, executor=executor
+        ).items():
+            if listing_unchanged(db_path, select_date, pages):
+                diffs.append(
+                    EventDiff(select_date=select_date, listing_unchanged=True)
+                )
+                continue
+            archive_pages(select_date, pages)
+            listings[select_date] = pages
+
+        diffs += diff_listings(db_path, listings, executor)
+    diffs.sort(key=lambda d: d.select_date)
+
+    enrich_events([e for d in diffs for e in d.modified])
+    write_diffs(db_path, diffs)
+    return diffs
+
+
+def replay_archive(
+        db_path: str,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        persist: bool = True,
+    ) -> List[EventDiff]:
+    """
+    Re-run parsing (and, if persist is set, persistence) over the pages of
+    the latest archived crawl of every day in the range, without network
+    access. Pages
+    are parsed on a process pool and the changes persisted in batches through
+    the database writer. The crawl catalog records the days as fetched when
+    they were archived, not now.
+    """
+
+    archive = get_html_archive()
+    if archive is None:
+        raise RuntimeError("HTML_ARCHIVE_DIR is not set.")
+
+    pages_by_date: dict[str, List[tuple[str, str]]] = {}
+    fetched_at: dict[str, datetime] = {}
+    for entry in archive.entries(start_date, end_date):
+        pages_by_date.setdefault(entry.select_date, []).append(
+            (entry.page_url, archive.get(entry.content_hash))
+        )
+        fetched_at[entry.select_date] = min(
+            fetched_at.get(entry.select_date, datetime.max),
+            datetime.fromisoformat(entry.fetched_at),
+        )
+
+    diffs = diff_listings(
+        db_path,
+        {
+            select_date: sorted(pages, key=lambda page: page_number(page[0]))
+            for select_date, pages in pages_by_date.items()
+        },
+    )
+    for diff in diffs:
+        diff.fetched_at = fetched_at[diff.select_date]
+
+    if persist:
+        write_diffs(db_path, diffs)
+    return diffs
+
+
+async def acollect_pages(
+        crawler: AsyncCrawler, url: str, html: str
+    ) -> List[tuple[str, str]]:
+    """
+    Async variant of collect_pages; link extraction runs in a worker thread.
+    """
+
+    pages = [(url, html)]
+    seen = {url}
+    frontier = pages
+
+    while len(pages) < MAX_PAGES:
+        links = await asyncio.to_thread(
+            extract_pagination_urls_many, frontier, 1
+        )
+        new_urls = _next_page_urls(links, seen, MAX_PAGES - len(pages))
+        if not new_urls:
+            break
+
+        frontier = list(zip(new_urls, await crawler.fetch_pages(new_urls)))
+        pages.extend(frontier)
+
+    return sorted(pages, key=lambda page: page_number(page[0]))
+
+
+async def _adiff_date(
+        crawler: AsyncCrawler, db_path: str, select_date: str
+    ) -> EventDiff:
+    _, url, html = await crawler.fetch_website(select_date)
+    pages = await acollect_pages(crawler, url, html)
+    unchanged = await asyncio.to_thread(
+        listing_unchanged, db_path, select_date, pages
+    )
+    if unchanged:
+        return EventDiff(select_date=select_date, listing_unchanged=True)
+
+    await asyncio.to_thread(archive_pages, select_date, pages)
+    events = await asyncio.to_thread(extract_events_from_pages, pages)
+    diff = await asyncio.to_thread(
+        _diff_parsed, db_path, select_date, pages, events
+    )
+    await aenrich_events(crawler, diff.modified)
+    return diff
+
+
+async def _aingest_dates(
+        crawler: AsyncCrawler,
+        db_path: str,
+        dates: List[str],
+        max_concurrency: int,
+        batch_size: int,
+    ) -> List[EventDiff]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+    queue: asyncio.Queue[EventDiff | None] = asyncio.Queue()
+    # All writes go through one writer thread; reads run concurrently
+    db_writer = get_database_writer(db_path)
+
+    async def produce(select_date: str) -> None:
+        async with semaphore:
+            try:
+                diff = await _adiff_date(crawler, db_path, select_date)
+            except httpx.HTTPError as exc:
+                print(f"Failed to fetch event listing for {select_date}: {exc}")
+                return
+        await queue.put(diff)
+
+    async def flush(batch: List[EventDiff]) -> None:
+        await asyncio.wrap_future(db_writer.submit(apply_diffs, batch))
+
+    async def write() -> List[EventDiff]:
+        written: List[EventDiff] = []
+        batch: List[EventDiff] = []
+        while (diff := await queue.get()) is not None:
+            batch.append(diff)
+            if sum(len(d.modified) for d in batch) >= batch_size:
+                await flush(batch)
+                written.extend(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+            written.extend(batch)
+        return written
+
+    writer = asyncio.create_task(write())
+    try:
+        await asyncio.gather(*(produce(d) for d in dates))
+    finally:
+        await queue.put(None)
+        written = await writer
+    return written
+
+
+async def aingest_dates(
+        db_path: str,
+        dates: List[str],
+        crawler: AsyncCrawler | None = None,
+        max_concurrency: int = MAX_CONCURRENT_INGESTIONS,
+        batch_size: int = WRITE_BATCH_SIZE,
+    ) -> List[EventDiff]:
+    """
+    Crawl and parse many days concurrently on one event loop and persist the
+    changes in batches through a single writer. Parsing and database writes run
+    in worker threads. Days that fail to load are reported and skipped.
+    """
+
+    if crawler is not None:
+        return await _aingest_dates(
+            crawler, db_path, dates, max_concurrency, batch_size
+        )
+
+    async with AsyncCrawler() as own_crawler:
+        return await _aingest_dates(
+            own_crawler, db_path, dates, max_concurrency, batch_size
+        )
+
+
+async def aingest_date(
+        db_path: str, select_date: str, crawler: AsyncCrawler | None = None
+    ) -> EventDiff | None:
+    """
+    Async variant of ingest_date for a single day (None if the day failed to
+    load).
+    """
+
+    diffs = await aingest_dates(db_path, [select_date], crawler=crawler)
+    return diffs[0] if diffs else None
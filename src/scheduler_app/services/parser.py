@@ -2,22 +2,30 @@
 Parser for the HTML content of the fetched website.
 """
 
+import json
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from urllib.parse import urljoin
-from typing import Optional, List, Dict
+from urllib.parse import urljoin, urlsplit, parse_qs
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 
 from scheduler_app.models.event import Event
 
 
+DEFAULT_PARSER_BACKEND = "lxml"
+
+_WS = re.compile(r"\s+")
+
+
 def _clean_text(s: Optional[str]) -> Optional[str]:
-    _ws = re.compile(r"\s+")
-    
     if not s:
         return None
-    s = _ws.sub(" ", s).strip()
+    s = _WS.sub(" ", s).strip()
     return s or None
 
 
@@ -71,43 +79,399 @@ def _extract_short_description(article: BeautifulSoup) -> Optional[str]:
     return _clean_text(container.get_text(" ", strip=True))
 
 
-def extract_events(html: str, page_url: str) -> List[Event]:
-    """
-    Extracts event details from the HTML.
-    """
-    
+def _build_event(
+        event_name: Optional[str],
+        raw_date: Optional[str],
+        raw_time: Optional[str],
+        event_venue: Optional[str],
+        event_description: Optional[str],
+        href: Optional[str],
+        page_url: str,
+    ) -> Event:
+    return Event.from_dict({
+        "event_name": event_name,
+        "event_date": (
+            datetime.strptime(raw_date, "%d.%m.%Y").strftime("%Y-%m-%d")
+            if raw_date else None
+        ),
+        "event_time": raw_time[:5] if raw_time else None,
+        "event_venue": event_venue,
+        "event_description": event_description,
+        "event_url": urljoin(page_url, href) if href else None,
+    })
+
+
+def _extract_events_bs4(html: str, page_url: str) -> List[Event]:
     soup = BeautifulSoup(html, "lxml")
 
     events: List[Event] = []
 
     for art in soup.select("article.listTeaser-event"):
-        event_dict = {}
-
         title_el = art.select_one("div.listTeaser-event__text > h3")
         event_name = _clean_text(
             title_el.get_text(" ", strip=True)
         ) if title_el else None
-        event_dict["event_name"] = event_name
 
         info = _extract_info_list(art)
-        raw_date = info["event_date"]
-        event_dict["event_date"] = (
-            datetime.strptime(raw_date, "%d.%m.%Y").strftime("%Y-%m-%d")
-            if raw_date else None
-        )
-        raw_time = info["event_time"]
-        event_dict["event_time"] = raw_time[:5] if raw_time else None
-        event_dict["event_venue"] = info["event_venue"]
-
-        event_description = _extract_short_description(art)
-        event_dict["event_description"] = event_description
 
         link_el = art.select_one("a.listTeaser-event__link[href]")
-        event_url = urljoin(
-            page_url, link_el["href"]
-        ) if link_el and link_el.get("href") else None
-        event_dict["event_url"] = event_url
+        href = link_el.get("href") if link_el else None
 
-        events.append(Event.from_dict(event_dict))
+        events.append(_build_event(
+            event_name,
+            info["event_date"],
+            info["event_time"],
+            info["event_venue"],
+            _extract_short_description(art),
+            href,
+            page_url,
+        ))
 
     return events
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+_XP_ARTICLES = etree.XPath(f"//article[{_has_class('listTeaser-event')}]")
+_XP_TITLE = etree.XPath(f".//div[{_has_class('listTeaser-event__text')}]/h3")
+_XP_INFO_ITEMS = etree.XPath(
+    f"(.//ul[{_has_class('listTeaser-event__text__infos')}])[1]//li"
+)
+_XP_DESCRIPTION = etree.XPath(f".//div[{_has_class('listTeaser-event__text')}]/p")
+_XP_LINK = etree.XPath(f".//a[{_has_class('listTeaser-event__link')}][@href]")
+_XP_ICONS = {
+    key: (icon, etree.XPath(f".//*[{_has_class(icon)}]"))
+    for key, icon in (
+        ("event_date", "icon-calendar"),
+        ("event_time", "icon-clock"),
+        ("event_venue", "icon-located"),
+    )
+}
+
+
+def _lxml_text(el) -> Optional[str]:
+    return _clean_text(
+        " ".join(t.strip() for t in el.xpath(".//text()") if t.strip())
+    )
+
+
+def _event_from_lxml_article(art, page_url: str) -> Event:
+    title_els = _XP_TITLE(art)
+    event_name = _lxml_text(title_els[0]) if title_els else None
+
+    info: Dict[str, Optional[str]] = dict.fromkeys(_XP_ICONS)
+    for li in _XP_INFO_ITEMS(art):
+        li_text = _lxml_text(li)
+        if not li_text:
+            continue
+        for key, (icon, has_icon) in _XP_ICONS.items():
+            if has_icon(li):
+                info[key] = _clean_text(li_text.replace(icon, "")) or li_text
+                break
+
+    description_els = _XP_DESCRIPTION(art)
+    event_description = (
+        _lxml_text(description_els[0]) if description_els else None
+    )
+
+    link_els = _XP_LINK(art)
+    href = link_els[0].get("href") if link_els else None
+
+    return _build_event(
+        event_name,
+        info["event_date"],
+        info["event_time"],
+        info["event_venue"],
+        event_description,
+        href,
+        page_url,
+    )
+
+
+def _extract_events_lxml(html: str, page_url: str) -> List[Event]:
+    if not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+
+    return [_event_from_lxml_article(art, page_url) for art in _XP_ARTICLES(root)]
+
+
+parser_backend_registry: Dict[str, Callable[[str, str], List[Event]]] = {
+    "bs4": _extract_events_bs4,
+    "lxml": _extract_events_lxml,
+}
+
+
+def extract_events(
+        html: str, page_url: str, backend: Optional[str] = None
+    ) -> List[Event]:
+    """
+    Extracts event details from the HTML. The parser backend defaults to the
+    PARSER_BACKEND environment variable and falls back to lxml.
+    """
+
+    backend = backend or os.getenv("PARSER_BACKEND", DEFAULT_PARSER_BACKEND)
+    try:
+        parse = parser_backend_registry[backend]
+    except KeyError:
+        raise ValueError(f"Unsupported parser backend: '{backend}'.")
+
+    return parse(html, page_url)
+
+
+def _extract_page(task: tuple[str, str, str]) -> List[Event]:
+    page_url, html, backend = task
+    return extract_events(html, page_url, backend)
+
+
+def parse_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Process pool for parsing pages, to share across the parsing steps of one
+    ingestion.
+    """
+
+    # Callers hold thread pools and database threads, which fork() would copy
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _map_pages(
+        fn: Callable,
+        tasks: list,
+        max_workers: Optional[int],
+        executor: Optional[ProcessPoolExecutor],
+    ) -> list:
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [fn(task) for task in tasks]
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    if executor is not None:
+        return list(executor.map(fn, tasks, chunksize=chunksize))
+    with parse_pool(workers) as own_executor:
+        return list(own_executor.map(fn, tasks, chunksize=chunksize))
+
+
+def extract_events_many(
+        pages: List[tuple[str, str]],
+        backend: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[ProcessPoolExecutor] = None,
+    ) -> List[List[Event]]:
+    """
+    Extracts the events of many (url, html) pages, distributed across a
+    process pool (the given executor or a new one), and returns them per page
+    in the order of the pages. Runs in-process for a single page or worker.
+    """
+
+    backend = backend or os.getenv("PARSER_BACKEND", DEFAULT_PARSER_BACKEND)
+    if backend not in parser_backend_registry:
+        raise ValueError(f"Unsupported parser backend: '{backend}'.")
+
+    tasks = [(page_url, html, backend) for page_url, html in pages]
+    return _map_pages(_extract_page, tasks, max_workers, executor)
+
+
+def page_number(url: str) -> int:
+    """
+    Return the value of the page query parameter of the URL (0 if absent).
+    """
+
+    values = parse_qs(urlsplit(url).query).get("page")
+    try:
+        return int(values[0]) if values else 0
+    except ValueError:
+        return 0
+
+
+_XP_PAGINATION_LINKS = etree.XPath(
+    f"//a[(@data-ajax-url and {_has_class('readMore__link')})"
+    " or (contains(@href, 'page=') and contains(@href, 'veranstaltungskalender'))]"
+)
+
+
+def _pagination_candidate(a) -> Optional[str]:
+    """
+    The link of a further result page an anchor points to, if any: the
+    "Mehr anzeigen" trigger (data-ajax-url) or a pager link carrying a page
+    parameter.
+    """
+
+    href = a.get("href") or ""
+    if "readMore__link" in (a.get("class") or "").split() and a.get("data-ajax-url"):
+        return a.get("data-ajax-url")
+    if "page=" in href and "veranstaltungskalender" in href:
+        return href
+    return None
+
+
+def extract_pagination_urls(html: str, page_url: str) -> List[str]:
+    """
+    Extracts the URLs of further result pages, ordered by page number.
+    """
+
+    if not html.strip():
+        return []
+    root = lxml_html.fromstring(html)
+
+    candidates = (_pagination_candidate(a) for a in _XP_PAGINATION_LINKS(root))
+    urls = dict.fromkeys(urljoin(page_url, c) for c in candidates if c)
+    return sorted((u for u in urls if page_number(u) > 0), key=page_number)
+
+
+def _extract_page_links(task: tuple[str, str]) -> List[str]:
+    page_url, html = task
+    return extract_pagination_urls(html, page_url)
+
+
+def extract_pagination_urls_many(
+        pages: List[tuple[str, str]],
+        max_workers: Optional[int] = None,
+        executor: Optional[ProcessPoolExecutor] = None,
+    ) -> List[List[str]]:
+    """
+    Extracts the URLs of further result pages of many (url, html) pages like
+    extract_events_many, per page in the order of the pages.
+    """
+
+    return _map_pages(_extract_page_links, list(pages), max_workers, executor)
+
+
+def _json_ld_description(soup: BeautifulSoup) -> Optional[str]:
+    for script in soup.select('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(script.string or "")
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            items = data.get("@graph", [data])
+        elif isinstance(data, list):
+            items = data
+        else:
+            continue
+        if not isinstance(items, list):
+            items = [items]
+        for item in items:
+            if isinstance(item, dict) and item.get("description"):
+                return str(item["description"])
+    return None
+
+
+def extract_event_details(html: str) -> Dict[str, object]:
+    """
+    Extracts the full description and the genre tags from an event detail
+    page. The description is the longest of the JSON-LD, microdata and meta
+    descriptions; genre tags are read from the profiling list, e.g.:
+      <ul class="...__profiling"><li>Punkrock, Metal &amp; Hardcore</li></ul>
+    """
+
+    soup = BeautifulSoup(html, "lxml")
+
+    candidates = [_json_ld_description(soup)]
+    for selector in (
+        '[itemprop="description"]',
+        'meta[property="og:description"]',
+        'meta[name="description"]',
+    ):
+        el = soup.select_one(selector)
+        if el is not None:
+            candidates.append(
+                el.get("content") if el.name == "meta" else el.get_text(" ", strip=True)
+            )
+    descriptions = [c for c in map(_clean_text, candidates) if c]
+
+    genres = []
+    for li in soup.select("ul[class*='__profiling'] li"):
+        for tag in re.split(r",|&|/", li.get_text(" ", strip=True)):
+            tag = _clean_text(tag)
+            if tag and tag not in genres:
+                genres.append(tag)
+
+    return {
+        "event_description": max(descriptions, key=len) if descriptions else None,
+        "genres": genres,
+    }
+
+
+class StreamingListingParser:
+    """
+    Incremental parser for listing pages fed in chunks. Events are returned as
+    soon as their article.listTeaser-event closes; finished elements are
+    cleared, so memory is bounded by roughly one article. URLs of further
+    result pages are collected along the way.
+    """
+
+    def __init__(self, page_url: str, encoding: Optional[str] = None):
+        self.page_url = page_url
+        self.pagination_urls: List[str] = []
+        self._parser = etree.HTMLPullParser(
+            events=("start", "end"), encoding=encoding
+        )
+        self._open_articles = 0
+
+    @staticmethod
+    def _is_article(el) -> bool:
+        return el.tag == "article" and "listTeaser-event" in (
+            el.get("class") or ""
+        ).split()
+
+    def _drain(self) -> List[Event]:
+        events: List[Event] = []
+        for action, el in self._parser.read_events():
+            if not isinstance(el.tag, str):
+                continue
+            if action == "start":
+                if self._is_article(el):
+                    self._open_articles += 1
+                continue
+
+            if self._is_article(el):
+                events.append(_event_from_lxml_article(el, self.page_url))
+                self._open_articles -= 1
+                el.clear(keep_tail=True)
+                # Drop the articles already returned
+                while el.getprevious() is not None:
+                    del el.getparent()[0]
+            elif self._open_articles == 0:
+                if el.tag == "a":
+                    self._collect_link(el)
+                el.clear(keep_tail=True)
+        return events
+
+    def _collect_link(self, a) -> None:
+        candidate = _pagination_candidate(a)
+        if candidate is None:
+            return
+
+        url = urljoin(self.page_url, candidate)
+        if page_number(url) > 0 and url not in self.pagination_urls:
+            self.pagination_urls.append(url)
+            self.pagination_urls.sort(key=page_number)
+
+    def feed(self, chunk: bytes | str) -> List[Event]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[Event]:
+        self._parser.close()
+        return self._drain()
+
+
+def iter_events(
+        chunks: Iterable[bytes | str],
+        page_url: str,
+        encoding: Optional[str] = None,
+        parser: Optional[StreamingListingParser] = None,
+    ) -> Iterator[Event]:
+    """
+    Yields the events of a listing page while its chunks arrive.
+    """
+
+    parser = parser or StreamingListingParser(page_url, encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
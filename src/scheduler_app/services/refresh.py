@@ -0,0 +1,67 @@
+"""
+Background refresh of stale days, so they can be served from the database
+while they are crawled and augmented again.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+
+REFRESH_WORKERS = 1    # refreshes running at the same time
+
+
+def serve_stale_enabled() -> bool:
+    return os.getenv("SERVE_STALE", "false").lower() in ("1", "true", "yes")
+
+
+class BackgroundRefresher:
+    """
+    Runs refreshes of days on worker threads, at most one per day at a time:
+    scheduling a day that is already being refreshed returns the running
+    refresh. Failures are reported and do not reach the caller.
+    """
+
+    def __init__(self, max_workers: int = REFRESH_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="refresh"
+        )
+        self._running: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, select_date: str, refresh: Callable[[], None]) -> Future:
+        with self._lock:
+            future = self._running.get(select_date)
+            if future is None:
+                future = self._executor.submit(self._run, select_date, refresh)
+                self._running[select_date] = future
+        return future
+
+    def _run(self, select_date: str, refresh: Callable[[], None]) -> None:
+        try:
+            refresh()
+        except Exception as exc:
+            print(f"Failed to refresh events for {select_date}: {exc}")
+        finally:
+            with self._lock:
+                self._running.pop(select_date, None)
+
+    def close(self) -> None:
+        """
+        Wait for the running refreshes and stop the workers.
+        """
+
+        self._executor.shutdown(wait=True)
+
+
+_refresher: BackgroundRefresher | None = None
+_refresher_lock = threading.Lock()
+
+
+def get_refresher() -> BackgroundRefresher:
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = BackgroundRefresher()
+        return _refresher
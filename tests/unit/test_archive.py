@@ -0,0 +1,54 @@
+"""
+Unit tests for the html archive.
+"""
+
+from scheduler_app.infra import archive as archive_module
+from scheduler_app.infra.archive import HtmlArchive
+
+
+def test_put_and_get_roundtrip_stores_identical_pages_once(tmp_path):
+    archive = HtmlArchive(str(tmp_path))
+
+    h1 = archive.put("2026-02-20", "https://example.com/a", "<html>ä</html>")
+    h2 = archive.put("2026-02-21", "https://example.com/b", "<html>ä</html>")
+
+    assert h1 == h2
+    assert archive.get(h1) == "<html>ä</html>"
+    assert len(list((tmp_path / "objects").rglob("*.html.*"))) == 1
+
+
+def test_entries_returns_latest_fetch_per_date_and_url(tmp_path):
+    archive = HtmlArchive(str(tmp_path))
+
+    archive.put("2026-02-20", "https://example.com/a", "<html>old</html>")
+    new_hash = archive.put("2026-02-20", "https://example.com/a", "<html>new</html>")
+    archive.put("2026-02-22", "https://example.com/a", "<html>later</html>")
+
+    entries = archive.entries(end_date="2026-02-21")
+
+    assert len(entries) == 1
+    assert entries[0].content_hash == new_hash
+
+
+def test_gzip_fallback_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "zstandard", None)
+    archive = HtmlArchive(str(tmp_path))
+
+    content_hash = archive.put("2026-02-20", "https://example.com/a", "<html></html>")
+
+    assert archive.find_object(content_hash).suffix == ".gz"
+    assert archive.get(content_hash) == "<html></html>"
+
+
+def test_entries_returns_only_the_pages_of_the_latest_crawl(tmp_path):
+    archive = HtmlArchive(str(tmp_path))
+
+    archive.put("2026-02-20", "https://example.com/a", "<html>a1</html>", "c1")
+    archive.put("2026-02-20", "https://example.com/b", "<html>b1</html>", "c1")
+    new_hash = archive.put(
+        "2026-02-20", "https://example.com/a", "<html>a2</html>", "c2"
+    )
+
+    entries = archive.entries()
+
+    assert [e.content_hash for e in entries] == [new_hash]
@@ -0,0 +1,375 @@
+"""
+Unit tests for the augment events node.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+from datetime import date, time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import ValidationError
+
+from scheduler_app.graph.state import AgentState
+from scheduler_app.graph.nodes import augment_events as node
+from scheduler_app.infra.database import (
+    count_typed_events,
+    load_crawl_status,
+    load_events_from_db,
+    load_pending_augmentation_ids,
+    mark_events_augmented,
+    persist_events_to_db,
+    release_connection,
+    save_crawl_status,
+    save_event_hashes,
+)
+from scheduler_app.infra import llm
+from scheduler_app.infra.llm import TokenCounter
+from scheduler_app.models.event import AugmentationResult, Event, EventPatch
+from scheduler_app.services.augmentation import (
+    augmentation_cache_stats,
+    augmentation_key,
+    chunk_events,
+    fit_to_budget,
+)
+
+
+class _FakeLLM:
+    def __init__(self, augment):
+        self._augment = augment
+
+    def bind_tools(self, tools):
+        return self
+
+    def with_structured_output(self, model, include_raw=False):
+        def invoke(msg):
+            output = self._augment(msg)
+            if isinstance(output, str):    # raw JSON, possibly invalid
+                try:
+                    parsed = model.model_validate_json(output)
+                except ValidationError:
+                    parsed = None
+                return {"raw": AIMessage(content=output), "parsed": parsed}
+            return {"raw": AIMessage(content=output.model_dump_json()),
+                    "parsed": output}
+
+        return RunnableLambda(invoke)
+
+
+def _setup(tmp_path, monkeypatch, augment, n_events=5):
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setenv("DUCKDB_PATH", db_path)
+    monkeypatch.setenv("LLM_SERVICE", "OpenAI")
+    monkeypatch.setenv("BUDGET_LIMIT", "1")
+    monkeypatch.setenv("OPENAI_INPUT_COST_PER_M", "0.15")
+    monkeypatch.setenv("OPENAI_OUTPUT_COST_PER_M", "0.60")
+    monkeypatch.setenv("AUGMENT_CHUNK_TOKENS", "1")    # one event per chunk
+    monkeypatch.setattr(llm, "RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(
+        node, "create_llm_client",
+        lambda service, dollars_already_spent, budget_exceeded: (
+            _FakeLLM(augment),
+            TokenCounter(service, dollars_already_spent, budget_exceeded),
+        ),
+    )
+
+    events = [
+        Event(f"id{i}", f"Concert {i}", date(2020, 1, 2), time(20, 0))
+        for i in range(n_events)
+    ]
+    persist_events_to_db(db_path, events)
+    save_event_hashes(db_path, events)
+    save_crawl_status(db_path, "2020-01-02", "abc", n_events, modified=True)
+    return db_path
+
+
+def _event_ids(msg) -> list:
+    return [e["event_id"] for e in json.loads(msg[-1][1])]
+
+
+def test_chunk_events_bounds_chunks_and_keeps_order():
+    events = [{"event_id": f"id{i}", "event_name": "x" * 40} for i in range(5)]
+
+    chunks = chunk_events(events, max_tokens=40)
+
+    assert [e for chunk in chunks for e in chunk] == events
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunk_events(events, max_tokens=1) == [[e] for e in events]
+
+
+def test_augment_events_retries_only_failed_chunks(tmp_path, monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        with lock:
+            calls.append(ids)
+            first_try = calls.count(ids) == 1
+        if ids == ["id3"] and first_try:
+            return "not json"
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Klassik", event_description="Text")
+            for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment)
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    assert sorted(calls) == [["id0"], ["id1"], ["id2"], ["id3"], ["id3"], ["id4"]]
+    assert {e.event_type for e in result["events_list"]} == {"Klassik"}
+    assert len(result["log_llmcalls"]) == 6
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == set()
+    assert load_crawl_status(db_path, "2020-01-02").augmented
+
+
+def test_augment_events_salvages_valid_patches_and_retries_the_rest(
+        tmp_path, monkeypatch
+    ):
+    calls = []
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        calls.append(ids)
+        if len(calls) > 1:
+            return AugmentationResult(patches=[
+                EventPatch(event_id=i, event_type="Klassik") for i in ids
+            ])
+        # id1 has an unknown type, id2 is missing
+        return json.dumps({"patches": [
+            {"event_id": "id0", "event_type": "Jazz, Blues, Funk"},
+            {"event_id": "id1", "event_type": "Oper"},
+        ]})
+
+    _setup(tmp_path, monkeypatch, augment, n_events=3)
+    monkeypatch.setenv("AUGMENT_CHUNK_TOKENS", "3000")
+    monkeypatch.setattr(llm, "RETRY_BACKOFF_SECONDS", 0.5)
+    delays = []
+    monkeypatch.setattr(node.time, "sleep", delays.append)
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    assert calls == [["id0", "id1", "id2"], ["id1", "id2"]]
+    assert delays == [0.5]
+    assert [e.event_type for e in result["events_list"]] == [
+        "Jazz, Blues, Funk", "Klassik", "Klassik"
+    ]
+    assert [llm.retry_delay(a) for a in (1, 2, 3)] == [0.5, 1.0, 2.0]
+
+
+def test_augment_events_checkpoints_finished_chunks(tmp_path, monkeypatch):
+    def augment(msg):
+        ids = _event_ids(msg)
+        if ids == ["id1"]:
+            raise RuntimeError("connection lost")
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Rock, Indie, Metal") for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment, n_events=2)
+    monkeypatch.setenv("AUGMENT_CONCURRENCY", "1")
+
+    try:
+        node.augment_events(AgentState(user_input_date="2020-01-02"))
+    except RuntimeError:
+        pass
+
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == {"id1"}
+    assert load_events_from_db(db_path, "2020-01-02")[0][5] == "Rock, Indie, Metal"
+    assert not load_crawl_status(db_path, "2020-01-02").augmented
+
+
+def test_augmentation_key_ignores_case_punctuation_and_spacing():
+    event = {"event_name": "Jazz Night: Vol. 2", "event_venue": "Birdland"}
+
+    assert augmentation_key(event) == augmentation_key(
+        {"event_name": "  jazz night vol 2", "event_venue": "BIRDLAND "}
+    )
+    assert augmentation_key(event) != augmentation_key(
+        {**event, "event_description": "Other teaser"}
+    )
+
+
+def test_augment_events_reuses_augmentations_across_dates(tmp_path, monkeypatch):
+    calls = []
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        calls.extend(ids)
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Klassik", event_description="Text")
+            for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment, n_events=2)
+    node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    # The same concerts a week later
+    later = [
+        Event(f"later{i}", f"Concert {i}", date(2020, 1, 9), time(20, 0))
+        for i in range(3)
+    ]
+    persist_events_to_db(db_path, later)
+    save_event_hashes(db_path, later)
+    hits = augmentation_cache_stats.hits
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-09"))
+
+    assert sorted(calls) == ["id0", "id1", "later2"]
+    assert augmentation_cache_stats.hits - hits == 2
+    assert [e.event_type for e in result["events_list"]] == ["Klassik"] * 3
+    assert load_pending_augmentation_ids(db_path, "2020-01-09") == set()
+
+
+def test_augment_events_sends_only_unconfident_events_to_llm(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    from scheduler_app.services import classifier
+
+    calls = []
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        calls.extend(ids)
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Pop, Schlager") for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment, n_events=0)
+    monkeypatch.setattr(classifier, "MIN_TRAINING_EVENTS", 50)
+    typed = [
+        Event(f"{genre}{i}", f"{genre} Abend {i}", date(2019, 1, 1), time(20, 0),
+              None, event_type, "Teaser")
+        for i in range(60)
+        for genre, event_type in (("Orchester", "Klassik"), ("Metal", "Rock, Indie, Metal"))
+    ]
+    persist_events_to_db(db_path, typed)
+    save_event_hashes(db_path, typed)
+    mark_events_augmented(db_path, [e.event_id for e in typed], "llm")
+    classifier.get_genre_classifier(db_path, wait=True)
+    new = [
+        Event("orchestra", "Orchester Abend", date(2020, 1, 2), time(20, 0),
+              None, None, "Teaser"),
+        Event("unclear", "Lesung", date(2020, 1, 2), time(20, 0),
+              None, None, "Teaser"),
+    ]
+    persist_events_to_db(db_path, new)
+    save_event_hashes(db_path, new)
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    assert calls == ["unclear"]
+    assert {e.event_id: e.event_type for e in result["events_list"]} == {
+        "orchestra": "Klassik", "unclear": "Pop, Schlager"
+    }
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == set()
+    # Only the LLM's type becomes training data
+    assert count_typed_events(db_path) == 121
+
+
+def test_fit_to_budget_cuts_the_first_chunk_that_does_not_fit():
+    chunks = [[{"n": 1}] * 3, [{"n": 1}] * 3, [{"n": 1}] * 3]
+
+    def cost(chunk):
+        return len(chunk)
+
+    assert fit_to_budget(chunks, cost, 9) == (chunks, False)
+    assert fit_to_budget(chunks, cost, 5) == ([chunks[0], chunks[1][:2]], True)
+    assert fit_to_budget(chunks, cost, 0.5) == ([], True)
+
+
+def test_augment_events_stays_within_the_budget(tmp_path, monkeypatch):
+    calls = []
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        calls.extend(ids)
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Klassik") for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment, n_events=5)
+    monkeypatch.setenv("AUGMENT_CHUNK_TOKENS", "3000")
+    counter = llm.TokenCounter("OpenAI", 0, False)
+    one_event = counter.estimate_cost(
+        [("system", ""), ("user", ""), ("user", "x" * 200)],
+        node.OUTPUT_TOKENS_PER_EVENT,
+    )
+    monkeypatch.setenv("BUDGET_LIMIT", str(2.5 * one_event))
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    assert 0 < len(calls) < 5
+    assert result["budget_exceeded"]
+    assert len(load_pending_augmentation_ids(db_path, "2020-01-02")) == 5 - len(calls)
+    assert not load_crawl_status(db_path, "2020-01-02").augmented
+
+
+def test_augment_events_skips_llm_only_for_new_detail_typed_events(
+        tmp_path, monkeypatch
+    ):
+    calls = []
+
+    def augment(msg):
+        ids = _event_ids(msg)
+        calls.extend(ids)
+        return AugmentationResult(patches=[
+            EventPatch(event_id=i, event_type="Jazz, Blues, Funk") for i in ids
+        ])
+
+    db_path = _setup(tmp_path, monkeypatch, augment, n_events=0)
+    stored = Event("old", "Abend", date(2020, 1, 2), time(20, 0), None,
+                   None, "Alter Teaser")
+    persist_events_to_db(db_path, [stored])
+    save_event_hashes(db_path, [stored])
+    persist_events_to_db(db_path, [Event("old", "Abend", date(2020, 1, 2),
+                                         time(20, 0), None, "Klassik")])
+    mark_events_augmented(db_path, ["old"], "llm")
+
+    # Re-crawl: the teaser changed; a new event is typed by its detail page
+    changed = Event("old", "Abend", date(2020, 1, 2), time(20, 0), None,
+                    None, "Neuer Teaser: jetzt Jazz-Abend")
+    detailed = Event("new", "Sinfonie", date(2020, 1, 2), time(20, 0), None,
+                     "Klassik", "Langer Text")
+    persist_events_to_db(db_path, [changed, detailed])
+    save_event_hashes(db_path, [changed, detailed])
+
+    result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+
+    assert calls == ["old"]
+    assert {e.event_id: e.event_type for e in result["events_list"]} == {
+        "old": "Jazz, Blues, Funk", "new": "Klassik"
+    }
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == set()
+
+
+def test_augment_events_answers_from_snapshot_while_database_is_locked(
+        tmp_path, monkeypatch):
+    calls = []
+    db_path = _setup(tmp_path, monkeypatch, calls.append, n_events=2)
+    assert release_connection(db_path)
+
+    writer_script = f"""
+import sys
+from scheduler_app.infra.database import get_connection_manager, publish_snapshot
+get_connection_manager({db_path!r})
+publish_snapshot({db_path!r})
+print("ready", flush=True)
+sys.stdin.readline()
+"""
+    writer = subprocess.Popen(
+        [sys.executable, "-c", writer_script],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert writer.stdout.readline().strip() == "ready"
+
+        result = node.augment_events(AgentState(user_input_date="2020-01-02"))
+    finally:
+        writer.communicate("\n")
+
+    assert calls == []
+    assert sorted(e.event_id for e in result["events_list"]) == ["id0", "id1"]
@@ -0,0 +1,45 @@
+"""
+Unit tests for content-hash change detection.
+"""
+
+from datetime import date
+
+from scheduler_app.models.event import Event
+from scheduler_app.services.change_detection import diff_events
+
+
+def _make_event(event_id: str, description: str = "Desc") -> Event:
+    return Event(
+        event_id=event_id,
+        event_name=f"Event {event_id}",
+        event_date=date(2026, 2, 20),
+        event_time="20:00",
+        event_venue="Venue",
+        event_description=description,
+    )
+
+
+def test_content_hash_ignores_augmented_fields():
+    e1 = _make_event("1")
+    e2 = _make_event("1")
+    e2.event_type = "Klassik"
+    e2.event_url = "https://example.com"
+
+    assert e1.content_hash() == e2.content_hash()
+    assert e1.content_hash() != _make_event("1", "Other").content_hash()
+
+
+def test_diff_events_classifies_added_changed_removed():
+    stored = {
+        "1": _make_event("1").content_hash(),
+        "2": _make_event("2").content_hash(),
+        "3": _make_event("3").content_hash(),
+    }
+    events = [_make_event("1"), _make_event("2", "New"), _make_event("4")]
+
+    diff = diff_events("2026-02-20", stored, events)
+
+    assert [e.event_id for e in diff.added] == ["4"]
+    assert [e.event_id for e in diff.changed] == ["2"]
+    assert diff.removed == ["3"]
+    assert diff.unchanged == 1
@@ -0,0 +1,88 @@
+"""
+Unit tests for the local genre classifier.
+"""
+
+import random
+from datetime import date, time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from scheduler_app.infra.database import (
+    count_typed_events,
+    mark_events_augmented,
+    persist_events_to_db,
+    save_event_hashes,
+)
+from scheduler_app.models.event import Event
+from scheduler_app.services import classifier as classifier_module
+from scheduler_app.services.classifier import GenreClassifier, get_genre_classifier
+
+
+GENRE_WORDS = {
+    "Klassik": ["orchester", "sinfonie", "oper", "streichquartett"],
+    "Jazz, Blues, Funk": ["jazz", "blues", "swing", "bigband"],
+    "Rock, Indie, Metal": ["rock", "metal", "punk", "indie"],
+}
+FILLER = "live konzert tour abend gast hamburg bühne club halle nacht".split()
+
+
+def _training_data(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = rng.choice(sorted(GENRE_WORDS))
+        words = rng.sample(FILLER, 3) + [rng.choice(GENRE_WORDS[label]), f"act{i}"]
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+        labels.append(label)
+    return texts, labels
+
+
+def test_classifier_is_confident_only_on_clear_cases():
+    texts, labels = _training_data(600)
+    model = GenreClassifier.train(texts, labels)
+
+    predicted = model.predict(
+        ["Swing Abend mit Bigband", "Sinfonie Orchester live", "konzert abend"],
+        confidence=0.8,
+    )
+
+    assert predicted == ["Jazz, Blues, Funk", "Klassik", None]
+    assert model.predict_proba(["jazz oper rock"]).max() < 0.8
+
+
+def _persist_typed(db_path, events, type_source):
+    persist_events_to_db(db_path, events)
+    save_event_hashes(db_path, events)
+    mark_events_augmented(db_path, [e.event_id for e in events], type_source)
+
+
+def test_get_genre_classifier_trains_on_llm_types_in_background(
+        tmp_path, monkeypatch
+    ):
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setattr(classifier_module, "MIN_TRAINING_EVENTS", 100)
+    texts, labels = _training_data(150)
+    events = [
+        Event(f"id{i}", text, date(2020, 1, 2), time(20, 0), None, label)
+        for i, (text, label) in enumerate(zip(texts, labels))
+    ]
+    _persist_typed(db_path, events[:90], "llm")
+    # Types not given by the LLM are no training data
+    _persist_typed(db_path, [
+        Event(f"own{i}", f"metal {i}", date(2020, 1, 3), time(20, 0), None, "Klassik")
+        for i in range(50)
+    ], "classifier")
+
+    assert get_genre_classifier(db_path, wait=True) is None
+    assert count_typed_events(db_path) == 90
+
+    _persist_typed(db_path, events[90:], "llm")
+    assert get_genre_classifier(db_path) is None    # training started
+    model = get_genre_classifier(db_path, wait=True)
+
+    assert model.classes == sorted(GENRE_WORDS)
+    assert get_genre_classifier(db_path) is model
+    assert model.predict(["Metal Nacht"], confidence=0.5) == ["Rock, Indie, Metal"]
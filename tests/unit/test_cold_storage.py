@@ -0,0 +1,71 @@
+"""
+Unit tests for the Parquet cold storage of past events.
+"""
+
+from datetime import date
+
+from scheduler_app.infra.cold_storage import PARTITION_FILE
+from scheduler_app.infra.database import (
+    count_events_for_date,
+    delete_events_from_db,
+    export_events_to_parquet,
+    import_events_from_parquet,
+    load_events_between,
+    load_events_from_db,
+    persist_events_to_db,
+)
+from scheduler_app.models.event import Event
+
+
+def _events():
+    return [
+        Event(f"id{d}", f"Name {d}", d, "20:00")
+        for d in (date(2025, 11, 30), date(2025, 12, 1), date(2026, 1, 5))
+    ]
+
+
+def test_export_moves_past_events_to_partitions_and_keeps_them_readable(
+        tmp_path, monkeypatch
+    ):
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setenv("EVENTS_PARQUET_DIR", str(tmp_path / "history"))
+    persist_events_to_db(db_path, _events())
+
+    assert export_events_to_parquet(db_path, "2026-01-01") == 2
+    assert (tmp_path / "history" / "year=2025" / "month=12").is_dir()
+    assert load_events_from_db(db_path, "2025-12-01")[0][0] == "id2025-12-01"
+    assert count_events_for_date(db_path, "2025-11-30") == 1
+    assert [row[0] for row in load_events_between(
+        db_path, "2025-11-01", "2026-01-31", columns=["event_name"]
+    )] == ["Name 2025-11-30", "Name 2025-12-01", "Name 2026-01-05"]
+
+
+def test_import_moves_events_back_into_the_database(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setenv("EVENTS_PARQUET_DIR", str(tmp_path / "history"))
+    persist_events_to_db(db_path, _events())
+    export_events_to_parquet(db_path, "2026-01-01")
+
+    assert import_events_from_parquet(db_path, "2025-12-01", "2025-12-31") == 1
+
+    monkeypatch.delenv("EVENTS_PARQUET_DIR")
+    assert len(load_events_from_db(db_path, "2025-12-01")) == 1
+    assert len(load_events_from_db(db_path, "2025-11-30")) == 0
+
+
+def test_delete_removes_events_from_cold_storage(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setenv("EVENTS_PARQUET_DIR", str(tmp_path / "history"))
+    persist_events_to_db(db_path, _events())
+    export_events_to_parquet(db_path, "2026-01-01")
+    assert len(load_events_from_db(db_path, "2025-12-01")) == 1
+
+    delete_events_from_db(db_path, ["id2025-12-01", "id2026-01-05"])
+
+    assert load_events_from_db(db_path, "2025-12-01") == []
+    assert load_events_from_db(db_path, "2026-01-05") == []
+    assert not (tmp_path / "history" / "year=2025" / "month=12").joinpath(
+        PARTITION_FILE).exists()
+    assert [row[0] for row in load_events_between(
+        db_path, "2025-11-01", "2026-01-31", columns=["event_id"]
+    )] == ["id2025-11-30"]
@@ -45,3 +45,62 @@ def test_fetch_website_constructs_correct_url(monkeypatch):
     fetch_website("2026-02-20")
 
     assert captured["url"] == "https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalender/?filter%5Bdate%5D=20.02.2026%2C20.02.2026&filter%5Bsearchword%5D=&filter%5Bdaytime%5D%5B%5D=evening&filter%5Bvadbcategorygroup%5D%5B%5D=19&filter%5Bdistrict%5D=hh_all&filter%5Bdistance%5D=15"
+
+
+def test_fetch_range_returns_one_page_per_day_in_order(monkeypatch):
+    from scheduler_app.infra import crawler
+
+    def mock_get(self, url, **kwargs):
+        return MockResponse(f"<html>{url}</html>")
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr(crawler, "_throttle", crawler.HostThrottle(2, 0))
+
+    pages = crawler.fetch_range("2026-02-27", "2026-03-02")
+
+    assert [date for date, _, _ in pages] == [
+        "2026-02-27", "2026-02-28", "2026-03-01", "2026-03-02"
+    ]
+    assert all(url in html for _, url, html in pages)
+
+
+def test_fetch_range_skips_failed_days(monkeypatch):
+    from scheduler_app.infra import crawler
+
+    def mock_get(self, url, **kwargs):
+        if "21.02.2026" in url:
+            raise requests.exceptions.ConnectionError("offline")
+        return MockResponse("<html></html>")
+
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    monkeypatch.setattr(crawler, "_throttle", crawler.HostThrottle(2, 0))
+
+    pages = crawler.fetch_range("2026-02-20", "2026-02-22")
+
+    assert [date for date, _, _ in pages] == ["2026-02-20", "2026-02-22"]
+
+
+def test_host_throttle_limits_concurrent_requests():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from scheduler_app.infra.crawler import HostThrottle
+
+    throttle = HostThrottle(max_concurrent=2, min_interval=0)
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def request(_):
+        with throttle.slot("https://example.com/page"):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(request, range(12)))
+
+    assert active["max"] <= 2
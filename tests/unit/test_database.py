@@ -2,16 +2,28 @@
 Unit tests for database connection.
 """
 
-from datetime import date, time
+from datetime import date, datetime, time, timedelta
 import pytest
 
 import duckdb
 
 from scheduler_app.models.event import Event
+from scheduler_app.infra import database
 from scheduler_app.infra.database import (
     ensure_table,
+    get_connection_manager,
     persist_events_to_db,
+    compact_events,
+    load_crawl_status,
+    load_events_between,
     load_events_from_db,
+    load_event_batch,
+    load_pending_augmentation_ids,
+    mark_date_augmented,
+    mark_events_augmented,
+    save_crawl_status,
+    save_event_hashes,
+    touch_crawl_status,
     EVENTS_TABLE
 )
 
@@ -189,3 +201,245 @@ def test_load_events_returns_content(tmp_path):
     assert events[0][5] == "Test Type"
     assert events[0][6] == "A test description."
     assert events[0][7] == "https://test.org/test"
+
+
+def test_pending_augmentation_tracks_content_hash(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+
+    e = Event(
+        event_id="testid",
+        event_name="Test Name",
+        event_date=date(2020, 1, 2),
+        event_time="20:00",
+        event_venue="Test Venue",
+        event_type="Klassik",
+        event_description="A test description.",
+    )
+    persist_events_to_db(db_path, [e])
+    save_event_hashes(db_path, [e])
+
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == {"testid"}
+
+    mark_events_augmented(db_path, ["testid"])
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == set()
+
+    e.event_description = "A changed description."
+    save_event_hashes(db_path, [e])
+    assert load_pending_augmentation_ids(db_path, "2020-01-02") == {"testid"}
+
+
+def test_load_event_batch_matches_rows_and_interns_strings(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+
+    events = [
+        Event(
+            event_id=f"id{i}",
+            event_name=f"Name {i}",
+            event_date=date(2020, 1, 2),
+            event_time="20:00:00",
+            event_venue="".join(["Test ", "Venue"]),
+        )
+        for i in range(3)
+    ]
+    persist_events_to_db(db_path, events)
+
+    batch = load_event_batch(db_path, "2020-01-02")
+
+    assert len(batch) == 3
+    assert sorted(e.event_id for e in batch) == ["id0", "id1", "id2"]
+    assert batch[0].event_time == "20:00"
+    assert batch.event_venue[0] is batch.event_venue[2]
+    assert batch.to_dict(batch.index_of("id1"))["event_date"] == "2020-01-02"
+
+
+def test_connection_manager_initializes_schema_once_and_cursors_per_thread(
+        tmp_path, monkeypatch
+    ):
+    from concurrent.futures import ThreadPoolExecutor
+
+    db_path = str(tmp_path / "test.duckdb")
+    probes = []
+    ensure = database.ensure_table
+    monkeypatch.setattr(
+        database, "ensure_table",
+        lambda con, name: probes.append(name) or ensure(con, name),
+    )
+
+    manager = get_connection_manager(db_path)
+    persist_events_to_db(db_path, [
+        Event("a", "A", date(2020, 1, 2), "20:00"),
+    ])
+    load_events_from_db(db_path, "2020-01-02")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        cursors = list(executor.map(lambda _: manager.cursor(), range(2)))
+
+    assert get_connection_manager(db_path) is manager
+    assert sorted(probes) == sorted(database._TABLE_SCHEMAS)
+    assert manager.cursor() is manager.cursor()
+    assert all(manager.cursor() is not cursor for cursor in cursors)
+
+
+def test_thread_cursors_close_with_their_thread_and_release_the_lock(tmp_path):
+    import gc
+    import subprocess
+    import sys
+    import threading
+
+    db_path = str(tmp_path / "test.duckdb")
+    manager = get_connection_manager(db_path)
+    opened = threading.Event()
+    done = threading.Event()
+
+    def work():
+        manager.cursor().execute("SELECT 1")
+        opened.set()
+        done.wait(5)
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    opened.wait(5)
+    manager.cursor()
+
+    assert not database.release_connection(db_path)
+
+    done.set()
+    thread.join()
+    gc.collect()
+
+    assert not manager.in_use()
+    assert database.release_connection(db_path)
+    # Another process can now take the write lock
+    subprocess.run(
+        [sys.executable, "-c", f"import duckdb; duckdb.connect({db_path!r}).close()"],
+        check=True,
+    )
+    assert get_connection_manager(db_path) is not manager
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_bulk_upsert_matches_row_upsert(tmp_path, monkeypatch, use_arrow):
+    if use_arrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(database, "pyarrow", None)
+
+    def events(event_type, description):
+        return [
+            Event(f"id{i}", f"Name {i}", date(2020, 1, 2), time(20, 0),
+                  "Venue", event_type, description)
+            for i in range(3)
+        ]
+
+    batches = [
+        events("Klassik", "Old."),
+        events(None, "New.") + [Event("id0", "Name 0", date(2020, 1, 2),
+                                      time(20, 0), "Venue", "Jazz, Blues, Funk")],
+    ]
+
+    results = []
+    for name, upsert in (("row", database.row_upsert_events),
+                         ("bulk", database.bulk_upsert_events)):
+        con = get_connection_manager(str(tmp_path / f"{name}.duckdb")).cursor()
+        for batch in batches:
+            upsert(con, batch)
+        results.append(con.execute(
+            f"SELECT * FROM {EVENTS_TABLE} ORDER BY event_id"
+        ).fetchall())
+
+    assert results[0] == results[1]
+    assert results[1][0][5:7] == ("Jazz, Blues, Funk", "New.")
+    assert results[1][1][3] == "20:00:00"
+
+
+def test_load_events_between_projects_columns_in_date_order(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    persist_events_to_db(db_path, [
+        Event(f"id{day}", f"Name {day}", date(2020, 1, day), "20:00")
+        for day in (5, 1, 3, 9)
+    ])
+
+    assert compact_events(db_path) == 4
+    assert load_events_between(
+        db_path, "2020-01-01", "2020-01-05", columns=["event_id", "event_date"]
+    ) == [
+        ("id1", date(2020, 1, 1)),
+        ("id3", date(2020, 1, 3)),
+        ("id5", date(2020, 1, 5)),
+    ]
+    assert load_events_from_db(db_path, "2020-01-09", columns=["event_name"]) == [
+        ("Name 9",)
+    ]
+    with pytest.raises(ValueError):
+        load_events_between(db_path, "2020-01-01", "2020-01-05", ["nope"])
+
+
+def test_crawl_status_tracks_freshness_and_augmentation(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    assert load_crawl_status(db_path, "2020-01-02") is None
+
+    save_crawl_status(db_path, "2020-01-02", "abc", 3, modified=True)
+    status = load_crawl_status(db_path, "2020-01-02")
+    assert (status.source_hash, status.event_count) == ("abc", 3)
+    assert status.is_stale(ttl=None)
+
+    mark_date_augmented(db_path, "2020-01-02")
+    status = load_crawl_status(db_path, "2020-01-02")
+    assert not status.is_stale(ttl=3600)
+    assert status.is_stale(ttl=3600, now=status.fetched_at + timedelta(hours=2))
+
+    # An unchanged recrawl keeps the day augmented, a changed one does not
+    save_crawl_status(db_path, "2020-01-02", "abc", 3, modified=False)
+    assert load_crawl_status(db_path, "2020-01-02").augmented
+    save_crawl_status(db_path, "2020-01-02", "def", 4, modified=True)
+    assert not load_crawl_status(db_path, "2020-01-02").augmented
+
+
+def test_touch_crawl_status_adds_days_stored_before_the_catalog(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    event = Event("id1", "Name", date(2020, 1, 2), time(20, 0), "Venue", "Jazz", "Text")
+    persist_events_to_db(db_path, [event])
+    save_event_hashes(db_path, [event])
+
+    touch_crawl_status(db_path, "2020-01-02")
+    status = load_crawl_status(db_path, "2020-01-02")
+    assert (status.event_count, status.augmented) == (1, False)
+
+    mark_events_augmented(db_path, ["id1"])
+    touch_crawl_status(db_path, "2020-01-02")
+    assert not load_crawl_status(db_path, "2020-01-02").augmented
+    assert load_crawl_status(db_path, "2020-01-02").fetched_at <= datetime.now()
+
+
+def test_event_hashes_record_where_types_came_from(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    detailed = Event("a", "A", date(2020, 1, 2), "20:00", None, "Klassik")
+    plain = Event("b", "B", date(2020, 1, 2), "20:00")
+    save_event_hashes(db_path, [detailed, plain])
+    mark_events_augmented(db_path, ["b"], "llm")
+    save_event_hashes(db_path, [Event("a", "A2", date(2020, 1, 2), "20:00")])
+
+    rows = get_connection_manager(db_path).cursor().execute(
+        "SELECT event_id, type_source FROM event_hashes ORDER BY event_id"
+    ).fetchall()
+
+    assert rows == [("a", "details"), ("b", "llm")]
+    with pytest.raises(ValueError):
+        mark_events_augmented(db_path, ["a"], "guess")
+
+
+def test_connection_manager_adds_columns_to_older_tables(tmp_path):
+    db_path = str(tmp_path / "old.duckdb")
+    with duckdb.connect(db_path) as con:
+        con.execute(
+            "CREATE TABLE event_hashes (event_id TEXT PRIMARY KEY, "
+            "event_date DATE NOT NULL, content_hash TEXT NOT NULL, "
+            "augmented_hash TEXT)"
+        )
+
+    save_event_hashes(db_path, [Event("a", "A", date(2020, 1, 2), "20:00")])
+    mark_events_augmented(db_path, ["a"], "llm")
+
+    assert get_connection_manager(db_path).cursor().execute(
+        "SELECT type_source FROM event_hashes"
+    ).fetchall() == [("llm",)]
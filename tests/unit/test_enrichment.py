@@ -0,0 +1,100 @@
+"""
+Unit tests for the detail page enrichment.
+"""
+
+from datetime import date
+
+from scheduler_app.models.event import Event
+from scheduler_app.services.enrichment import apply_details, enrich_events
+from scheduler_app.services.genres import map_genre_tags
+from scheduler_app.services.parser import extract_event_details
+
+
+DETAIL_HTML = """
+<html><head>
+<meta name="description" content="Kurz.">
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Event",
+ "description": "Zwei Bands des Symphonic und Power Metal auf gemeinsamer Tour."}
+</script>
+</head><body>
+<ul class="eventDetail__profiling"><li>Punkrock, Metal &amp; Hardcore</li></ul>
+</body></html>
+"""
+
+
+def _make_event(event_id: str, url: str | None = "https://example.com/e") -> Event:
+    return Event(
+        event_id=event_id,
+        event_name=f"Event {event_id}",
+        event_date=date(2026, 2, 20),
+        event_time="20:00",
+        event_description="Teaser…",
+        event_url=url,
+    )
+
+
+def test_extract_event_details_prefers_longest_description():
+    details = extract_event_details(DETAIL_HTML)
+
+    assert details["event_description"].startswith("Zwei Bands")
+    assert details["genres"] == ["Punkrock", "Metal", "Hardcore"]
+
+
+def test_map_genre_tags_requires_unambiguous_match():
+    assert map_genre_tags(["Punkrock", "Metal"]) == "Rock, Indie, Metal"
+    assert map_genre_tags(["Jazz", "Pop"]) is None
+    assert map_genre_tags(["Lesung"]) is None
+
+
+def test_map_genre_tags_matches_words_not_substrings():
+    assert map_genre_tags(["Therapie Konzert"]) is None
+    assert map_genre_tags(["Popular Classics"]) is None
+    assert map_genre_tags(["Barock"]) == "Klassik"
+    assert map_genre_tags(["Sinfoniekonzert"]) == "Klassik"
+    assert map_genre_tags(["Hip-Hop", "Deutschrap"]) == "HipHop, RnB, Soul"
+
+
+def test_apply_details_fills_description_and_type():
+    events = [_make_event("1"), _make_event("2")]
+
+    enriched = apply_details(events, [DETAIL_HTML, None])
+
+    assert enriched == 1
+    assert events[0].event_description.startswith("Zwei Bands")
+    assert events[0].event_type == "Rock, Indie, Metal"
+    assert events[1].event_description == "Teaser…"
+
+
+def test_enrich_events_skips_events_without_url(monkeypatch):
+    fetched = []
+
+    def fake_fetch_page(url):
+        fetched.append(url)
+        return DETAIL_HTML, False
+
+    monkeypatch.setattr(
+        "scheduler_app.services.enrichment.fetch_page", fake_fetch_page
+    )
+
+    events = [_make_event("1"), _make_event("2", url=None)]
+    enrich_events(events)
+
+    assert fetched == ["https://example.com/e"]
+
+
+def test_apply_details_skips_pages_that_fail_to_parse(monkeypatch, capsys):
+    from scheduler_app.services import enrichment
+
+    odd_ld = '<script type="application/ld+json">"just a string"</script>'
+    assert extract_event_details(odd_ld)["event_description"] is None
+
+    def fail(html):
+        raise ValueError("broken")
+
+    monkeypatch.setattr(enrichment, "extract_event_details", fail)
+    events = [_make_event("1")]
+
+    assert apply_details(events, [DETAIL_HTML]) == 0
+    assert events[0].event_description == "Teaser…"
+    assert "Failed to parse event detail page" in capsys.readouterr().out
@@ -0,0 +1,50 @@
+"""
+Unit tests for the in-process event cache.
+"""
+
+from datetime import date
+
+from scheduler_app.infra.database import (
+    get_connection_manager,
+    load_events_from_db,
+    persist_events_to_db,
+)
+from scheduler_app.infra.event_cache import EventCache
+from scheduler_app.models.event import Event
+
+
+def test_event_cache_evicts_least_recently_used_date():
+    cache = EventCache(max_dates=2)
+    for day in ("2020-01-01", "2020-01-02"):
+        cache.put(day, [(day,)], cache.generation())
+
+    cache.get("2020-01-01")
+    cache.put("2020-01-03", [], cache.generation())
+
+    assert cache.get("2020-01-02") is None
+    assert cache.get("2020-01-01") == (("2020-01-01",),)
+
+
+def test_event_cache_drops_loads_older_than_an_invalidation():
+    cache = EventCache()
+    generation = cache.generation()
+    cache.invalidate(["2020-01-01"])
+
+    cache.put("2020-01-01", [("stale",)], generation)
+
+    assert cache.get("2020-01-01") is None
+
+
+def test_load_events_is_served_from_cache_until_persist(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    cache = get_connection_manager(db_path).event_cache
+    persist_events_to_db(db_path, [Event("a", "A", date(2020, 1, 2), "20:00")])
+
+    first = load_events_from_db(db_path, "2020-01-02")
+    second = load_events_from_db(db_path, "2020-01-02")
+    persist_events_to_db(db_path, [Event("b", "B", date(2020, 1, 2), "21:00")])
+    third = load_events_from_db(db_path, "2020-01-02")
+
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(third) == 2
@@ -4,7 +4,9 @@ Unit test for the event dataclass.
 
 from datetime import date, time
 
-from scheduler_app.models.event import Event
+import pytest
+
+from scheduler_app.models.event import Event, EventBatch
 
 
 def test_from_dict_parses_required_fields():
@@ -71,3 +73,22 @@ def test_str_contains_key_information():
     assert "Test Venue" in s
     assert "Test Type" in s
     assert "A test description." in s
+
+
+def test_event_has_slots():
+    e = Event("id", "Name", date(2000, 1, 2), "20:00")
+
+    with pytest.raises(AttributeError):
+        e.unknown = 1
+
+
+def test_event_batch_round_trips_through_arrow():
+    pytest.importorskip("pyarrow")
+    events = [
+        Event("a", "A", date(2000, 1, 2), "20:00", "Venue", "Klassik"),
+        Event("b", "B", date(2000, 1, 2), "21:00", "Venue", None, "Text"),
+    ]
+
+    batch = EventBatch.from_arrow(EventBatch.from_events(events).to_arrow())
+
+    assert batch.events() == events
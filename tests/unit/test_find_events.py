@@ -0,0 +1,49 @@
+"""
+Unit tests for the find events node.
+"""
+
+import asyncio
+
+import duckdb
+
+from scheduler_app.graph.builder import builder
+from scheduler_app.graph.nodes import find_events as node
+from scheduler_app.graph.state import AgentState
+
+
+def test_find_events_node_runs_async_variant_under_ainvoke(monkeypatch):
+    calls = []
+
+    async def fake_aingest_date(db_path, select_date):
+        calls.append(("async", select_date))
+
+    monkeypatch.setenv("DUCKDB_PATH", "unused.duckdb")
+    monkeypatch.delenv("INGEST_STREAMING", raising=False)
+    monkeypatch.setattr(node, "aingest_date", fake_aingest_date)
+    monkeypatch.setattr(
+        node, "ingest_date",
+        lambda db_path, select_date: calls.append(("sync", select_date)),
+    )
+    runnable = builder.nodes["find_events"].runnable
+    state = AgentState(user_input_date="2026-02-20")
+
+    asyncio.run(runnable.ainvoke(state))
+    runnable.invoke(state)
+
+    assert calls == [("async", "2026-02-20"), ("sync", "2026-02-20")]
+
+
+def test_afind_events_reports_locked_database(monkeypatch, capsys):
+    async def locked(db_path, select_date):
+        raise duckdb.IOException("Could not set lock on file")
+
+    monkeypatch.setenv("DUCKDB_PATH", "unused.duckdb")
+    monkeypatch.delenv("INGEST_STREAMING", raising=False)
+    monkeypatch.setattr(node, "aingest_date", locked)
+
+    result = asyncio.run(
+        node.afind_events(AgentState(user_input_date="2026-02-20"))
+    )
+
+    assert result == {}
+    assert "Failed to store event listing" in capsys.readouterr().out
@@ -82,3 +82,57 @@ def test_find_restaurants_returns_up_to_three_suggestions(monkeypatch):
     assert len(result["places_near_venue"]) == 3
     assert result["places_near_venue"][0].startswith("Restaurant A")
     assert result["log_llmcalls"][0]["node"] == "find_restaurants"
+
+
+def test_find_restaurants_keeps_valid_suggestions_and_asks_for_the_rest(
+        monkeypatch
+    ):
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+
+    from scheduler_app.infra import llm
+
+    answers = [
+        '{"restaurants": ["Restaurant A - Gleich um die Ecke.", 42]}',
+        '{"restaurants": ["Restaurant B - Nahe U-Bahn.", "Restaurant C - Am Hafen."]}',
+    ]
+    requests = []
+
+    def invoke(msg):
+        requests.append(msg)
+        return {"raw": AIMessage(content=answers[len(requests) - 1]), "parsed": None}
+
+    class _RawLLM:
+        def bind_tools(self, tools):
+            return self
+
+        def with_structured_output(self, model, include_raw=False):
+            return RunnableLambda(invoke)
+
+    monkeypatch.setenv("LLM_SERVICE", "OpenAI")
+    monkeypatch.setenv("BUDGET_LIMIT", "1")
+    monkeypatch.setenv("OPENAI_INPUT_COST_PER_M", "0.15")
+    monkeypatch.setenv("OPENAI_OUTPUT_COST_PER_M", "0.60")
+    monkeypatch.setattr(llm.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(
+        "scheduler_app.graph.nodes.find_restaurants.create_llm_client",
+        lambda service, dollars_already_spent, budget_exceeded: (
+            _RawLLM(),
+            llm.TokenCounter(service, dollars_already_spent, budget_exceeded),
+        ),
+    )
+
+    state = AgentState(
+        user_input_date="2026-03-19",
+        events_list_filtered=[_make_event("1")],
+    )
+
+    result = find_restaurants(state)
+
+    assert result["places_near_venue"] == [
+        "Restaurant A - Gleich um die Ecke.",
+        "Restaurant B - Nahe U-Bahn.",
+        "Restaurant C - Am Hafen.",
+    ]
+    assert "Return only 2 further suggestions" in requests[1][-1][1]
+    assert result["log_llmcalls"][0]["attempts"] == 2
@@ -0,0 +1,72 @@
+"""
+Unit tests for the HTTP response cache.
+"""
+
+import requests
+
+from scheduler_app.infra import crawler
+from scheduler_app.infra.http_cache import HttpCache
+
+
+class MockResponse:
+    def __init__(self, text: str, status_code: int = 200, headers=None):
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception("HTTP error")
+
+
+def test_cache_roundtrip_and_conditional_headers(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl_seconds=60)
+
+    cache.put("https://example.com/", "<html></html>", etag='"abc"',
+              last_modified="Fri, 20 Feb 2026 10:00:00 GMT")
+    entry = cache.get("https://example.com/")
+
+    assert entry.text == "<html></html>"
+    assert cache.is_fresh(entry)
+    assert cache.conditional_headers(entry) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Fri, 20 Feb 2026 10:00:00 GMT",
+    }
+    assert cache.get("https://example.com/other") is None
+
+
+def test_fetch_page_serves_fresh_entries_without_request(tmp_path, monkeypatch):
+    calls = []
+
+    def mock_get(self, url, **kwargs):
+        calls.append(kwargs["headers"])
+        return MockResponse("<html>v1</html>", headers={"ETag": '"v1"'})
+
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("HTTP_CACHE_TTL", "60")
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    assert crawler.fetch_page("https://example.com/") == ("<html>v1</html>", False)
+    assert crawler.fetch_page("https://example.com/") == ("<html>v1</html>", True)
+    assert len(calls) == 1
+
+
+def test_fetch_page_revalidates_stale_entries(tmp_path, monkeypatch):
+    calls = []
+
+    def mock_get(self, url, **kwargs):
+        calls.append(kwargs["headers"])
+        if kwargs["headers"].get("If-None-Match") == '"v1"':
+            return MockResponse("", status_code=304)
+        return MockResponse("<html>v1</html>", headers={"ETag": '"v1"'})
+
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("HTTP_CACHE_TTL", "0")
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    crawler.fetch_page("https://example.com/")
+    html, unchanged = crawler.fetch_page("https://example.com/")
+
+    assert html == "<html>v1</html>"
+    assert unchanged
+    assert calls[1]["If-None-Match"] == '"v1"'
@@ -0,0 +1,347 @@
+"""
+Unit tests for the ingestion pipeline.
+"""
+
+import pytest
+import requests
+
+from scheduler_app.services import ingest
+
+
+BASE = "https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalender/"
+
+
+def _article(name: str, day: str = "20.02.2026") -> str:
+    return f"""
+    <article class="listTeaser-event">
+      <div class="listTeaser-event__text">
+        <h3>{name}</h3>
+        <ul class="listTeaser-event__text__infos">
+          <li><span class="icon-calendar"></span> {day} </li>
+          <li><span class="icon-clock"></span> 20:00 </li>
+          <li><span class="icon-located"></span>Venue</li>
+        </ul>
+      </div>
+    </article>
+    """
+
+
+def _page(names, next_page=None, day: str = "20.02.2026") -> str:
+    trigger = (
+        f'<a class="readMore__link" data-ajax-url="js.api?page={next_page}">'
+        "Mehr anzeigen</a>"
+        if next_page else ""
+    )
+    return "<html><body>" + "".join(_article(n, day) for n in names) + trigger + "</body></html>"
+
+
+def test_collect_pages_follows_pagination_and_merges_in_order(monkeypatch):
+    remote = {
+        BASE + "js.api?page=1": _page(["B", "C"], next_page=2),
+        BASE + "js.api?page=2": _page(["C", "D"]),
+    }
+    fetched = []
+
+    def fake_fetch_pages(urls):
+        fetched.append(list(urls))
+        return [remote[u] for u in urls]
+
+    monkeypatch.setattr(ingest, "fetch_pages_or_none", fake_fetch_pages)
+
+    pages = ingest.collect_pages(BASE, _page(["A"], next_page=1))
+    events = ingest.extract_events_from_pages(pages)
+
+    assert [url for url, _ in pages] == [
+        BASE, BASE + "js.api?page=1", BASE + "js.api?page=2"
+    ]
+    assert [e.event_name for e in events] == ["A", "B", "C", "D"]
+    assert fetched == [[BASE + "js.api?page=1"], [BASE + "js.api?page=2"]]
+
+
+def test_collect_pages_many_fetches_pages_of_all_listings_per_round(monkeypatch):
+    remote = {
+        BASE + "a?page=1": _page(["B"]),
+        BASE + "b?page=1": _page(["D"], next_page=2),
+        BASE + "js.api?page=2": _page(["E"]),
+    }
+    fetched = []
+
+    def fake_fetch_pages(urls):
+        fetched.append(list(urls))
+        return [remote[u] for u in urls]
+
+    monkeypatch.setattr(ingest, "fetch_pages_or_none", fake_fetch_pages)
+
+    def first(name, path):
+        html = _page([name]).replace(
+            "</body>",
+            f'<a class="readMore__link" data-ajax-url="{path}">Mehr</a></body>',
+        )
+        return BASE, html
+
+    listings = ingest.collect_pages_many(
+        {"a": first("A", "a?page=1"), "b": first("C", "b?page=1")},
+        max_workers=1,
+    )
+
+    assert fetched == [[BASE + "a?page=1", BASE + "b?page=1"],
+                       [BASE + "js.api?page=2"]]
+    assert [len(pages) for pages in listings.values()] == [2, 3]
+
+
+def test_collect_pages_stops_at_max_pages(monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_PAGES", 2)
+    monkeypatch.setattr(
+        ingest, "fetch_pages_or_none",
+        lambda urls: [_page(["X"], next_page=9) for _ in urls],
+    )
+
+    pages = ingest.collect_pages(BASE, _page(["A"], next_page=1))
+
+    assert len(pages) == 2
+
+
+def test_aingest_dates_persists_events_of_all_days(tmp_path, monkeypatch):
+    import asyncio
+
+    import httpx
+
+    from scheduler_app.infra.async_crawler import AsyncCrawler
+    from scheduler_app.infra.database import load_events_from_db
+
+    db_path = str(tmp_path / "test.duckdb")
+    writes = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "21.02.2026" in str(request.url):
+            return httpx.Response(503)
+        day = request.url.params["filter[date]"].split(",")[0]
+        return httpx.Response(200, text=_page([f"Concert {day[:5]}"], day=day))
+
+    persist = ingest.persist_events_to_db
+
+    def counting_persist(path, events):
+        writes.append(len(events))
+        persist(path, events)
+
+    monkeypatch.setattr(ingest, "persist_events_to_db", counting_persist)
+
+    async def run():
+        async with AsyncCrawler(
+            min_interval=0, transport=httpx.MockTransport(handler)
+        ) as crawler:
+            return await ingest.aingest_dates(
+                db_path,
+                ["2026-02-20", "2026-02-21", "2026-02-22"],
+                crawler=crawler,
+                batch_size=1,
+            )
+
+    diffs = asyncio.run(run())
+
+    assert sorted(e.event_name for d in diffs for e in d.added) == [
+        "Concert 20.02", "Concert 22.02"
+    ]
+    assert writes == [1, 1]
+    assert len(load_events_from_db(db_path, "2026-02-20")) == 1
+
+
+def test_ingest_date_reports_diff_and_skips_unchanged_listing(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.duckdb")
+    remote = {"html": _page(["A", "B"])}
+    parsed = []
+
+    monkeypatch.setattr(
+        ingest, "fetch_website_cached",
+        lambda select_date: (select_date, BASE, remote["html"], False),
+    )
+    extract = ingest.extract_events
+
+    def counting_extract(html, url):
+        parsed.append(url)
+        return extract(html, url)
+
+    monkeypatch.setattr(ingest, "extract_events", counting_extract)
+
+    first = ingest.ingest_date(db_path, "2026-02-20")
+    second = ingest.ingest_date(db_path, "2026-02-20")
+    remote["html"] = _page(["A", "C"])
+    third = ingest.ingest_date(db_path, "2026-02-20")
+
+    assert [e.event_name for e in first.added] == ["A", "B"]
+    assert second.listing_unchanged
+    assert len(parsed) == 2
+    assert [e.event_name for e in third.added] == ["C"]
+    assert third.unchanged == 1
+    assert len(third.removed) == 1
+
+
+def test_ingest_date_detects_changes_on_later_pages(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "test.duckdb")
+    remote = {BASE + "js.api?page=1": _page(["B"])}
+
+    monkeypatch.setattr(
+        ingest, "fetch_website_cached",
+        lambda select_date: (select_date, BASE, _page(["A"], next_page=1), True),
+    )
+    monkeypatch.setattr(
+        ingest, "fetch_pages_or_none", lambda urls: [remote[u] for u in urls]
+    )
+
+    ingest.ingest_date(db_path, "2026-02-20")
+    unchanged = ingest.ingest_date(db_path, "2026-02-20")
+    remote[BASE + "js.api?page=1"] = _page(["B", "C"])
+    changed = ingest.ingest_date(db_path, "2026-02-20")
+
+    assert unchanged.listing_unchanged
+    assert not changed.listing_unchanged
+    assert [e.event_name for e in changed.added] == ["C"]
+
+
+def test_replay_archive_persists_archived_pages(tmp_path, monkeypatch):
+    from scheduler_app.infra.archive import get_html_archive
+    from scheduler_app.infra.database import init_db, load_events_from_db
+
+    db_path = str(tmp_path / "test.duckdb")
+    init_db(db_path)
+    monkeypatch.setenv("HTML_ARCHIVE_DIR", str(tmp_path / "archive"))
+    archive = get_html_archive()
+    archive.put("2026-02-20", BASE, _page(["A"]))
+    archive.put("2026-02-20", BASE + "js.api?page=1", _page(["B"]))
+
+    dry_run = ingest.replay_archive(db_path, persist=False)
+    assert len(load_events_from_db(db_path, "2026-02-20")) == 0
+
+    diffs = ingest.replay_archive(db_path, "2026-02-20", "2026-02-20")
+
+    assert [e.event_name for e in dry_run[0].added] == ["A", "B"]
+    assert [e.event_name for e in diffs[0].added] == ["A", "B"]
+    assert len(load_events_from_db(db_path, "2026-02-20")) == 2
+
+
+def test_ingest_date_streaming_persists_in_batches(tmp_path, monkeypatch):
+    from contextlib import contextmanager
+    from scheduler_app.infra.database import load_events_from_db
+
+    db_path = str(tmp_path / "test.duckdb")
+    remote = {
+        ingest.build_url("2026-02-20"): _page(["A", "B", "C"], next_page=1),
+        BASE + "js.api?page=1": _page(["C", "D"]),
+    }
+
+    @contextmanager
+    def fake_stream_page(url):
+        data = remote[url].encode("utf-8")
+        yield (data[i:i + 64] for i in range(0, len(data), 64)), "utf-8"
+
+    monkeypatch.setattr(ingest, "stream_page", fake_stream_page)
+    persist = ingest.persist_events_to_db
+    writes = []
+
+    def counting_persist(db, events):
+        writes.append(len(events))
+        persist(db, events)
+
+    monkeypatch.setattr(ingest, "persist_events_to_db", counting_persist)
+
+    diff = ingest.ingest_date_streaming(db_path, "2026-02-20", batch_size=2)
+
+    assert [e.event_name for e in diff.added] == ["A", "B", "C", "D"]
+    assert writes == [2, 2]
+    assert len(load_events_from_db(db_path, "2026-02-20")) == 4
+    assert diff.listing_hash == ingest.hash_pages([
+        (url, remote[url])
+        for url in (ingest.build_url("2026-02-20"), BASE + "js.api?page=1")
+    ])
+
+
+def test_streaming_enrichment_does_not_wait_on_the_stream_slot(tmp_path, monkeypatch):
+    import threading
+    from contextlib import contextmanager
+
+    db_path = str(tmp_path / "test.duckdb")
+    html = _page(["A", "B", "C"]).encode("utf-8")
+    slot = threading.Lock()    # single request per host
+    enriched = []
+
+    @contextmanager
+    def fake_stream_page(page_url):
+        with slot:
+            yield (html[i:i + 64] for i in range(0, len(html), 64)), "utf-8"
+
+    def fake_enrich(events):
+        assert slot.acquire(timeout=5)
+        slot.release()
+        enriched.extend(e.event_name for e in events)
+
+    monkeypatch.setattr(ingest, "stream_page", fake_stream_page)
+    monkeypatch.setattr(ingest, "enrich_events", fake_enrich)
+
+    diff = ingest.ingest_date_streaming(db_path, "2026-02-20", batch_size=2)
+
+    assert enriched == ["A", "B", "C"]
+    assert len(diff.added) == 3
+
+
+def test_ingest_date_keeps_unseen_events_when_pages_are_capped(tmp_path, monkeypatch):
+    from scheduler_app.infra.database import load_events_from_db
+
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setattr(ingest, "MAX_PAGES", 2)
+    remote = {"first": _page(["A", "B", "C"])}
+    monkeypatch.setattr(
+        ingest, "fetch_website_cached",
+        lambda select_date: (select_date, BASE, remote["first"], False),
+    )
+    monkeypatch.setattr(
+        ingest, "fetch_pages_or_none",
+        lambda urls: [_page([f"P{page_number}"], next_page=page_number + 1)
+                      for page_number in (ingest.page_number(u) for u in urls)],
+    )
+
+    ingest.ingest_date(db_path, "2026-02-20")
+    # Busy day: the listing now spans more pages than are fetched
+    remote["first"] = _page(["A"], next_page=1)
+    diff = ingest.ingest_date(db_path, "2026-02-20")
+
+    assert diff.removed == []
+    assert len(load_events_from_db(db_path, "2026-02-20")) == 4
+
+
+def test_collect_pages_many_leaves_out_listings_with_failed_pages(monkeypatch):
+    other = BASE + "other/"
+    remote = {
+        BASE + "js.api?page=1": _page(["B"]),
+        other + "js.api?page=1": None,
+    }
+    monkeypatch.setattr(
+        ingest, "fetch_pages_or_none", lambda urls: [remote[u] for u in urls]
+    )
+
+    pages = ingest.collect_pages_many({
+        "2026-02-20": (BASE, _page(["A"], next_page=1)),
+        "2026-02-21": (other, _page(["X"], next_page=1)),
+    }, max_workers=1)
+
+    assert list(pages) == ["2026-02-20"]
+    assert [u for u, _ in pages["2026-02-20"]] == [BASE, BASE + "js.api?page=1"]
+
+    with pytest.raises(requests.exceptions.RequestException):
+        ingest.collect_pages(other, _page(["X"], next_page=1))
+
+
+def test_replay_archive_records_the_archived_fetch_time(tmp_path, monkeypatch):
+    from datetime import datetime
+    from scheduler_app.infra.archive import get_html_archive
+    from scheduler_app.infra.database import load_crawl_status
+
+    db_path = str(tmp_path / "test.duckdb")
+    monkeypatch.setenv("HTML_ARCHIVE_DIR", str(tmp_path / "archive"))
+    archive = get_html_archive()
+    archive.put("2026-02-20", BASE, _page(["A"]))
+    (entry,) = archive.entries()
+
+    ingest.replay_archive(db_path)
+
+    status = load_crawl_status(db_path, "2026-02-20")
+    assert status.fetched_at == datetime.fromisoformat(entry.fetched_at)
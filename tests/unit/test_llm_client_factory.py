@@ -38,3 +38,24 @@ def test_create_llm_client_raises_keyerror_for_missing_api_key(monkeypatch):
 
     with pytest.raises(KeyError):
         create_llm_client("OpenAI")
+
+
+def test_token_counter_refuses_calls_expected_to_exceed_the_budget(monkeypatch):
+    from scheduler_app.infra.llm import TokenCounter, estimate_prompt_tokens
+
+    monkeypatch.setenv("OPENAI_MODEL", "test-model")
+    monkeypatch.setenv("BUDGET_LIMIT", "0.01")
+    monkeypatch.setenv("OPENAI_INPUT_COST_PER_M", "1")
+    monkeypatch.setenv("OPENAI_OUTPUT_COST_PER_M", "10")
+    counter = TokenCounter("OpenAI", dollars_already_spent=0.009, budget_exceeded=False)
+    msg = [("system", "Kurz."), ("user", "Konzert " * 50)]
+
+    tokens = estimate_prompt_tokens(msg)
+    assert tokens > 50
+    assert counter.estimate_cost(msg, 100) == pytest.approx(
+        tokens * 1e-6 + 100 * 1e-5
+    )
+    assert not counter.refuse(msg, 10)
+    assert not counter.budget_exceeded
+    assert counter.refuse(msg, 100)
+    assert counter.budget_exceeded
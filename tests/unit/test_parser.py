@@ -5,7 +5,16 @@ Unit tests for the html parser.
 from pathlib import Path
 from datetime import datetime
 
-from scheduler_app.services.parser import extract_events
+import pytest
+
+from scheduler_app.services.parser import (
+    StreamingListingParser,
+    extract_events,
+    extract_events_many,
+    extract_pagination_urls,
+    iter_events,
+    page_number,
+)
 
 
 FIXTURE_DIR = Path(__file__).parent.parent / "fixtures"
@@ -34,3 +43,95 @@ def test_extract_events_first_event_has_correct_content():
     assert getattr(e0, "event_time") == datetime.strptime("18:45", "%H:%M").time()
     assert getattr(e0, "event_url", None)
     assert str(getattr(e0, "event_url")).startswith("http")
+
+
+def test_extract_pagination_urls_finds_next_page():
+    html = SAMPLE_HTML.read_text(encoding="utf-8")
+    page_url = "https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalender/"
+
+    urls = extract_pagination_urls(html, page_url)
+
+    assert len(urls) == 1
+    assert urls[0].startswith("https://www.hamburg-tourism.de/")
+    assert page_number(urls[0]) == 1
+
+
+def test_parser_backends_agree_on_sample():
+    html = SAMPLE_HTML.read_text(encoding="utf-8")
+    page_url = "https://www.hamburg-tourism.de/sehen-erleben/veranstaltungen/veranstaltungskalender/"
+
+    events_bs4 = extract_events(html, page_url, backend="bs4")
+    events_lxml = extract_events(html, page_url, backend="lxml")
+
+    assert events_bs4 == events_lxml
+
+
+def test_parser_backends_agree_on_incomplete_articles():
+    html = """
+    <html><body>
+    <article class="listTeaser-event extra">
+      <div class="listTeaser-event__text">
+        <h3>  Only   <b>Title</b> </h3>
+        <ul class="listTeaser-event__text__infos">
+          <li><span class="icon-calendar"></span> 02.01.2020 </li>
+          <li><span class="icon-clock"></span> 20:00 Uhr </li>
+          <li></li>
+        </ul>
+        <p><p>Nested <i>text</i></p></p>
+      </div>
+    </article>
+    <article class="listTeaser-event">
+      <div class="listTeaser-event__text"><h3>No infos</h3></div>
+      <ul class="listTeaser-event__text__infos">
+        <li><span class="icon-calendar"></span> 03.01.2020 </li>
+        <li><span class="icon-clock"></span> 19:30 </li>
+      </ul>
+      <a class="listTeaser-event__link" href="/event/#c1">/event/</a>
+    </article>
+    </body></html>
+    """
+
+    events_bs4 = extract_events(html, "https://example.com/list/", backend="bs4")
+    events_lxml = extract_events(html, "https://example.com/list/", backend="lxml")
+
+    assert len(events_lxml) == 2
+    assert events_bs4 == events_lxml
+
+
+def test_extract_events_raises_valueerror_for_unknown_backend():
+    with pytest.raises(ValueError) as err:
+        extract_events("<html></html>", "https://example.com/", backend="regex")
+
+    assert "Unsupported parser backend" in str(err.value)
+
+
+def test_streaming_parser_matches_extract_events_and_yields_early():
+    html = SAMPLE_HTML.read_bytes()
+    url = "https://www.hamburg-tourism.de/"
+    chunks = [html[i:i + 512] for i in range(0, len(html), 512)]
+    parser = StreamingListingParser(url)
+
+    streamed = []
+    fed_at_first_event = None
+    for n, chunk in enumerate(chunks, start=1):
+        events = parser.feed(chunk)
+        if events and fed_at_first_event is None:
+            fed_at_first_event = n
+        streamed += events
+    streamed += parser.close()
+
+    assert streamed == extract_events(html.decode("utf-8"), url)
+    assert fed_at_first_event < len(chunks)
+    assert parser.pagination_urls == extract_pagination_urls(
+        html.decode("utf-8"), url
+    )
+    assert list(iter_events(chunks, url)) == streamed
+
+
+def test_extract_events_many_keeps_page_order_across_processes():
+    html = SAMPLE_HTML.read_text(encoding="utf-8")
+    pages = [(f"https://www.hamburg-tourism.de/?page={i}", html) for i in range(4)]
+
+    parsed = extract_events_many(pages, max_workers=2)
+
+    assert parsed == [extract_events(h, u) for u, h in pages]
@@ -0,0 +1,62 @@
+"""
+Unit tests for the background refresh of stale days.
+"""
+
+import threading
+
+from scheduler_app.services.refresh import BackgroundRefresher
+
+
+def test_refresher_runs_one_refresh_per_day_at_a_time():
+    refresher = BackgroundRefresher(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def refresh(day):
+        calls.append(day)
+        release.wait(5)
+
+    first = refresher.schedule("2020-01-02", lambda: refresh("a"))
+    again = refresher.schedule("2020-01-02", lambda: refresh("b"))
+    other = refresher.schedule("2020-01-03", lambda: refresh("c"))
+    release.set()
+    refresher.close()
+
+    assert first is again and first is not other
+    assert sorted(calls) == ["a", "c"]
+
+
+def test_refresher_reports_failures_and_allows_retry(capsys):
+    refresher = BackgroundRefresher()
+
+    def fail():
+        raise RuntimeError("offline")
+
+    refresher.schedule("2020-01-02", fail).result(5)
+    retried = refresher.schedule("2020-01-02", lambda: None)
+    refresher.close()
+
+    assert retried.done()
+    assert "Failed to refresh events for 2020-01-02: offline" in capsys.readouterr().out
+
+
+def test_refresh_events_carries_over_the_spend_of_the_run(monkeypatch):
+    from scheduler_app.graph.nodes import refresh_events as node
+    from scheduler_app.graph.state import AgentState
+
+    class _Refresher:
+        def schedule(self, day, refresh):
+            refresh()
+
+    seen = []
+    monkeypatch.setattr(node, "get_refresher", lambda: _Refresher())
+    monkeypatch.setattr(node, "_refresh", seen.append)
+
+    node.refresh_events(AgentState(
+        user_input_date="2020-01-02",
+        dollars_expended=0.25,
+        budget_exceeded=True,
+    ))
+
+    assert seen[0].dollars_expended == 0.25
+    assert seen[0].budget_exceeded is True
@@ -0,0 +1,58 @@
+"""
+Unit tests for the full-text search over events.
+"""
+
+from datetime import date
+
+from scheduler_app.infra.database import (
+    delete_events_from_db,
+    persist_events_to_db,
+    rebuild_search_index,
+    search_events,
+)
+from scheduler_app.infra.search_index import tokenize
+from scheduler_app.models.event import Event
+
+
+def _events():
+    return [
+        Event("a", "Jazz im Park", date(2026, 3, 1), "20:00", "Stadtpark",
+              event_description="Swing und Jazz unter freiem Himmel."),
+        Event("b", "Orgelkonzert", date(2026, 3, 2), "19:00", "Michel",
+              event_description="Bach an der großen Orgel."),
+        Event("c", "Late Night Jazz", date(2026, 4, 1), "22:00", "Birdland"),
+    ]
+
+
+def test_tokenize_drops_case_punctuation_and_stopwords():
+    assert tokenize("Jazz im Park: Die GROSSE Nacht!") == [
+        "jazz", "park", "grosse", "nacht"
+    ]
+
+
+def test_search_ranks_matches_and_filters_by_date(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    persist_events_to_db(db_path, _events())
+
+    results = search_events(db_path, "jazz")
+    in_march = search_events(db_path, "Jazz", ("2026-03-01", "2026-03-31"))
+
+    assert [e.event_id for e, _ in results] == ["a", "c"]
+    assert results[0][1] > results[1][1] > 0
+    assert [e.event_id for e, _ in in_march] == ["a"]
+    assert search_events(db_path, "orgel michel")[0][0].event_id == "b"
+
+
+def test_search_index_follows_updates_and_deletes(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    persist_events_to_db(db_path, _events())
+
+    persist_events_to_db(db_path, [
+        Event("b", "Orgelkonzert", date(2026, 3, 2), "19:00", "Michel",
+              event_description="Jazz an der Orgel."),
+    ])
+    delete_events_from_db(db_path, ["c"])
+
+    assert [e.event_id for e, _ in search_events(db_path, "jazz")] == ["a", "b"]
+    assert rebuild_search_index(db_path) == 2
+    assert [e.event_id for e, _ in search_events(db_path, "jazz")] == ["a", "b"]
@@ -0,0 +1,141 @@
+"""
+Unit tests for the single database writer and reader snapshots.
+"""
+
+import subprocess
+import sys
+import threading
+from datetime import date
+
+import duckdb
+import pytest
+
+from scheduler_app.infra import database
+from scheduler_app.infra.database import (
+    get_reader,
+    load_events_from_db,
+    persist_events_to_db,
+    publish_snapshot,
+)
+from scheduler_app.infra.writer import DatabaseWriter
+from scheduler_app.models.event import Event
+
+
+def test_writer_runs_jobs_in_order_and_coalesces_queued_ones(tmp_path):
+    calls = []
+    release = threading.Event()
+
+    def blocking(db_path, items):
+        release.wait()
+        calls.append(("blocking", items))
+
+    def record(db_path, items):
+        calls.append(("record", items))
+
+    with DatabaseWriter(str(tmp_path / "test.duckdb")) as writer:
+        first = writer.submit(blocking, [0])
+        futures = [writer.submit(record, [i]) for i in (1, 2, 3)]
+        release.set()
+
+    assert first.done() and all(f.done() for f in futures)
+    assert calls == [("blocking", [0]), ("record", [1, 2, 3])]
+
+
+def test_reader_falls_back_to_snapshot_while_another_process_writes(tmp_path):
+    db_path = str(tmp_path / "locked.duckdb")
+    writer_script = f"""
+import sys
+from datetime import date
+from scheduler_app.infra.database import persist_events_to_db, publish_snapshot
+from scheduler_app.models.event import Event
+persist_events_to_db({db_path!r}, [Event("a", "A", date(2020, 1, 2), "20:00")])
+publish_snapshot({db_path!r})
+print("ready", flush=True)
+sys.stdin.readline()
+"""
+    writer = subprocess.Popen(
+        [sys.executable, "-c", writer_script],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        assert writer.stdout.readline().strip() == "ready"
+
+        assert get_reader(db_path).read_only
+        assert [row[0] for row in load_events_from_db(db_path, "2020-01-02")] == ["a"]
+    finally:
+        writer.communicate("\n")
+
+
+def test_publish_snapshot_copies_committed_rows(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    persist_events_to_db(db_path, [Event("a", "A", date(2020, 1, 2), "20:00")])
+
+    path = publish_snapshot(db_path)
+
+    assert path == str(tmp_path / "test.snapshot.duckdb")
+    with duckdb.connect(path, read_only=True) as con:
+        assert con.execute("SELECT event_id FROM events").fetchall() == [("a",)]
+
+
+def test_writer_publishes_snapshots_only_after_writes(tmp_path, monkeypatch):
+    from scheduler_app.infra import writer as writer_module
+
+    published = []
+    monkeypatch.setattr(writer_module, "publish_snapshot", published.append)
+    db_path = str(tmp_path / "test.duckdb")
+
+    with DatabaseWriter(db_path, snapshot_interval=3600):
+        pass
+    assert published == []
+
+    with DatabaseWriter(db_path, snapshot_interval=0) as writer:
+        writer.submit(lambda db, items: None, [1]).result()
+        writer.submit(lambda db, items: None, [2]).result()
+    assert published == [db_path, db_path]
+
+
+def test_process_writer_is_shared(tmp_path):
+    from scheduler_app.infra.writer import get_database_writer
+
+    db_path = str(tmp_path / "test.duckdb")
+    assert get_database_writer(db_path) is get_database_writer(db_path)
+
+
+def test_replaced_snapshot_managers_are_closed_once_unused(tmp_path):
+    db_path = str(tmp_path / "test.duckdb")
+    persist_events_to_db(db_path, [Event("a", "A", date(2020, 1, 2), "20:00")])
+    path = publish_snapshot(db_path)
+    old = database._snapshot_manager(path)
+    old.cursor().execute("SELECT 1")
+
+    busy = threading.Event()
+    done = threading.Event()
+
+    def query_new_snapshot():
+        database._snapshot_manager(path).cursor().execute("SELECT 1")
+        busy.set()
+        done.wait()
+
+    persist_events_to_db(db_path, [Event("b", "B", date(2020, 1, 2), "20:00")])
+    publish_snapshot(db_path)
+    new = database._snapshot_manager(path)
+    assert new is not old
+    with pytest.raises(duckdb.ConnectionException):
+        old.cursor().execute("SELECT 1")
+
+    # A manager with a cursor still open in another thread is closed on the
+    # next swap after the thread is done with it
+    thread = threading.Thread(target=query_new_snapshot)
+    thread.start()
+    busy.wait()
+    persist_events_to_db(db_path, [Event("c", "C", date(2020, 1, 2), "20:00")])
+    publish_snapshot(db_path)
+    assert database._snapshot_manager(path) is not new
+    assert new.in_use()
+    done.set()
+    thread.join()
+
+    persist_events_to_db(db_path, [Event("d", "D", date(2020, 1, 2), "20:00")])
+    publish_snapshot(db_path)
+    database._snapshot_manager(path)
+    assert new not in database._retired_snapshots